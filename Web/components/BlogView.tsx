@@ -144,8 +144,33 @@ const simpleHash = (str: string): string => {
   return Math.abs(hash).toString(36);
 };
 
+// 服务端渲染的 HTML 中 Mermaid 代码块保留为 <pre><code class="language-mermaid">，拆出来交给 MermaidDiagram 绘制
+const MERMAID_BLOCK = /<pre><code class="language-mermaid">([\s\S]*?)<\/code><\/pre>/g;
+
+const decodeHtml = (value: string) => {
+  const textarea = document.createElement('textarea');
+  textarea.innerHTML = value;
+  return textarea.value;
+};
+
+type HtmlSegment = { type: 'html' | 'mermaid'; value: string };
+
+const splitPrerenderedHtml = (html: string): HtmlSegment[] => {
+  const segments: HtmlSegment[] = [];
+  let lastIndex = 0;
+  for (const match of html.matchAll(MERMAID_BLOCK)) {
+    const index = match.index ?? 0;
+    if (index > lastIndex) segments.push({ type: 'html', value: html.slice(lastIndex, index) });
+    segments.push({ type: 'mermaid', value: decodeHtml(match[1]).replace(/\n$/, '') });
+    lastIndex = index + match[0].length;
+  }
+  if (lastIndex < html.length) segments.push({ type: 'html', value: html.slice(lastIndex) });
+  return segments;
+};
+
 // 优化的 Markdown 内容组件 - 一次性渲染，避免重复和跳动
-const OptimizedMarkdownContent = memo<{ content: string; onRenderComplete?: () => void }>(({ content, onRenderComplete }) => {
+// html 为服务端渲染（已过滤）的结果，存在时直接插入，不再在客户端解析 Markdown
+const OptimizedMarkdownContent = memo<{ content: string; html?: string | null; onRenderComplete?: () => void }>(({ content, html, onRenderComplete }) => {
   const containerRef = useRef<HTMLDivElement>(null);
   const hasNotifiedRef = useRef(false);
   
@@ -171,6 +196,21 @@ const OptimizedMarkdownContent = memo<{ content: string; onRenderComplete?: () =
   
   // 使用内容哈希作为整体 key，确保内容变化时正确重新渲染
   const contentKey = useMemo(() => simpleHash(content), [content]);
+  const segments = useMemo(() => (html ? splitPrerenderedHtml(html) : null), [html]);
+  
+  if (segments) {
+    return (
+      <div ref={containerRef} key={contentKey} className="markdown-content max-w-none leading-relaxed text-gray-700 dark:text-gray-200">
+        {segments.map((segment, index) => {
+          if (segment.type === 'mermaid') {
+            const chartKey = simpleHash(segment.value);
+            return <MermaidDiagram key={`mermaid-${chartKey}-${index}`} id={chartKey} chart={segment.value} />;
+          }
+          return <div key={index} className="contents" dangerouslySetInnerHTML={{ __html: segment.value }} />;
+        })}
+      </div>
+    );
+  }
   
   return (
     <div ref={containerRef} className="markdown-content max-w-none leading-relaxed text-gray-700 dark:text-gray-200">
@@ -248,7 +288,8 @@ export const BlogView: React.FC = () => {
     if (id) {
       const blogId = parseInt(id, 10);
       if (!isNaN(blogId)) {
-        const post = posts.find(p => p.id === blogId);
+        // 列表项不含正文，只有从详情接口加载过的文章可以直接展示
+        const post = posts.find(p => p.id === blogId && p.content !== undefined);
         if (post) {
           setSelectedPost(post);
         } else {
@@ -257,6 +298,8 @@ export const BlogView: React.FC = () => {
               setSelectedPost(singleBlog);
               if (!posts.find(p => p.id === blogId)) {
                 setPosts(prev => [singleBlog, ...prev]);
+              } else {
+                setPosts(prev => prev.map(p => (p.id === blogId ? singleBlog : p)));
               }
             })
             .catch(error => {
@@ -572,7 +615,7 @@ export const BlogView: React.FC = () => {
 
   if (selectedPost) {
     const displayDate = formatDate(selectedPost.published_at || selectedPost.created_at);
-    const readTime = estimateReadTime(selectedPost.content);
+    const readTime = selectedPost.reading_time || estimateReadTime(selectedPost.content || '');
 
     return (
       <div className="max-w-7xl mx-auto pt-4 pb-12 px-4 md:px-6">
@@ -620,7 +663,8 @@ export const BlogView: React.FC = () => {
 
               <div ref={contentRef}>
                 <OptimizedMarkdownContent 
-                  content={selectedPost.content} 
+                  content={selectedPost.content || ''} 
+                  html={selectedPost.content_html}
                   onRenderComplete={handleMarkdownRenderComplete}
                 />
               </div>
@@ -810,8 +854,8 @@ export const BlogView: React.FC = () => {
         {filteredPosts.map(post => {
           const categoryLabel = post.category?.name || '未分类';
           const displayDate = formatDate(post.published_at || post.created_at);
-          const snippet = post.excerpt || `${post.content.slice(0, 140)}...`;
-          const readTime = estimateReadTime(post.content);
+          const snippet = post.excerpt || '';
+          const readTime = post.reading_time || estimateReadTime(post.content || '');
           const coverImage = post.cover_image || undefined;
 
           return (
@@ -505,7 +505,7 @@ export const HomeView: React.FC = () => {
                         )}
                       </div>
                       <span className="text-sm text-gray-500 dark:text-slate-500 font-mono">
-                        {formatDate(post.published_at || post.created_at)} • 约 {Math.ceil((post.content?.length || 0) / 500)} 分钟阅读 • {post.view_count || 0} 次浏览
+                        {formatDate(post.published_at || post.created_at)} • 约 {post.reading_time || Math.max(1, Math.ceil((post.content?.length || 0) / 500))} 分钟阅读 • {post.view_count || 0} 次浏览
                       </span>
                     </div>
                     
@@ -513,7 +513,7 @@ export const HomeView: React.FC = () => {
                           {post.title}
                         </h3>
                         <p className="text-gray-600 dark:text-gray-300 mb-6 leading-relaxed line-clamp-2">
-                          {post.excerpt || post.content.slice(0, 150) + '...'}
+                          {post.excerpt}
                         </p>
                         
                         <div className="inline-flex items-center text-primary-600 dark:text-primary-400 font-semibold group-hover:translate-x-1 transition-transform">
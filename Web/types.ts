@@ -17,7 +17,8 @@ export interface BlogPost {
   id: number;
   title: string;
   slug: string;
-  content: string;
+  // 列表接口不返回正文（excerpt 为空时已由服务端填入自动摘要），详情接口返回
+  content?: string;
   excerpt?: string | null;
   cover_image?: string | null;
   is_published: boolean;
@@ -29,6 +30,11 @@ export interface BlogPost {
   published_at?: string | null;
   category?: BlogCategory | null;
   tags: BlogTag[];
+  // 详情接口返回的服务端渲染结果，缺失时前端自行渲染 content
+  content_html?: string | null;
+  toc?: { id: string; text: string; level: number }[] | null;
+  word_count?: number | null;
+  reading_time?: number | null;
 }
 
 export interface PhotoCategory {
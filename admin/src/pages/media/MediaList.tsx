@@ -28,7 +28,7 @@ import PageHeader from '../../components/PageHeader'
 
 interface MediaItem {
   id: string
-  type: 'blog_cover' | 'photo' | 'ai_cover'
+  type: 'blog_cover' | 'photo' | 'ai_image' | 'ai_cover' | 'ai_demo_cover'
   title: string
   url: string
   thumbnail_url?: string
@@ -47,6 +47,8 @@ export default function MediaList() {
   const [mediaType, setMediaType] = useState<string | undefined>()
   const [previewVisible, setPreviewVisible] = useState(false)
   const [previewImage, setPreviewImage] = useState<string>('')
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [total, setTotal] = useState(0)
 
   useEffect(() => {
     fetchStats()
@@ -62,14 +64,19 @@ export default function MediaList() {
     }
   }
 
-  const fetchMediaList = async () => {
+  // cursor 为空时重新加载第一页，否则追加下一页
+  const fetchMediaList = async (cursor?: string) => {
     setLoading(true)
     try {
       const params: any = { limit: 100 }
       if (mediaType) params.media_type = mediaType
+      if (cursor) params.cursor = cursor
       
       const response = await api.get('/media', { params })
-      setMediaList(response.data.items || [])
+      const items = response.data.items || []
+      setMediaList((prev) => (cursor ? [...prev, ...items] : items))
+      setNextCursor(response.data.next_cursor || null)
+      setTotal(response.data.total || 0)
     } catch (error) {
       message.error('获取媒体列表失败')
     } finally {
@@ -97,7 +104,9 @@ export default function MediaList() {
     const labels: Record<string, { text: string; color: string; icon: React.ReactNode }> = {
       blog_cover: { text: '博客封面', color: 'blue', icon: <FileImageOutlined /> },
       photo: { text: '摄影作品', color: 'green', icon: <PictureOutlined /> },
+      ai_image: { text: 'AI图片', color: 'purple', icon: <RobotOutlined /> },
       ai_cover: { text: 'AI项目封面', color: 'cyan', icon: <RobotOutlined /> },
+      ai_demo_cover: { text: 'AI Demo封面', color: 'geekblue', icon: <RobotOutlined /> },
     }
     return labels[type] || { text: type, color: 'default', icon: null }
   }
@@ -209,7 +218,7 @@ export default function MediaList() {
           { label: '资源总量', value: stats?.total ?? '--' },
           { label: '博客封面', value: stats?.blog_covers ?? '--' },
           { label: '摄影作品', value: stats?.photos ?? '--' },
-          { label: 'AI 封面', value: stats?.ai_covers ?? '--' },
+          { label: 'AI 图片', value: stats?.ai_images ?? '--' },
         ]}
         extra={
           <Button icon={<ReloadOutlined />} onClick={refreshAll}>
@@ -259,7 +268,9 @@ export default function MediaList() {
             >
               <Select.Option value="blog_cover">博客封面</Select.Option>
               <Select.Option value="photo">摄影作品</Select.Option>
+              <Select.Option value="ai_image">AI图片</Select.Option>
               <Select.Option value="ai_cover">个人项目封面</Select.Option>
+              <Select.Option value="ai_demo_cover">AI Demo封面</Select.Option>
             </Select>
           </div>
           <div className="page-toolbar__actions">
@@ -273,7 +284,17 @@ export default function MediaList() {
           rowKey="id"
           loading={loading}
           scroll={{ x: 1200 }}
+          pagination={false}
         />
+        <div style={{ textAlign: 'center', marginTop: 16 }}>
+          {nextCursor ? (
+            <Button loading={loading} onClick={() => fetchMediaList(nextCursor)}>
+              加载更多（已加载 {mediaList.length} / {total}）
+            </Button>
+          ) : (
+            <span>共 {total} 个资源</span>
+          )}
+        </div>
       </Card>
 
       <Modal
@@ -12,10 +12,12 @@ interface User {
 
 interface AuthState {
   token: string | null
+  refreshToken: string | null
   user: User | null
   isAuthenticated: boolean
   login: (username: string, password: string) => Promise<void>
   logout: () => void
+  refresh: () => Promise<string | null>
   fetchUserInfo: () => Promise<void>
 }
 
@@ -23,6 +25,7 @@ export const useAuthStore = create<AuthState>()(
   persist(
     (set, get) => ({
       token: null,
+      refreshToken: null,
       user: null,
       isAuthenticated: false,
 
@@ -37,8 +40,8 @@ export const useAuthStore = create<AuthState>()(
           },
         })
 
-        const { access_token } = response.data
-        set({ token: access_token, isAuthenticated: true })
+        const { access_token, refresh_token } = response.data
+        set({ token: access_token, refreshToken: refresh_token, isAuthenticated: true })
         
         // 设置axios默认token
         api.defaults.headers.common['Authorization'] = `Bearer ${access_token}`
@@ -62,10 +65,34 @@ export const useAuthStore = create<AuthState>()(
       },
 
       logout: () => {
-        set({ token: null, user: null, isAuthenticated: false })
+        const { refreshToken } = get()
+        if (refreshToken) {
+          // 吊销刷新令牌，失败不影响本地退出
+          api.post('/auth/logout', { refresh_token: refreshToken }).catch(() => {})
+        }
+        set({ token: null, refreshToken: null, user: null, isAuthenticated: false })
         delete api.defaults.headers.common['Authorization']
       },
 
+      refresh: async () => {
+        const { refreshToken } = get()
+        if (!refreshToken) {
+          return null
+        }
+        try {
+          const response = await api.post('/auth/refresh', { refresh_token: refreshToken })
+          const { access_token, refresh_token } = response.data
+          set({ token: access_token, refreshToken: refresh_token, isAuthenticated: true })
+          api.defaults.headers.common['Authorization'] = `Bearer ${access_token}`
+          return access_token
+        } catch (error) {
+          // 刷新令牌失效，只清除本地状态（服务端已拒绝该令牌）
+          set({ token: null, refreshToken: null, user: null, isAuthenticated: false })
+          delete api.defaults.headers.common['Authorization']
+          return null
+        }
+      },
+
       fetchUserInfo: async () => {
         try {
           const response = await api.get('/auth/me')
@@ -88,7 +115,7 @@ export const useAuthStore = create<AuthState>()(
     {
       name: 'auth-storage',
       storage: createJSONStorage(() => localStorage),
-      partialize: (state) => ({ token: state.token }),
+      partialize: (state) => ({ token: state.token, refreshToken: state.refreshToken }),
       onRehydrateStorage: () => (state) => {
         if (state?.token) {
           api.defaults.headers.common['Authorization'] = `Bearer ${state.token}`
@@ -15,12 +15,38 @@ api.interceptors.request.use(
   }
 )
 
+// 正在进行的刷新请求（并发的 401 共用同一次刷新）
+let refreshing: Promise<string | null> | null = null
+
+const refreshAccessToken = async (): Promise<string | null> => {
+  const { useAuthStore } = await import('../store/authStore')
+  return useAuthStore.getState().refresh()
+}
+
 // 响应拦截器
 api.interceptors.response.use(
   (response) => {
     return response
   },
-  (error) => {
+  async (error) => {
+    const original = error.config
+    const url: string = original?.url || ''
+    const isAuthRequest = url.includes('/auth/login') || url.includes('/auth/refresh')
+
+    if (error.response?.status === 401 && original && !original._retry && !isAuthRequest) {
+      // 访问令牌过期：用刷新令牌换取新令牌后重试一次，无需重新输入密码
+      original._retry = true
+      refreshing = refreshing || refreshAccessToken().finally(() => {
+        refreshing = null
+      })
+      const token = await refreshing
+      if (token) {
+        original.headers = original.headers || {}
+        original.headers['Authorization'] = `Bearer ${token}`
+        return api(original)
+      }
+    }
+
     if (error.response?.status === 401) {
       // 未授权，清除token并跳转到登录页
       import('../store/authStore').then(({ useAuthStore }) => {
@@ -0,0 +1,81 @@
+"""基线版本：补齐旧脚本添加的列，并为列表查询创建组合索引
+
+已有数据库（由 sql/init.sql 或 init_db 创建）直接执行 alembic upgrade head 即可，
+各步骤会先检查对象是否已存在，可重复执行。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (表名, 索引名, 列) —— 与各列表接口的过滤条件和排序一致
+LIST_INDEXES = (
+    ("blogs", "ix_blogs_created_at", ["created_at"]),
+    ("blogs", "ix_blogs_published_created", ["is_published", "created_at"]),
+    ("blogs", "ix_blogs_category_published_created", ["category_id", "is_published", "created_at"]),
+    ("photos", "ix_photos_created_at", ["created_at"]),
+    ("photos", "ix_photos_category_created", ["category_id", "created_at"]),
+    ("photos", "ix_photos_featured_created", ["is_featured", "created_at"]),
+    ("ai_images", "ix_ai_images_published_created", ["is_published", "created_at"]),
+    ("ai_images", "ix_ai_images_featured_published_created", ["is_featured", "is_published", "created_at"]),
+    ("ai_images", "ix_ai_images_category_published_created", ["category", "is_published", "created_at"]),
+    ("ai_demos", "ix_ai_demos_published_sort", ["is_published", "sort_order", "created_at"]),
+    ("ai_demos", "ix_ai_demos_published_featured_sort", ["is_published", "is_featured", "sort_order"]),
+    ("ai_demos", "ix_ai_demos_category_published_sort", ["category", "is_published", "sort_order"]),
+    ("ai_projects", "ix_ai_projects_published_created", ["is_published", "created_at"]),
+    ("ai_projects", "ix_ai_projects_featured_published_created", ["is_featured", "is_published", "created_at"]),
+)
+
+
+def _columns(inspector, table: str) -> set:
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def _indexes(inspector, table: str) -> set:
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    if "blogs" not in tables:
+        raise RuntimeError("数据库中没有表结构，请先执行 python -m app.core.init_db")
+
+    # 原 app/core/migrations 下手工脚本添加的列
+    if "thumbnail_url" not in _columns(inspector, "ai_images"):
+        op.add_column("ai_images", sa.Column("thumbnail_url", sa.String(500), nullable=True))
+    for table in ("categories", "tags", "photo_categories"):
+        if "updated_at" not in _columns(inspector, table):
+            op.add_column(table, sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True))
+
+    if "revoked_tokens" not in tables:
+        op.create_table(
+            "revoked_tokens",
+            sa.Column("token_id", sa.String(32), primary_key=True),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_revoked_tokens_expires_at", "revoked_tokens", ["expires_at"])
+
+    existing = {table: _indexes(inspector, table) for table in {spec[0] for spec in LIST_INDEXES}}
+    for table, name, columns in LIST_INDEXES:
+        if name not in existing[table]:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table, name, _ in reversed(LIST_INDEXES):
+        if name in _indexes(inspector, table):
+            op.drop_index(name, table_name=table)
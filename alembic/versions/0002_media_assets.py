@@ -0,0 +1,111 @@
+"""媒体资源汇总表 media_assets，并由现有数据回填
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 本迁移时的表结构：回填只用这里的定义，不依赖应用模型
+media_assets = sa.table(
+    "media_assets",
+    sa.column("asset_type"), sa.column("owner_type"), sa.column("owner_id"), sa.column("title"),
+    sa.column("url"), sa.column("thumbnail_url"), sa.column("file_size"), sa.column("width"),
+    sa.column("height"), sa.column("created_at"),
+)
+blogs = sa.table("blogs", sa.column("id"), sa.column("title"), sa.column("cover_image"), sa.column("created_at"))
+photos = sa.table(
+    "photos",
+    sa.column("id"), sa.column("title"), sa.column("image_url"), sa.column("thumbnail_url"),
+    sa.column("file_size"), sa.column("width"), sa.column("height"), sa.column("created_at"),
+)
+ai_images = sa.table(
+    "ai_images",
+    sa.column("id"), sa.column("title"), sa.column("image_url"), sa.column("thumbnail_url"),
+    sa.column("parameters", sa.JSON()), sa.column("created_at"),
+)
+ai_projects = sa.table(
+    "ai_projects", sa.column("id"), sa.column("title"), sa.column("cover_image"), sa.column("created_at"),
+)
+ai_demos = sa.table("ai_demos", sa.column("id"), sa.column("title"), sa.column("cover_image"), sa.column("created_at"))
+
+
+def _select_rows(asset_type: str, owner_type: str, source, url, thumbnail_url=None, dimensions=None):
+    """源表 -> media_assets 行的 SELECT"""
+    return sa.select(
+        sa.literal(asset_type),
+        sa.literal(owner_type),
+        source.c.id,
+        source.c.title,
+        url,
+        sa.null() if thumbnail_url is None else thumbnail_url,
+        *(dimensions or (sa.null(), sa.null(), sa.null())),
+        sa.func.coalesce(source.c.created_at, sa.func.current_timestamp()),
+    ).where(url.isnot(None), url != "")
+
+
+def _rebuild_media_assets(connection) -> None:
+    selects = (
+        _select_rows("blog_cover", "blog", blogs, blogs.c.cover_image),
+        _select_rows(
+            "photo", "photo", photos, photos.c.image_url, photos.c.thumbnail_url,
+            (photos.c.file_size, photos.c.width, photos.c.height),
+        ),
+        # AI 图片没有尺寸列，取生成参数中的宽高
+        _select_rows(
+            "ai_image", "ai_image", ai_images, ai_images.c.image_url, ai_images.c.thumbnail_url,
+            (
+                sa.null(),
+                ai_images.c.parameters["width"].as_integer(),
+                ai_images.c.parameters["height"].as_integer(),
+            ),
+        ),
+        _select_rows("ai_cover", "ai_project", ai_projects, ai_projects.c.cover_image),
+        _select_rows("ai_demo_cover", "ai_demo", ai_demos, ai_demos.c.cover_image),
+    )
+    columns = [column.name for column in media_assets.columns]
+    connection.execute(sa.delete(media_assets))
+    for statement in selects:
+        connection.execute(sa.insert(media_assets).from_select(columns, statement))
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "media_assets" not in inspector.get_table_names():
+        op.create_table(
+            "media_assets",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("asset_type", sa.String(20), nullable=False),
+            sa.Column("owner_type", sa.String(20), nullable=False),
+            sa.Column("owner_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(200), nullable=True),
+            sa.Column("url", sa.String(500), nullable=False),
+            sa.Column("thumbnail_url", sa.String(500), nullable=True),
+            sa.Column("file_size", sa.Integer(), nullable=True),
+            sa.Column("width", sa.Integer(), nullable=True),
+            sa.Column("height", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.UniqueConstraint("owner_type", "owner_id", "asset_type", name="uq_media_assets_owner"),
+        )
+        op.create_index("ix_media_assets_created_id", "media_assets", ["created_at", "id"])
+        op.create_index("ix_media_assets_type_created_id", "media_assets", ["asset_type", "created_at", "id"])
+
+    # 全量重建，重复执行结果一致
+    _rebuild_media_assets(op.get_bind())
+
+
+def downgrade() -> None:
+    if "media_assets" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table("media_assets")
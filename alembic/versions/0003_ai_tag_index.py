@@ -0,0 +1,111 @@
+"""AI 图片 / AI Demo 标签表与 AI 图片 is_nsfw 列，并由 tags 列回填
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (标签表, 外键列, 源表, 外键列索引名)
+TAG_TABLES = (
+    ("ai_image_tags", "ai_image_id", "ai_images", "ix_ai_image_tags_image"),
+    ("ai_demo_tags", "ai_demo_id", "ai_demos", "ix_ai_demo_tags_demo"),
+)
+NSFW_INDEX = ("ix_ai_images_nsfw_published_created", ["is_nsfw", "is_published", "created_at"])
+NSFW_TAG = "nsfw"
+TAG_MAX_LENGTH = 50
+BATCH_SIZE = 2000
+
+
+def _parse_tags(value):
+    """本迁移时的标签规则：逗号分隔（兼容中文逗号），去空白、转小写、去重并保持顺序"""
+    if not value:
+        return []
+    tags = []
+    for item in value.replace("，", ",").split(","):
+        tag = item.strip().lower()[:TAG_MAX_LENGTH]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def _rebuild_ai_tags(connection) -> None:
+    """按 tags 列全量重建标签表，并重新计算 AI 图片的 is_nsfw（只用本迁移时的表结构）"""
+    for table_name, owner_column, source_name, _ in TAG_TABLES:
+        tag_table = sa.table(table_name, sa.column("tag"), sa.column(owner_column))
+        source = sa.table(source_name, sa.column("id"), sa.column("tags"))
+        connection.execute(sa.delete(tag_table))
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.select(source.c.id, source.c.tags)
+                .where(source.c.id > last_id, source.c.tags.isnot(None), source.c.tags != "")
+                .order_by(source.c.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            values = [{"tag": tag, owner_column: row.id} for row in rows for tag in _parse_tags(row.tags)]
+            if values:
+                connection.execute(sa.insert(tag_table), values)
+            last_id = rows[-1].id
+
+    ai_images = sa.table("ai_images", sa.column("id"), sa.column("is_nsfw"), sa.column("updated_at"))
+    ai_image_tags = sa.table("ai_image_tags", sa.column("tag"), sa.column("ai_image_id"))
+    nsfw_ids = sa.select(ai_image_tags.c.ai_image_id).where(ai_image_tags.c.tag == NSFW_TAG)
+    # 显式保留 updated_at，回填不改变内容版本
+    connection.execute(
+        sa.update(ai_images).values(is_nsfw=ai_images.c.id.in_(nsfw_ids), updated_at=ai_images.c.updated_at)
+    )
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if "is_nsfw" not in {column["name"] for column in inspector.get_columns("ai_images")}:
+        op.add_column(
+            "ai_images",
+            sa.Column("is_nsfw", sa.Boolean(), nullable=False, server_default=sa.false()),
+        )
+    if NSFW_INDEX[0] not in {index["name"] for index in inspector.get_indexes("ai_images")}:
+        op.create_index(NSFW_INDEX[0], "ai_images", NSFW_INDEX[1])
+
+    for table, owner_column, source, index in TAG_TABLES:
+        if table in tables:
+            continue
+        op.create_table(
+            table,
+            sa.Column("tag", sa.String(50), primary_key=True),
+            sa.Column(
+                owner_column, sa.Integer(),
+                sa.ForeignKey(f"{source}.id", ondelete="CASCADE"), primary_key=True,
+            ),
+        )
+        op.create_index(index, table, [owner_column])
+
+    # 全量重建，重复执行结果一致
+    _rebuild_ai_tags(op.get_bind())
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table, *_ in TAG_TABLES:
+        if table in tables:
+            op.drop_table(table)
+    if NSFW_INDEX[0] in {index["name"] for index in inspector.get_indexes("ai_images")}:
+        op.drop_index(NSFW_INDEX[0], table_name="ai_images")
+    if "is_nsfw" in {column["name"] for column in inspector.get_columns("ai_images")}:
+        op.drop_column("ai_images", "is_nsfw")
@@ -0,0 +1,110 @@
+"""摄影作品 EXIF 数值列与分面过滤索引，并由文本字段回填
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    ("focal_length_mm", sa.Float()),
+    ("aperture_value", sa.Float()),
+    ("iso_value", sa.Integer()),
+)
+INDEXES = (
+    ("ix_photos_camera_created", ["make", "model", "created_at"]),
+    ("ix_photos_focal_created", ["focal_length_mm", "created_at"]),
+    ("ix_photos_aperture_created", ["aperture_value", "created_at"]),
+    ("ix_photos_iso_created", ["iso_value", "created_at"]),
+    ("ix_photos_shoot_time", ["shoot_time"]),
+)
+
+# 文本字段 -> 数值列
+EXIF_VALUE_FIELDS = {
+    "focal_length": "focal_length_mm",
+    "aperture": "aperture_value",
+    "iso": "iso_value",
+}
+BATCH_SIZE = 2000
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def _parse_number(value):
+    """取文本中的第一个数字，如 "35mm" -> 35.0、"f/2.8" -> 2.8、"ISO 400" -> 400.0"""
+    match = _NUMBER.search(value) if value else None
+    return float(match.group()) if match else None
+
+
+def _rebuild_exif_values(connection) -> None:
+    """按文本字段计算全部作品的数值列（只用本迁移时的表结构）"""
+    photos = sa.table(
+        "photos",
+        sa.column("id"), sa.column("updated_at"),
+        *(sa.column(name) for name in EXIF_VALUE_FIELDS), *(sa.column(name) for name in EXIF_VALUE_FIELDS.values()),
+    )
+    # 显式保留 updated_at，回填不改变内容版本
+    statement = (
+        sa.update(photos)
+        .where(photos.c.id == sa.bindparam("_id"))
+        .values(
+            updated_at=photos.c.updated_at,
+            **{column: sa.bindparam(f"_{column}") for column in EXIF_VALUE_FIELDS.values()},
+        )
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(photos.c.id, *(photos.c[name] for name in EXIF_VALUE_FIELDS))
+            .where(photos.c.id > last_id)
+            .order_by(photos.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            values = {column: _parse_number(row._mapping[field]) for field, column in EXIF_VALUE_FIELDS.items()}
+            if values["iso_value"] is not None:
+                values["iso_value"] = int(values["iso_value"])
+            params.append({"_id": row.id, **{f"_{column}": value for column, value in values.items()}})
+        connection.execute(statement, params)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("photos")}
+    for name, type_ in COLUMNS:
+        if name not in columns:
+            op.add_column("photos", sa.Column(name, type_, nullable=True))
+
+    indexes = {index["name"] for index in inspector.get_indexes("photos")}
+    for name, index_columns in INDEXES:
+        if name not in indexes:
+            op.create_index(name, "photos", index_columns)
+
+    _rebuild_exif_values(op.get_bind())
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    indexes = {index["name"] for index in inspector.get_indexes("photos")}
+    for name, _ in reversed(INDEXES):
+        if name in indexes:
+            op.drop_index(name, table_name="photos")
+    columns = {column["name"] for column in inspector.get_columns("photos")}
+    for name, _ in reversed(COLUMNS):
+        if name in columns:
+            op.drop_column("photos", name)
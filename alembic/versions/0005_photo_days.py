@@ -0,0 +1,79 @@
+"""摄影作品按拍摄日期的汇总表 photo_days，并由现有数据回填
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def _rebuild_photo_days(connection) -> None:
+    """
+    按 photos 全量重建（只用本迁移时的表结构）
+
+    每天的封面：优先精选作品，其次当天最晚拍摄的作品（同一时间取 ID 较大者）
+    """
+    photos = sa.table(
+        "photos", sa.column("id"), sa.column("shoot_time", sa.DateTime()), sa.column("is_featured", sa.Boolean()),
+    )
+    photo_days = sa.table(
+        "photo_days",
+        sa.column("day", sa.Date()), sa.column("photo_count"), sa.column("cover_photo_id"),
+        sa.column("cover_featured", sa.Boolean()),
+    )
+    days = {}
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(photos.c.id, photos.c.shoot_time, photos.c.is_featured)
+            .where(photos.c.id > last_id, photos.c.shoot_time.isnot(None))
+            .order_by(photos.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            rank = (bool(row.is_featured), row.shoot_time, row.id)
+            entry = days.setdefault(row.shoot_time.date(), [0, rank])
+            entry[0] += 1
+            entry[1] = max(entry[1], rank)
+        last_id = rows[-1].id
+
+    connection.execute(sa.delete(photo_days))
+    if days:
+        connection.execute(sa.insert(photo_days), [
+            {"day": day, "photo_count": count, "cover_photo_id": cover[2], "cover_featured": cover[0]}
+            for day, (count, cover) in sorted(days.items())
+        ])
+
+
+def upgrade() -> None:
+    if "photo_days" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "photo_days",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("photo_count", sa.Integer(), nullable=False),
+            sa.Column("cover_photo_id", sa.Integer(), nullable=True),
+            sa.Column("cover_featured", sa.Boolean(), nullable=False),
+        )
+
+    # 全量重建，重复执行结果一致
+    _rebuild_photo_days(op.get_bind())
+
+
+def downgrade() -> None:
+    if "photo_days" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table("photo_days")
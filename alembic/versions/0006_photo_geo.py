@@ -0,0 +1,178 @@
+"""摄影作品经纬度与 geohash 列及地图查询索引，并由原始 EXIF 回填
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 00:00:00
+
+"""
+from fractions import Fraction
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    ("latitude", sa.Float()),
+    ("longitude", sa.Float()),
+    ("geohash", sa.String(12)),
+)
+INDEXES = (
+    ("ix_photos_lat_lng", ["latitude", "longitude"]),
+    ("ix_photos_geohash", ["geohash", "latitude", "longitude"]),
+)
+
+BATCH_SIZE = 2000
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 12
+# exifread 的键 / Pillow GPS IFD 的键（存在 exif["GPSInfo"] 下）
+_EXIFREAD_KEYS = ("GPS GPSLatitude", "GPS GPSLatitudeRef", "GPS GPSLongitude", "GPS GPSLongitudeRef")
+_PILLOW_KEYS = ("GPSLatitude", "GPSLatitudeRef", "GPSLongitude", "GPSLongitudeRef")
+
+
+# ---------- 本迁移时的 GPS 解析与 geohash 规则（exif 列中为 JSON 值）----------
+
+def _number(value):
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        numerator, denominator = value
+        return float(numerator) / float(denominator) if denominator else None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(Fraction(value.strip()))
+        except (ValueError, ZeroDivisionError):
+            return None
+    return None
+
+
+def _ref(value) -> str:
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else ""
+    return str(value or "").strip().upper()[:1]
+
+
+def _degrees(values, ref):
+    """(度, 分, 秒) + 方向 -> 十进制度数，S / W 为负"""
+    if values is None:
+        return None
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    parts = [_number(value) for value in values[:3]]
+    if not parts or any(part is None for part in parts):
+        return None
+    degrees = sum(part / 60 ** index for index, part in enumerate(parts))
+    return -degrees if _ref(ref) in ("S", "W") else degrees
+
+
+def _gps_from_exif(exif):
+    if not isinstance(exif, dict):
+        return None, None
+    source, keys = exif, _EXIFREAD_KEYS
+    if _EXIFREAD_KEYS[0] not in exif and isinstance(exif.get("GPSInfo"), dict):
+        source, keys = exif["GPSInfo"], _PILLOW_KEYS
+    lat_key, lat_ref_key, lng_key, lng_ref_key = keys
+    latitude = _degrees(source.get(lat_key), source.get(lat_ref_key))
+    longitude = _degrees(source.get(lng_key), source.get(lng_ref_key))
+    if latitude is None or longitude is None:
+        return None, None
+    # 部分相机未定位时写入 0/0
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or (latitude == 0 and longitude == 0):
+        return None, None
+    return round(latitude, 7), round(longitude, 7)
+
+
+def _geohash(latitude: float, longitude: float) -> str:
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < GEOHASH_PRECISION:
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def _rebuild_photo_geo(connection) -> None:
+    """回填坐标：已有经纬度的只重新计算 geohash，否则从原始 EXIF 中解析 GPS（只用本迁移时的表结构）"""
+    photos = sa.table(
+        "photos",
+        sa.column("id"), sa.column("exif", sa.JSON()), sa.column("updated_at"),
+        sa.column("latitude"), sa.column("longitude"), sa.column("geohash"),
+    )
+    # 显式保留 updated_at，回填不改变内容版本
+    statement = (
+        sa.update(photos)
+        .where(photos.c.id == sa.bindparam("_id"))
+        .values(
+            updated_at=photos.c.updated_at,
+            **{column: sa.bindparam(f"_{column}") for column in ("latitude", "longitude", "geohash")},
+        )
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(photos.c.id, photos.c.latitude, photos.c.longitude, photos.c.exif)
+            .where(photos.c.id > last_id)
+            .order_by(photos.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            latitude, longitude = row.latitude, row.longitude
+            if latitude is None or longitude is None:
+                latitude, longitude = _gps_from_exif(row.exif)
+            located = latitude is not None and longitude is not None
+            params.append({
+                "_id": row.id,
+                "_latitude": latitude if located else None,
+                "_longitude": longitude if located else None,
+                "_geohash": _geohash(latitude, longitude) if located else None,
+            })
+        connection.execute(statement, params)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("photos")}
+    for name, type_ in COLUMNS:
+        if name not in columns:
+            op.add_column("photos", sa.Column(name, type_, nullable=True))
+
+    indexes = {index["name"] for index in inspector.get_indexes("photos")}
+    for name, index_columns in INDEXES:
+        if name not in indexes:
+            op.create_index(name, "photos", index_columns)
+
+    _rebuild_photo_geo(op.get_bind())
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    indexes = {index["name"] for index in inspector.get_indexes("photos")}
+    for name, _ in reversed(INDEXES):
+        if name in indexes:
+            op.drop_index(name, table_name="photos")
+    columns = {column["name"] for column in inspector.get_columns("photos")}
+    for name, _ in reversed(COLUMNS):
+        if name in columns:
+            op.drop_column("photos", name)
@@ -0,0 +1,42 @@
+"""博客服务端渲染结果列（HTML、目录、字数、阅读时长）
+
+已有文章不在迁移中渲染，首次访问详情时按需渲染并写回。
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    ("content_html", sa.Text(16777215)),
+    ("toc", sa.JSON()),
+    ("word_count", sa.Integer()),
+    ("reading_time", sa.Integer()),
+    ("render_version", sa.Integer()),
+)
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("blogs")}
+    for name, type_ in COLUMNS:
+        if name not in columns:
+            op.add_column("blogs", sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("blogs")}
+    for name, _ in reversed(COLUMNS):
+        if name in columns:
+            op.drop_column("blogs", name)
@@ -0,0 +1,156 @@
+"""博客自动摘要与搜索文本列，并由正文回填
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+
+"""
+from html import unescape
+from typing import Optional, Sequence, Union
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EXCERPT_LENGTH = 200
+BATCH_SIZE = 500
+
+COLUMNS = (
+    ("auto_excerpt", sa.String(EXCERPT_LENGTH + 1)),
+    ("search_text", sa.Text(16777215)),
+)
+
+
+# ---------- 本迁移时的纯文本提取规则 ----------
+
+_FENCED_CODE = re.compile(r"^[ \t]*(```|~~~)[^\n]*\n.*?^[ \t]*\1[ \t]*$", re.M | re.S)
+_FENCE_MARKER = re.compile(r"^[ \t]*(```|~~~)[^\n]*$", re.M)
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.S)
+# 内容不是正文的元素连同内容一起去掉（未闭合时去掉到文末）
+_RAW_ELEMENT = re.compile(r"<(script|style|iframe)\b[^>]*>.*?(?:</\1\s*>|\Z)", re.I | re.S)
+_HTML_TAG = re.compile(r"</?[A-Za-z][^>]*>")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\((?:[^()\n]|\([^()\n]*\))*\)|!\[([^\]]*)\]\[[^\]]*\]")
+_LINK = re.compile(r"\[([^\]]+)\]\((?:[^()\n]|\([^()\n]*\))*\)|\[([^\]]+)\]\[[^\]]*\]")
+_AUTOLINK = re.compile(r"<((?:https?|mailto):[^>]+)>")
+_REFERENCE_DEFINITION = re.compile(r"^[ \t]*\[[^\]]+\]:[ \t]*\S+.*$", re.M)
+_LINE_PREFIX = re.compile(r"^[ \t]*(?:#{1,6}[ \t]+|>[ \t]?|[-*+][ \t]+(?:\[[ xX]\][ \t]+)?|\d+[.)][ \t]+)", re.M)
+_HEADING_CLOSE = re.compile(r"[ \t]+#+[ \t]*$", re.M)
+_RULE = re.compile(r"^[ \t]*(?:[-*_][ \t]*){3,}$", re.M)
+_TABLE_DELIMITER = re.compile(r"^[ \t]*\|?[ \t]*:?-{3,}:?[ \t]*(?:\|[ \t]*:?-{3,}:?[ \t]*)*\|?[ \t]*$", re.M)
+_EMPHASIS = re.compile(r"(\*\*|__|~~)(.+?)\1|(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)")
+_INLINE_CODE = re.compile(r"`+([^`]*)`+")
+_FOOTNOTE_REF = re.compile(r"\[\^[^\]]+\]:?")
+_WHITESPACE = re.compile(r"\s+")
+
+_SENTENCE_END = "。！？!?.；;…"
+
+
+def markdown_to_text(content: Optional[str], keep_code: bool = False) -> str:
+    """去掉 Markdown / HTML 标记，返回单行纯文本；keep_code 为 False 时丢弃代码块"""
+    if not content:
+        return ""
+    text = content.replace("\r\n", "\n")
+    text = _FENCED_CODE.sub(lambda m: m.group(0) if keep_code else " ", text)
+    text = _FENCE_MARKER.sub(" ", text)
+    text = _HTML_COMMENT.sub(" ", text)
+    text = _RAW_ELEMENT.sub(" ", text)
+    text = _IMAGE.sub(lambda m: m.group(1) or m.group(2) or "", text)
+    text = _LINK.sub(lambda m: m.group(1) or m.group(2), text)
+    text = _AUTOLINK.sub(r"\1", text)
+    text = _HTML_TAG.sub(" ", text)
+    text = _REFERENCE_DEFINITION.sub(" ", text)
+    text = _FOOTNOTE_REF.sub("", text)
+    text = _RULE.sub(" ", text)
+    text = _TABLE_DELIMITER.sub(" ", text)
+    text = _HEADING_CLOSE.sub("", text)
+    text = _LINE_PREFIX.sub("", text)
+    text = _INLINE_CODE.sub(r"\1", text)
+    # 嵌套强调（如 ***粗斜体***）需要多次替换
+    for _ in range(3):
+        stripped = _EMPHASIS.sub(lambda m: next(group for group in m.groups()[1:] if group is not None), text)
+        if stripped == text:
+            break
+        text = stripped
+    text = text.replace("|", " ")
+    return _WHITESPACE.sub(" ", unescape(text)).strip()
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    """截取不超过 length 个字符的摘要，尽量在句末断开，否则加省略号"""
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    boundary = max(cut.rfind(mark) for mark in _SENTENCE_END)
+    if boundary >= length // 2:
+        return cut[:boundary + 1]
+    return cut.rstrip() + "…"
+
+
+def normalize_search_text(*parts: Optional[str]) -> str:
+    """搜索用文本：NFKC 规范化（全角转半角等）、小写、合并空白"""
+    text = " ".join(part for part in parts if part)
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text).lower()).strip()
+
+
+def _rebuild_blog_text(connection) -> None:
+    """按 content 提取全部文章的纯文本列（只用本迁移时的表结构）"""
+    blogs = sa.table(
+        "blogs",
+        sa.column("id"), sa.column("title"), sa.column("excerpt"), sa.column("content"), sa.column("updated_at"),
+        sa.column("auto_excerpt"), sa.column("search_text"),
+    )
+    # 显式保留 updated_at，回填不改变内容版本
+    statement = (
+        sa.update(blogs)
+        .where(blogs.c.id == sa.bindparam("_id"))
+        .values(
+            updated_at=blogs.c.updated_at,
+            auto_excerpt=sa.bindparam("_auto_excerpt"),
+            search_text=sa.bindparam("_search_text"),
+        )
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(blogs.c.id, blogs.c.title, blogs.c.excerpt, blogs.c.content)
+            .where(blogs.c.id > last_id)
+            .order_by(blogs.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(statement, [
+            {
+                "_id": row.id,
+                "_auto_excerpt": make_excerpt(markdown_to_text(row.content)) or None,
+                "_search_text": normalize_search_text(
+                    row.title, row.excerpt, markdown_to_text(row.content, keep_code=True),
+                ),
+            }
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("blogs")}
+    for name, type_ in COLUMNS:
+        if name not in columns:
+            op.add_column("blogs", sa.Column(name, type_, nullable=True))
+
+    _rebuild_blog_text(op.get_bind())
+
+
+def downgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("blogs")}
+    for name, _ in reversed(COLUMNS):
+        if name in columns:
+            op.drop_column("blogs", name)
@@ -0,0 +1,186 @@
+"""博客相关文章表 blog_related，并按现有文章全量计算
+
+回填使用本迁移时的相关度规则（副本），依赖 numpy 与 scipy，未安装时只建表。
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 00:00:00
+
+"""
+from collections import Counter
+from typing import Sequence, Union
+import logging
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+try:
+    import numpy as np
+    from scipy import sparse
+    SIMILARITY_AVAILABLE = True
+except ImportError:
+    np = None
+    sparse = None
+    SIMILARITY_AVAILABLE = False
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+RELATED_LIMIT = 6
+MIN_SCORE = 0.05
+TEXT_WEIGHT = 0.6
+TAG_WEIGHT = 0.3
+CATEGORY_WEIGHT = 0.1
+BATCH_SIZE = 256
+
+_WORD = re.compile(r"[a-z][a-z0-9_]+|[0-9]+[a-z][a-z0-9_]*")
+_CJK_RANGES = ((0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF))
+
+
+# ---------- 本迁移时的相关度规则 ----------
+
+def _cjk_bigrams(text):
+    """相邻两个汉字编码为 (前字码点 << 21) | 后字码点"""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    is_cjk = np.zeros(len(codes), dtype=bool)
+    for low, high in _CJK_RANGES:
+        is_cjk |= (codes >= low) & (codes <= high)
+    pairs = is_cjk[:-1] & is_cjk[1:]
+    return (codes[:-1][pairs].astype(np.int64) << 21) | codes[1:][pairs]
+
+
+def _tfidf_matrix(documents, min_df=2, max_df=0.5):
+    """按行 L2 归一化的 TF-IDF 矩阵：单词与汉字 bigram，对数词频 × 平滑 IDF"""
+    vocabulary = {}
+    rows, columns, values = [], [], []
+    bigram_rows, bigrams = [], []
+    for row, document in enumerate(documents):
+        for word, count in Counter(_WORD.findall(document)).items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(word, len(vocabulary)))
+            values.append(count)
+        keys = _cjk_bigrams(document)
+        bigrams.append(keys)
+        bigram_rows.append(np.full(len(keys), row))
+
+    keys, bigram_columns = np.unique(np.concatenate(bigrams or [np.empty(0, np.int64)]), return_inverse=True)
+    all_rows = np.concatenate([np.asarray(rows, dtype=np.int64), *bigram_rows])
+    all_columns = np.concatenate([np.asarray(columns, dtype=np.int64), bigram_columns.ravel() + len(vocabulary)])
+    all_values = np.concatenate([np.asarray(values, dtype=np.float32), np.ones(len(bigram_columns.ravel()), np.float32)])
+    shape = (len(documents), max(len(vocabulary) + len(keys), 1))
+    counts = sparse.csr_matrix((all_values, (all_rows, all_columns)), shape=shape)
+
+    df = np.bincount(counts.indices, minlength=shape[1])
+    keep = (df >= min(min_df, len(documents))) & (df <= max(max_df * len(documents), 1))
+    counts = counts[:, np.flatnonzero(keep)]
+    df = df[keep]
+    counts.data = 1.0 + np.log(counts.data)
+    idf = np.log((1.0 + len(documents)) / (1.0 + df)) + 1.0
+    matrix = counts @ sparse.diags(idf.astype(np.float32))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def _tag_matrix(groups, size):
+    rows = [row for row, items in enumerate(groups) for _ in items]
+    columns = [column for items in groups for column in items]
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=(len(groups), max(size, 1))
+    )
+
+
+def _jaccard(matrix, rows):
+    sizes = np.asarray(matrix.sum(axis=1)).ravel()
+    intersection = (matrix[rows] @ matrix.T).toarray()
+    union = sizes[rows][:, None] + sizes[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+def _rebuild_blog_related(connection) -> None:
+    """按已发布文章全量计算（只用本迁移时的表结构）"""
+    blogs = sa.table(
+        "blogs", sa.column("id"), sa.column("search_text"), sa.column("category_id"), sa.column("is_published"),
+    )
+    blog_tag = sa.table("blog_tag", sa.column("blog_id"), sa.column("tag_id"))
+    blog_related = sa.table(
+        "blog_related", sa.column("blog_id"), sa.column("rank"), sa.column("related_id"), sa.column("score"),
+    )
+    connection.execute(sa.delete(blog_related))
+
+    published = blogs.c.is_published == sa.true()
+    rows = connection.execute(
+        sa.select(blogs.c.id, blogs.c.search_text, blogs.c.category_id).where(published).order_by(blogs.c.id)
+    ).all()
+    if not rows:
+        return
+    ids = [row.id for row in rows]
+    index = {blog_id: position for position, blog_id in enumerate(ids)}
+    tag_columns = {}
+    groups = [[] for _ in rows]
+    for blog_id, tag_id in connection.execute(
+        sa.select(blog_tag.c.blog_id, blog_tag.c.tag_id).where(
+            blog_tag.c.blog_id.in_(sa.select(blogs.c.id).where(published))
+        )
+    ).all():
+        if blog_id in index:
+            groups[index[blog_id]].append(tag_columns.setdefault(tag_id, len(tag_columns)))
+
+    text = _tfidf_matrix([row.search_text or "" for row in rows])
+    tags = _tag_matrix(groups, len(tag_columns))
+    # 无分类记为 -1，比较时排除
+    categories = np.array([row.category_id or -1 for row in rows])
+
+    values = []
+    for start in range(0, len(ids), BATCH_SIZE):
+        batch = list(range(start, min(start + BATCH_SIZE, len(ids))))
+        same_category = (categories[batch][:, None] == categories[None, :]) & (categories[batch][:, None] >= 0)
+        scores = (
+            TEXT_WEIGHT * (text[batch] @ text.T).toarray()
+            + TAG_WEIGHT * _jaccard(tags, batch)
+            + CATEGORY_WEIGHT * same_category
+        )
+        scores[np.arange(len(batch)), batch] = -1.0
+        limit = min(RELATED_LIMIT, scores.shape[1] - 1)
+        if limit <= 0:
+            break
+        top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+        for offset, row in enumerate(batch):
+            rank = 0
+            for column in sorted(top[offset], key=lambda column: -scores[offset, column]):
+                score = float(scores[offset, column])
+                if score < MIN_SCORE:
+                    break
+                values.append({"blog_id": ids[row], "rank": rank, "related_id": ids[column], "score": round(score, 6)})
+                rank += 1
+    if values:
+        connection.execute(sa.insert(blog_related), values)
+
+
+def upgrade() -> None:
+    if "blog_related" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "blog_related",
+            sa.Column("blog_id", sa.Integer(), sa.ForeignKey("blogs.id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("rank", sa.Integer(), primary_key=True),
+            sa.Column("related_id", sa.Integer(), sa.ForeignKey("blogs.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("score", sa.Float(), nullable=False),
+        )
+        op.create_index("ix_blog_related_related_id", "blog_related", ["related_id"])
+
+    if SIMILARITY_AVAILABLE:
+        _rebuild_blog_related(op.get_bind())
+    else:
+        logger.warning("未安装 numpy / scipy，跳过相关文章计算")
+
+
+def downgrade() -> None:
+    if "blog_related" in sa.inspect(op.get_bind()).get_table_names():
+        op.drop_table("blog_related")
@@ -0,0 +1,49 @@
+"""内容版本：各内容表的行版本列 version 与表版本表 table_versions
+
+ETag 原先依据只精确到秒的 updated_at，同一秒内的修改无法区分。
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ROW_VERSIONED_TABLES = ("blogs", "photos", "ai_images", "ai_demos", "ai_projects")
+VERSIONED_TABLES = (
+    "blogs", "categories", "tags", "photos", "photo_categories", "ai_images", "ai_demos", "ai_projects",
+)
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    for table in ROW_VERSIONED_TABLES:
+        if "version" not in {column["name"] for column in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+    if "table_versions" not in inspector.get_table_names():
+        table_versions = op.create_table(
+            "table_versions",
+            sa.Column("name", sa.String(64), primary_key=True),
+            sa.Column("version", sa.Integer(), nullable=False),
+        )
+        op.bulk_insert(table_versions, [{"name": name, "version": 0} for name in VERSIONED_TABLES])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "table_versions" in inspector.get_table_names():
+        op.drop_table("table_versions")
+    for table in ROW_VERSIONED_TABLES:
+        if "version" in {column["name"] for column in inspector.get_columns(table)}:
+            op.drop_column(table, "version")
@@ -3,14 +3,28 @@ AI Demo API 路由
 """
 from datetime import datetime
 from typing import List, Optional
+import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response, Request
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.api.dependencies import get_current_active_user
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.http_cache import (
+    PRIVATE_CACHE_CONTROL,
+    apply_cache_headers,
+    collection_version,
+    etag_matches,
+    item_version,
+    make_etag,
+    not_modified,
+    public_cache_control,
+    request_fingerprint,
+)
 from app.models.ai_demo import AIDemo
+from app.models.ai_tag import parse_tags, tag_filter
 from app.models.user import User
 from app.schemas.ai_demo import (
     AIDemo as AIDemoSchema,
@@ -19,42 +33,50 @@ from app.schemas.ai_demo import (
 )
 
 router = APIRouter(prefix="/ai-demos", tags=["AI Demo"])
+logger = logging.getLogger(__name__)
 
 
 @router.get("", response_model=List[AIDemoSchema])
 async def list_ai_demos(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=200),
     is_featured: Optional[bool] = None,
     category: Optional[str] = None,
     published_only: bool = Query(False, description="只返回已发布的 Demo"),
-    db: AsyncSession = Depends(get_db),
+    tags: Optional[str] = Query(None, description="按标签过滤，逗号分隔"),
+    tag_mode: str = Query("any", pattern="^(any|all)$", description="any: 包含任一标签；all: 包含全部标签"),
+    db: AsyncSession = Depends(get_read_db),
     response: Response = None,
 ):
     """获取 AI Demo 列表"""
-    base_query = select(AIDemo)
+    criteria = []
 
     if published_only:
-        base_query = base_query.where(AIDemo.is_published == True)  # noqa: E712
+        criteria.append(AIDemo.is_published == True)  # noqa: E712
 
     if is_featured is not None:
-        base_query = base_query.where(AIDemo.is_featured == is_featured)
-
-    if category:
-        base_query = base_query.where(AIDemo.category == category)
+        criteria.append(AIDemo.is_featured == is_featured)
 
-    # 计算总数
-    count_query = select(func.count(AIDemo.id))
-    if published_only:
-        count_query = count_query.where(AIDemo.is_published == True)  # noqa: E712
-    if is_featured is not None:
-        count_query = count_query.where(AIDemo.is_featured == is_featured)
     if category:
-        count_query = count_query.where(AIDemo.category == category)
-    total_result = await db.execute(count_query)
-    total_count = total_result.scalar() or 0
-
-    query = base_query.order_by(AIDemo.sort_order.asc(), AIDemo.created_at.desc())
+        criteria.append(AIDemo.category == category)
+
+    tag_list = parse_tags(tags)
+    if tag_list:
+        criteria.append(tag_filter(AIDemo, tag_list, match_all=tag_mode == "all"))
+
+    # 版本查询同时给出总数
+    version = await collection_version(db, AIDemo, criteria)
+    total_count = version[0]
+    etag = make_etag("ai_demos", request_fingerprint(request), version)
+    cache_control = public_cache_control() if published_only else PRIVATE_CACHE_CONTROL
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control, {"X-Total-Count": str(total_count)})
+
+    query = select(AIDemo)
+    if criteria:
+        query = query.where(*criteria)
+    query = query.order_by(AIDemo.sort_order.asc(), AIDemo.created_at.desc())
     query = query.offset(skip).limit(limit)
 
     result = await db.execute(query)
@@ -62,14 +84,34 @@ async def list_ai_demos(
 
     if response is not None:
         response.headers["X-Total-Count"] = str(total_count)
+        apply_cache_headers(response, etag, cache_control)
 
     return demos
 
 
 @router.get("/{demo_id}", response_model=AIDemoSchema)
-async def get_ai_demo(demo_id: int, db: AsyncSession = Depends(get_db)):
+async def get_ai_demo(
+    demo_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    response: Response = None,
+):
     """获取单个 Demo"""
     try:
+        version = await item_version(db, AIDemo, demo_id, columns=(AIDemo.is_published,))
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Demo 不存在",
+            )
+
+        # 浏览量不参与 ETag，命中缓存时仍然计数
+        etag = make_etag("ai_demo", demo_id, version)
+        cache_control = public_cache_control() if version[1] else PRIVATE_CACHE_CONTROL
+        if etag_matches(request, etag):
+            await _increment_view_count(db, demo_id)
+            return not_modified(etag, cache_control)
+
         result = await db.execute(select(AIDemo).where(AIDemo.id == demo_id))
         demo = result.scalar_one_or_none()
 
@@ -79,32 +121,43 @@ async def get_ai_demo(demo_id: int, db: AsyncSession = Depends(get_db)):
                 detail="Demo 不存在",
             )
 
-        # 增加浏览量（异步更新，不阻塞返回）
-        try:
-            demo.view_count = (demo.view_count or 0) + 1
-            await db.commit()
-            await db.refresh(demo)
-        except Exception as e:
-            # 如果更新浏览量失败，回滚但不影响返回数据
-            await db.rollback()
-            # 重新查询以获取最新数据
-            result = await db.execute(select(AIDemo).where(AIDemo.id == demo_id))
-            demo = result.scalar_one()
-            print(f"更新浏览量失败，已回滚: {e}")
+        # 增加浏览量（失败时不影响返回数据）
+        if await _increment_view_count(db, demo_id):
+            set_committed_value(demo, "view_count", (demo.view_count or 0) + 1)
+
+        if response is not None:
+            apply_cache_headers(response, etag, cache_control)
 
         return demo
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         error_msg = str(e)
-        traceback.print_exc()
+        logger.exception("获取 Demo 详情失败: %s", demo_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"获取 Demo 详情失败: {error_msg}"
         )
 
 
+async def _increment_view_count(db: AsyncSession, demo_id: int) -> bool:
+    """原子递增浏览量，显式保留 updated_at 以免浏览行为改变内容版本"""
+    try:
+        await db.execute(
+            update(AIDemo)
+            .where(AIDemo.id == demo_id)
+            .values(view_count=func.coalesce(AIDemo.view_count, 0) + 1, updated_at=AIDemo.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return True
+    except Exception as e:
+        # 如果更新浏览量失败，回滚但不影响返回数据
+        await db.rollback()
+        logger.warning("更新浏览量失败，已回滚: %s", e)
+        return False
+
+
 @router.post("", response_model=AIDemoSchema, status_code=status.HTTP_201_CREATED)
 async def create_ai_demo(
     demo_data: AIDemoCreate,
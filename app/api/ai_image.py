@@ -3,15 +3,29 @@ AI Image API 路由
 """
 from typing import List, Optional
 import json
+import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Response, UploadFile, File, Form
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response, Request, UploadFile, File, Form
+from sqlalchemy import select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.api.dependencies import get_current_active_user
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.config import settings
+from app.core.http_cache import (
+    PRIVATE_CACHE_CONTROL,
+    apply_cache_headers,
+    collection_version,
+    etag_matches,
+    item_version,
+    make_etag,
+    not_modified,
+    public_cache_control,
+    request_fingerprint,
+)
 from app.models.ai_image import AIImage
+from app.models.ai_tag import parse_tags, tag_filter
 from app.models.user import User
 from app.schemas.ai_image import (
     AIImage as AIImageSchema,
@@ -20,20 +34,23 @@ from app.schemas.ai_image import (
 )
 from app.utils.oss import oss_service
 from app.services.image_utils import read_image_bytes, generate_image_path
-from sqlalchemy import or_
 
 router = APIRouter(prefix="/ai-images", tags=["AI Image"])
+logger = logging.getLogger(__name__)
 
 
 @router.get("", response_model=List[AIImageSchema])
 async def list_ai_images(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=200),
     is_featured: Optional[bool] = None,
     category: Optional[str] = None,
     published_only: bool = Query(False, description="只返回已发布的图片"),
+    tags: Optional[str] = Query(None, description="按标签过滤，逗号分隔"),
+    tag_mode: str = Query("any", pattern="^(any|all)$", description="any: 包含任一标签；all: 包含全部标签"),
     nsfw_access_code: Optional[str] = Query(None, description="图片访问特殊码"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     response: Response = None,
 ):
     """获取 AI 图片列表"""
@@ -44,73 +61,74 @@ async def list_ai_images(
             show_nsfw = True
     
     # 构建查询条件（用于总数统计和分页查询）
-    base_query = select(AIImage)
+    criteria = []
 
     if published_only:
-        base_query = base_query.where(AIImage.is_published == True)  # noqa: E712
+        criteria.append(AIImage.is_published == True)  # noqa: E712
 
     if is_featured is not None:
-        base_query = base_query.where(AIImage.is_featured == is_featured)
+        criteria.append(AIImage.is_featured == is_featured)
 
     if category:
-        base_query = base_query.where(AIImage.category == category)
+        criteria.append(AIImage.category == category)
 
-    # 根据特殊码决定显示逻辑（只在公开访问时应用过滤）
-    # 后台管理界面不传 published_only，应该能看到所有图片
-    if published_only:
-        if show_nsfw:
-            # 如果提供了正确的访问码，只显示tags包含nsfw的图片
-            base_query = base_query.where(AIImage.tags.contains("nsfw"))
-        else:
-            # 如果没有提供正确的访问码，排除tags包含nsfw的图片
-            base_query = base_query.where(
-                or_(
-                    AIImage.tags.is_(None),
-                    AIImage.tags == "",
-                    ~AIImage.tags.contains("nsfw")
-                )
-            )
+    tag_list = parse_tags(tags)
+    if tag_list:
+        criteria.append(tag_filter(AIImage, tag_list, match_all=tag_mode == "all"))
 
-    # 计算总数
-    count_query = select(func.count(AIImage.id))
-    if published_only:
-        count_query = count_query.where(AIImage.is_published == True)  # noqa: E712
-    if is_featured is not None:
-        count_query = count_query.where(AIImage.is_featured == is_featured)
-    if category:
-        count_query = count_query.where(AIImage.category == category)
     # 根据特殊码决定显示逻辑（只在公开访问时应用过滤）
+    # 后台管理界面不传 published_only，应该能看到所有图片
     if published_only:
-        if show_nsfw:
-            # 如果提供了正确的访问码，只显示tags包含nsfw的图片
-            count_query = count_query.where(AIImage.tags.contains("nsfw"))
-        else:
-            # 如果没有提供正确的访问码，排除tags包含nsfw的图片
-            count_query = count_query.where(
-                or_(
-                    AIImage.tags.is_(None),
-                    AIImage.tags == "",
-                    ~AIImage.tags.contains("nsfw")
-                )
-            )
-    total_result = await db.execute(count_query)
-    total_count = total_result.scalar() or 0
+        # 提供正确的访问码时只显示 NSFW 图片，否则排除
+        criteria.append(AIImage.is_nsfw == show_nsfw)
+
+    # 版本查询同时给出总数
+    version = await collection_version(db, AIImage, criteria)
+    total_count = version[0]
+    etag = make_etag("ai_images", request_fingerprint(request), version)
+    # 带访问码的结果不允许共享缓存
+    cache_control = public_cache_control() if published_only and not nsfw_access_code else PRIVATE_CACHE_CONTROL
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control, {"X-Total-Count": str(total_count)})
 
     # 分页查询
-    query = base_query.order_by(AIImage.created_at.desc()).offset(skip).limit(limit)
+    query = select(AIImage)
+    if criteria:
+        query = query.where(*criteria)
+    query = query.order_by(AIImage.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     images = result.scalars().all()
 
     # 在响应头中添加总数
     if response is not None:
         response.headers["X-Total-Count"] = str(total_count)
+        apply_cache_headers(response, etag, cache_control)
 
     return images
 
 
 @router.get("/{image_id}", response_model=AIImageSchema)
-async def get_ai_image(image_id: int, db: AsyncSession = Depends(get_db)):
+async def get_ai_image(
+    image_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    response: Response = None,
+):
     """获取单张图片"""
+    version = await item_version(db, AIImage, image_id, columns=(AIImage.is_published,))
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="图片不存在",
+        )
+
+    # 浏览量不参与 ETag，命中缓存时仍然计数
+    etag = make_etag("ai_image", image_id, version)
+    cache_control = public_cache_control() if version[1] else PRIVATE_CACHE_CONTROL
+    if etag_matches(request, etag):
+        await _increment_view_count(db, image_id)
+        return not_modified(etag, cache_control)
+
     result = await db.execute(select(AIImage).where(AIImage.id == image_id))
     image = result.scalar_one_or_none()
 
@@ -120,18 +138,30 @@ async def get_ai_image(image_id: int, db: AsyncSession = Depends(get_db)):
             detail="图片不存在",
         )
 
-    # 增加浏览量（异步更新，不阻塞返回）
+    # 增加浏览量（失败时不影响返回数据）
+    if await _increment_view_count(db, image_id):
+        set_committed_value(image, "view_count", (image.view_count or 0) + 1)
+
+    if response is not None:
+        apply_cache_headers(response, etag, cache_control)
+
+    return image
+
+
+async def _increment_view_count(db: AsyncSession, image_id: int) -> bool:
+    """原子递增浏览量，显式保留 updated_at 以免浏览行为改变内容版本"""
     try:
-        image.view_count = (image.view_count or 0) + 1
+        await db.execute(
+            update(AIImage)
+            .where(AIImage.id == image_id)
+            .values(view_count=func.coalesce(AIImage.view_count, 0) + 1, updated_at=AIImage.updated_at)
+            .execution_options(synchronize_session=False)
+        )
         await db.commit()
-        await db.refresh(image)
-    except Exception as e:
+        return True
+    except Exception:
         await db.rollback()
-        # 重新查询
-        result = await db.execute(select(AIImage).where(AIImage.id == image_id))
-        image = result.scalar_one()
-
-    return image
+        return False
 
 
 @router.post("", response_model=AIImageSchema, status_code=status.HTTP_201_CREATED)
@@ -249,7 +279,7 @@ async def update_ai_image(
                 try:
                     oss_service.delete_file(path)
                 except Exception as e:
-                    print(f"删除旧图片失败 ({path}): {e}")
+                    logger.warning("删除旧图片失败 (%s): %s", path, e)
 
     if "thumbnail_url" in update_data and update_data["thumbnail_url"] != db_image.thumbnail_url:
         old_thumb = db_image.thumbnail_url
@@ -259,7 +289,7 @@ async def update_ai_image(
                 try:
                     oss_service.delete_file(path)
                 except Exception as e:
-                    print(f"删除旧缩略图失败 ({path}): {e}")
+                    logger.warning("删除旧缩略图失败 (%s): %s", path, e)
 
     for field, value in update_data.items():
         setattr(db_image, field, value)
@@ -302,7 +332,7 @@ async def delete_ai_image(
                 oss_service.delete_file(path)
             except Exception as e:
                 # 记录错误但不阻止数据库删除
-                print(f"删除OSS文件失败 ({path}): {e}")
+                logger.warning("删除OSS文件失败 (%s): %s", path, e)
 
     await db.delete(db_image)
     await db.commit()
@@ -1,13 +1,26 @@
 """
 AI项目API路由
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, update
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
 from datetime import datetime
-
-from app.core.database import get_db
+import logging
+
+from app.core.database import get_db, get_read_db
+from app.core.http_cache import (
+    PRIVATE_CACHE_CONTROL,
+    apply_cache_headers,
+    collection_version,
+    etag_matches,
+    item_version,
+    make_etag,
+    not_modified,
+    public_cache_control,
+    request_fingerprint,
+)
 from app.api.dependencies import get_current_active_user
 from app.models.user import User
 from app.models.ai_project import AIProject
@@ -18,35 +31,70 @@ from app.schemas.ai_project import (
 )
 
 router = APIRouter(prefix="/ai-projects", tags=["AI项目"])
+logger = logging.getLogger(__name__)
 
 
 @router.get("", response_model=List[AIProjectSchema])
 async def get_ai_projects(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     is_featured: Optional[bool] = None,
     published_only: bool = Query(False, description="是否只返回已发布的项目"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db),
+    response: Response = None
 ):
     """获取AI项目列表"""
-    query = select(AIProject)
+    criteria = []
     
     if published_only:
-        query = query.where(AIProject.is_published == True)
+        criteria.append(AIProject.is_published == True)  # noqa: E712
     
     if is_featured is not None:
-        query = query.where(AIProject.is_featured == is_featured)
+        criteria.append(AIProject.is_featured == is_featured)
     
+    version = await collection_version(db, AIProject, criteria)
+    etag = make_etag("ai_projects", request_fingerprint(request), version)
+    cache_control = public_cache_control() if published_only else PRIVATE_CACHE_CONTROL
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    
+    query = select(AIProject)
+    if criteria:
+        query = query.where(*criteria)
     query = query.order_by(AIProject.created_at.desc()).offset(skip).limit(limit)
     
     result = await db.execute(query)
+    
+    if response is not None:
+        apply_cache_headers(response, etag, cache_control)
+    
     return result.scalars().all()
 
 
 @router.get("/{project_id}", response_model=AIProjectSchema)
-async def get_ai_project(project_id: int, db: AsyncSession = Depends(get_db)):
+async def get_ai_project(
+    project_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    response: Response = None
+):
     """获取单个AI项目"""
     try:
+        version = await item_version(db, AIProject, project_id, columns=(AIProject.is_published,))
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="AI项目不存在"
+            )
+        
+        # 浏览量不参与 ETag，命中缓存时仍然计数
+        etag = make_etag("ai_project", project_id, version)
+        cache_control = public_cache_control() if version[1] else PRIVATE_CACHE_CONTROL
+        if etag_matches(request, etag):
+            await _increment_view_count(db, project_id)
+            return not_modified(etag, cache_control)
+        
         result = await db.execute(select(AIProject).where(AIProject.id == project_id))
         project = result.scalar_one_or_none()
         
@@ -56,32 +104,43 @@ async def get_ai_project(project_id: int, db: AsyncSession = Depends(get_db)):
                 detail="AI项目不存在"
             )
         
-        # 增加浏览量（异步更新，不阻塞返回）
-        try:
-            project.view_count = (project.view_count or 0) + 1
-            await db.commit()
-            await db.refresh(project)
-        except Exception as e:
-            # 如果更新浏览量失败，回滚但不影响返回数据
-            await db.rollback()
-            # 重新查询以获取最新数据
-            result = await db.execute(select(AIProject).where(AIProject.id == project_id))
-            project = result.scalar_one()
-            print(f"更新浏览量失败，已回滚: {e}")
+        # 增加浏览量（失败时不影响返回数据）
+        if await _increment_view_count(db, project_id):
+            set_committed_value(project, "view_count", (project.view_count or 0) + 1)
+        
+        if response is not None:
+            apply_cache_headers(response, etag, cache_control)
         
         return project
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         error_msg = str(e)
-        traceback.print_exc()
+        logger.exception("获取项目详情失败: %s", project_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"获取项目详情失败: {error_msg}"
         )
 
 
+async def _increment_view_count(db: AsyncSession, project_id: int) -> bool:
+    """原子递增浏览量，显式保留 updated_at 以免浏览行为改变内容版本"""
+    try:
+        await db.execute(
+            update(AIProject)
+            .where(AIProject.id == project_id)
+            .values(view_count=func.coalesce(AIProject.view_count, 0) + 1, updated_at=AIProject.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return True
+    except Exception as e:
+        # 如果更新浏览量失败，回滚但不影响返回数据
+        await db.rollback()
+        logger.warning("更新浏览量失败，已回滚: %s", e)
+        return False
+
+
 @router.post("", response_model=AIProjectSchema, status_code=status.HTTP_201_CREATED)
 async def create_ai_project(
     project_data: AIProjectCreate,
@@ -1,21 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from datetime import timedelta
+from datetime import datetime, timedelta
+from typing import Optional
 from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import (
+    verify_password_async, get_password_hash_async, create_access_token,
+    create_refresh_token, decode_refresh_token,
+)
 from app.core.config import settings
+from app.core.metrics import LOGIN_ATTEMPTS
+from app.core.rate_limit import ConcurrencyLimiter, RateLimiter, client_ip, enforce
+from app.core import token_store
 from app.models.user import User
-from app.schemas.user import UserCreate, UserLogin, Token, User as UserSchema
+from app.schemas.user import UserCreate, UserLogin, Token, RefreshTokenRequest, User as UserSchema
 from app.api.dependencies import get_current_active_user
 
 router = APIRouter(prefix="/auth", tags=["认证"])
 
+# 密码哈希开销大，登录/注册先按IP和用户名限流，再限制同时进行的哈希计算数
+_ip_limiter = RateLimiter(settings.LOGIN_RATE_LIMIT_PER_IP, settings.LOGIN_RATE_LIMIT_WINDOW)
+_username_limiter = RateLimiter(settings.LOGIN_RATE_LIMIT_PER_USERNAME, settings.LOGIN_RATE_LIMIT_WINDOW)
+_hash_limiter = ConcurrencyLimiter(settings.LOGIN_MAX_CONCURRENCY, settings.LOGIN_QUEUE_TIMEOUT)
+
 
 @router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
+async def register(request: Request, user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """用户注册"""
+    enforce(_ip_limiter, client_ip(request))
+    
     # 检查用户名是否已存在
     result = await db.execute(select(User).where(User.username == user_data.username))
     if result.scalar_one_or_none():
@@ -33,7 +47,8 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         )
     
     # 创建新用户
-    hashed_password = get_password_hash(user_data.password)
+    async with _hash_limiter.slot():
+        hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -50,10 +65,18 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
 
 @router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
     """用户登录"""
+    try:
+        enforce(_ip_limiter, client_ip(request))
+        enforce(_username_limiter, form_data.username.strip().lower())
+    except HTTPException:
+        LOGIN_ATTEMPTS.labels("rate_limited").inc()
+        raise
+    
     # 查找用户（支持用户名或邮箱登录）
     result = await db.execute(
         select(User).where(
@@ -62,7 +85,17 @@ async def login(
     )
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    password_ok = False
+    if user:
+        try:
+            async with _hash_limiter.slot():
+                password_ok = await verify_password_async(form_data.password, user.hashed_password)
+        except HTTPException:
+            LOGIN_ATTEMPTS.labels("overloaded").inc()
+            raise
+    
+    if not password_ok:
+        LOGIN_ATTEMPTS.labels("failure").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
@@ -70,18 +103,79 @@ async def login(
         )
     
     if not user.is_active:
+        LOGIN_ATTEMPTS.labels("inactive").inc()
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="用户已被禁用"
         )
     
-    # 创建访问令牌
+    LOGIN_ATTEMPTS.labels("success").inc()
+    
+    return _issue_tokens(user.username)
+
+
+def _issue_tokens(username: str, family: Optional[str] = None) -> dict:
+    """签发访问令牌和刷新令牌"""
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": username}, expires_delta=access_token_expires
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": create_refresh_token(username, family),
+        "expires_in": int(access_token_expires.total_seconds()),
+    }
+
+
+def _family_expiry() -> datetime:
+    # 家族内最晚签发的刷新令牌也会在该时间之前过期
+    return datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_token(data: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    """使用刷新令牌换取新的令牌对（刷新令牌一次性使用，无需校验密码）"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="刷新令牌无效或已过期",
+        headers={"WWW-Authenticate": "Bearer"},
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    payload = decode_refresh_token(data.refresh_token)
+    if payload is None:
+        raise credentials_exception
+    
+    jti, family = payload["jti"], payload["fam"]
+    if await token_store.is_revoked(db, jti, family):
+        # 已轮换过的令牌再次出现，说明令牌可能泄露，吊销整个家族
+        await token_store.revoke(db, family, _family_expiry())
+        raise credentials_exception
+    
+    result = await db.execute(select(User.is_active).where(User.username == payload["sub"]))
+    is_active = result.scalar_one_or_none()
+    if is_active is None:
+        raise credentials_exception
+    if not is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="用户已被禁用"
+        )
+    
+    # 主键冲突说明同一令牌被并发使用，只有一个请求能轮换成功
+    if not await token_store.revoke(db, jti, datetime.utcfromtimestamp(payload["exp"])):
+        await token_store.revoke(db, family, _family_expiry())
+        raise credentials_exception
+    
+    return _issue_tokens(payload["sub"], family)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(data: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    """注销：吊销刷新令牌所属的整个家族（访问令牌在短有效期后自然失效）"""
+    payload = decode_refresh_token(data.refresh_token)
+    if payload is not None:
+        await token_store.revoke(db, payload["fam"], _family_expiry())
 
 
 @router.get("/me", response_model=UserSchema)
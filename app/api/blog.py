@@ -1,20 +1,38 @@
 """
 博客API路由
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, update
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.cache import response_cache
+from app.core.http_cache import (
+    PRIVATE_CACHE_CONTROL,
+    apply_cache_headers,
+    collection_version,
+    etag_matches,
+    item_version,
+    make_etag,
+    not_modified,
+    public_cache_control,
+    request_fingerprint,
+)
 from app.api.dependencies import get_current_active_user
+from app.utils.plain_text import normalize_search_text
 from app.models.user import User
-from app.models.blog import Blog, Category, Tag
+from app.models.blog import (
+    Blog, Category, Tag, current_render_version, needs_render, rendered_values, summary_options,
+)
+from app.models.blog_related import RELATED_LIMIT, BlogRelated
 from app.schemas.blog import (
-    Blog as BlogSchema,
     BlogCreate,
+    BlogDetail,
+    BlogSummary,
     BlogUpdate,
     Category as CategorySchema,
     CategoryCreate,
@@ -27,10 +45,15 @@ router = APIRouter(prefix="/blogs", tags=["博客"])
 
 # ========== 博客分类管理 ==========
 @router.get("/categories", response_model=List[CategorySchema])
-async def get_categories(db: AsyncSession = Depends(get_db)):
+async def get_categories(request: Request, db: AsyncSession = Depends(get_read_db)):
     """获取所有分类"""
+    cached = response_cache.get("blog_categories", request)
+    if cached is not None:
+        return cached.to_response(request)
+    
     result = await db.execute(select(Category).order_by(Category.created_at))
-    return result.scalars().all()
+    categories = [CategorySchema.model_validate(c) for c in result.scalars().all()]
+    return response_cache.store("blog_categories", request, categories).to_response(request)
 
 
 @router.post("/categories", response_model=CategorySchema, status_code=status.HTTP_201_CREATED)
@@ -112,10 +135,15 @@ async def delete_category(
 
 # ========== 标签管理 ==========
 @router.get("/tags", response_model=List[TagSchema])
-async def get_tags(db: AsyncSession = Depends(get_db)):
+async def get_tags(request: Request, db: AsyncSession = Depends(get_read_db)):
     """获取所有标签"""
+    cached = response_cache.get("blog_tags", request)
+    if cached is not None:
+        return cached.to_response(request)
+    
     result = await db.execute(select(Tag).order_by(Tag.created_at))
-    return result.scalars().all()
+    tags = [TagSchema.model_validate(t) for t in result.scalars().all()]
+    return response_cache.store("blog_tags", request, tags).to_response(request)
 
 
 @router.post("/tags", response_model=TagSchema, status_code=status.HTTP_201_CREATED)
@@ -196,62 +224,54 @@ async def delete_tag(
 
 
 # ========== 博客文章管理 ==========
-@router.get("", response_model=List[BlogSchema])
+@router.get("", response_model=List[BlogSummary])
 async def get_blogs(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     category_id: Optional[int] = None,
     tag_id: Optional[int] = None,
     search: Optional[str] = None,
     published_only: bool = Query(False, description="是否只返回已发布的文章"),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     response: Response = None
 ):
     """获取博客列表"""
-    query = select(Blog).options(
-        selectinload(Blog.category),
-        selectinload(Blog.tags)
-    )
-    
-    # 过滤条件
+    # 过滤条件（总数统计和分页查询共用）
+    criteria = []
+    joins = []
     if published_only:
-        query = query.where(Blog.is_published == True)
+        criteria.append(Blog.is_published == True)  # noqa: E712
     
     if category_id:
-        query = query.where(Blog.category_id == category_id)
+        criteria.append(Blog.category_id == category_id)
     
     if tag_id:
-        query = query.join(Blog.tags).where(Tag.id == tag_id)
+        joins.append(Blog.tags)
+        criteria.append(Tag.id == tag_id)
     
     if search:
-        query = query.where(
-            or_(
-                Blog.title.contains(search),
-                Blog.content.contains(search),
-                Blog.excerpt.contains(search)
-            )
-        )
+        # search_text 已包含标题、摘要与正文纯文本，并做了同样的规范化
+        criteria.append(Blog.search_text.contains(normalize_search_text(search)))
     
-    # 计算总数
-    count_query = select(func.count(Blog.id))
-    if published_only:
-        count_query = count_query.where(Blog.is_published == True)
-    if category_id:
-        count_query = count_query.where(Blog.category_id == category_id)
-    if tag_id:
-        count_query = count_query.join(Blog.tags).where(Tag.id == tag_id)
-    if search:
-        count_query = count_query.where(
-            or_(
-                Blog.title.contains(search),
-                Blog.content.contains(search),
-                Blog.excerpt.contains(search)
-            )
-        )
-    total_result = await db.execute(count_query)
-    total_count = total_result.scalar() or 0
+    # 版本查询同时给出总数，命中 If-None-Match 时无需读取任何文章数据
+    version = await collection_version(db, Blog, criteria, joins, related=(Category, Tag))
+    total_count = version[0]
+    etag = make_etag("blogs", request_fingerprint(request), version)
+    cache_control = public_cache_control() if published_only else PRIVATE_CACHE_CONTROL
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control, {"X-Total-Count": str(total_count)})
     
     # 分页查询
+    query = select(Blog).options(
+        selectinload(Blog.category),
+        selectinload(Blog.tags),
+        *summary_options(),
+    )
+    for join in joins:
+        query = query.join(join)
+    if criteria:
+        query = query.where(*criteria)
     query = query.order_by(Blog.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     blogs = result.scalars().unique().all()
@@ -259,13 +279,34 @@ async def get_blogs(
     # 在响应头中添加总数
     if response is not None:
         response.headers["X-Total-Count"] = str(total_count)
+        apply_cache_headers(response, etag, cache_control)
     
     return blogs
 
 
-@router.get("/{blog_id}", response_model=BlogSchema)
-async def get_blog(blog_id: int, db: AsyncSession = Depends(get_db)):
+@router.get("/{blog_id}", response_model=BlogDetail)
+async def get_blog(
+    blog_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    response: Response = None
+):
     """获取单篇博客"""
+    version = await item_version(db, Blog, blog_id, columns=(Blog.is_published,), related=(Category, Tag))
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="博客不存在"
+        )
+    
+    # 浏览量不参与 ETag，命中缓存时仍然计数；
+    # 渲染规则变化后按需重新渲染不改变行版本，content_html 的变化由渲染规则版本体现
+    etag = make_etag("blog", blog_id, current_render_version(), version)
+    cache_control = public_cache_control() if version[1] else PRIVATE_CACHE_CONTROL
+    if etag_matches(request, etag):
+        await _increment_view_count(db, blog_id)
+        return not_modified(etag, cache_control)
+    
     result = await db.execute(
         select(Blog)
         .options(selectinload(Blog.category), selectinload(Blog.tags))
@@ -279,15 +320,68 @@ async def get_blog(blog_id: int, db: AsyncSession = Depends(get_db)):
             detail="博客不存在"
         )
     
+    # 升级前保存的文章（或渲染规则变化后）在首次访问时渲染并写回，随浏览量一起提交
+    if needs_render(blog):
+        await _store_rendered(db, blog)
+    
     # 增加浏览量
-    blog.view_count += 1
-    await db.commit()
-    await db.refresh(blog)
+    await _increment_view_count(db, blog_id)
+    set_committed_value(blog, "view_count", (blog.view_count or 0) + 1)
+    
+    if response is not None:
+        apply_cache_headers(response, etag, cache_control)
     
     return blog
 
 
-@router.post("", response_model=BlogSchema, status_code=status.HTTP_201_CREATED)
+@router.get("/{blog_id}/related", response_model=List[BlogSummary])
+async def get_related_blogs(
+    blog_id: int,
+    request: Request,
+    limit: int = Query(RELATED_LIMIT, ge=1, le=RELATED_LIMIT),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """相关文章（预先计算，按相关度排序，只含已发布文章）"""
+    cached = response_cache.get("blog_related", request)
+    if cached is not None:
+        return cached.to_response(request)
+    
+    result = await db.execute(
+        select(Blog)
+        .options(selectinload(Blog.category), selectinload(Blog.tags), *summary_options())
+        .join(BlogRelated, BlogRelated.related_id == Blog.id)
+        .where(BlogRelated.blog_id == blog_id, BlogRelated.rank < limit, Blog.is_published == True)  # noqa: E712
+        .order_by(BlogRelated.rank)
+    )
+    blogs = [BlogSummary.model_validate(blog) for blog in result.scalars().unique().all()]
+    return response_cache.store("blog_related", request, blogs).to_response(request)
+
+
+async def _store_rendered(db: AsyncSession, blog: Blog):
+    """写回渲染结果，显式保留 updated_at：渲染是派生数据，不改变内容版本"""
+    values = rendered_values(blog.content)
+    await db.execute(
+        update(Blog)
+        .where(Blog.id == blog.id)
+        .values(**values, updated_at=Blog.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    for column, value in values.items():
+        set_committed_value(blog, column, value)
+
+
+async def _increment_view_count(db: AsyncSession, blog_id: int):
+    """原子递增浏览量，显式保留 updated_at 以免浏览行为改变内容版本"""
+    await db.execute(
+        update(Blog)
+        .where(Blog.id == blog_id)
+        .values(view_count=func.coalesce(Blog.view_count, 0) + 1, updated_at=Blog.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+@router.post("", response_model=BlogDetail, status_code=status.HTTP_201_CREATED)
 async def create_blog(
     blog_data: BlogCreate,
     db: AsyncSession = Depends(get_db),
@@ -345,7 +439,7 @@ async def create_blog(
     return result.scalar_one()
 
 
-@router.put("/{blog_id}", response_model=BlogSchema)
+@router.put("/{blog_id}", response_model=BlogDetail)
 async def update_blog(
     blog_id: int,
     blog_data: BlogUpdate,
@@ -409,6 +503,8 @@ async def update_blog(
                     detail="部分标签不存在"
                 )
             db_blog.tags = tags
+            # 仅修改标签不会更新博客行，手动刷新 updated_at 使 ETag 失效
+            db_blog.updated_at = func.now()
     
     # 处理发布状态
     if "is_published" in update_data:
@@ -1,6 +1,12 @@
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.models.user import User
@@ -8,6 +14,57 @@ from sqlalchemy import select
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+# 当前用户缓存（key: 令牌中的用户名），缓存的是列值快照而不是ORM实例
+# 只在本进程内失效：多 worker 部署时，其他 worker 要等 AUTH_CACHE_TTL 过期才能看到禁用、删除等修改
+_user_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL, name="current_user")
+# 每次失效递增；读库前记下，写回缓存时若已变化说明期间有修改提交，读到的可能是旧数据，不写回
+_user_cache_generation = 0
+_USER_COLUMNS = tuple(column.key for column in User.__table__.columns)
+
+
+def _snapshot_user(user: User) -> dict:
+    return {key: getattr(user, key) for key in _USER_COLUMNS}
+
+
+def _restore_user(data: dict) -> User:
+    """还原为游离态实例，每个请求拿到独立对象，误加入会话也不会触发INSERT"""
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
+
+
+def invalidate_user_cache(username: Optional[str] = None) -> None:
+    """使用户缓存失效；不传用户名时清空全部（例如批量禁用用户后调用）"""
+    global _user_cache_generation
+    _user_cache_generation += 1
+    if username is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(username)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_user(mapper, connection, target: User) -> None:
+    # flush 时只记录，提交后再失效：提交前其他请求读到的仍是旧数据，此时失效会被立即重新缓存
+    state = inspect(target)
+    if state.session is None:
+        return
+    # 用户名被修改时，旧用户名对应的缓存同样需要失效
+    pending = state.session.info.setdefault("user_cache_invalidate", set())
+    pending.update((*state.attrs.username.history.deleted, target.username))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for username in session.info.pop("user_cache_invalidate", ()):
+        invalidate_user_cache(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop("user_cache_invalidate", None)
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -21,18 +78,29 @@ async def get_current_user(
     )
     
     payload = decode_access_token(token)
-    if payload is None:
+    if payload is None or payload.get("type", "access") != "access":
         raise credentials_exception
     
     username: str = payload.get("sub")
     if username is None:
         raise credentials_exception
     
-    result = await db.execute(select(User).where(User.username == username))
-    user = result.scalar_one_or_none()
+    # 记录到会话中，提交写入后该用户短时间内的读请求会路由到主库
+    db.info["username"] = username
     
-    if user is None:
-        raise credentials_exception
+    cached = _user_cache.get(username)
+    if cached is not None:
+        user = _restore_user(cached)
+    else:
+        generation = _user_cache_generation
+        result = await db.execute(select(User).where(User.username == username))
+        user = result.scalar_one_or_none()
+        
+        if user is None:
+            raise credentials_exception
+        
+        if generation == _user_cache_generation:
+            _user_cache.set(username, _snapshot_user(user))
     
     if not user.is_active:
         raise HTTPException(
@@ -0,0 +1,157 @@
+"""
+RSS 订阅与站点地图API路由
+"""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Hashable, List, Tuple
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+
+from app.core.cache import CachedResponse, TTLCache
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.http_cache import (
+    apply_cache_headers,
+    etag_matches,
+    http_date,
+    make_etag,
+    not_modified,
+    not_modified_since,
+    public_cache_control,
+)
+from app.services.feeds import (
+    PAGES_SECTION,
+    SITEMAP_SECTIONS,
+    content_version,
+    last_modified,
+    page_count,
+    render_feed,
+    render_sitemap,
+    render_sitemap_page,
+    section_count,
+)
+
+router = APIRouter(tags=["订阅"])
+logger = logging.getLogger(__name__)
+
+RSS_MEDIA_TYPE = "application/rss+xml; charset=utf-8"
+XML_MEDIA_TYPE = "application/xml; charset=utf-8"
+
+# 生成的文档按内容版本（ETag）缓存，不设过期时间：内容写入改变版本后才会重新生成
+_documents = TTLCache(maxsize=settings.FEED_CACHE_MAX_ENTRIES, ttl=float("inf"), name="feed")
+# 流式输出时在生成器内打开的只读会话（与 get_read_db 的副本选择规则相同）
+_read_session = asynccontextmanager(get_read_db)
+
+
+def _site_url(request: Request) -> str:
+    """
+    文档中链接使用的前台地址：优先 SITE_URL（生产环境应设置）；
+    未设置时只接受 CORS_ORIGINS 中的地址（请求地址在其中时使用，否则取第一个），
+    客户端不能通过任意 Host 头改变文档中的链接，或用不同的 Host 挤出文档缓存
+    """
+    if settings.SITE_URL:
+        return settings.SITE_URL.rstrip("/")
+    origins = [origin.rstrip("/") for origin in settings.CORS_ORIGINS if origin != "*"]
+    origin = f"{request.url.scheme}://{request.url.netloc}"
+    if origin in origins:
+        return origin
+    if origins:
+        return origins[0]
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未配置 SITE_URL")
+
+
+async def _serve(
+    request: Request,
+    db: AsyncSession,
+    media_type: str,
+    render: Callable[[AsyncSession, str, Tuple], AsyncIterator[bytes]],
+    stream: bool = False,
+) -> Response:
+    """
+    条件请求直接返回 304；缓存的文档版本一致时直接返回（含预压缩结果）；
+    否则生成文档：stream 为 False 时生成完再返回并写入缓存（使用请求的会话）；
+    为 True 时流式输出，在生成器内另开只读会话（响应开始前请求依赖的会话可能已关闭），
+    输出完成后在后台写入缓存
+    """
+    version = await content_version(db)
+    site = _site_url(request)
+    etag = make_etag(request.url.path, site, version)
+    modified = last_modified(version)
+    headers: Dict[str, str] = {"Last-Modified": http_date(modified)} if modified else {}
+    cache_control = public_cache_control()
+    if etag_matches(request, etag) or not_modified_since(request, modified):
+        return not_modified(etag, cache_control, headers)
+
+    key: Hashable = (request.url.path, site)
+    cached = _documents.get(key)
+    if cached is not None and cached.etag == etag:
+        return cached.to_response(request, cache_control, headers)
+
+    if not stream:
+        body = b"".join([chunk async for chunk in render(db, site, version)])
+        entry = await run_in_threadpool(CachedResponse.build, body, media_type, etag)
+        _documents.set(key, entry)
+        return entry.to_response(request, cache_control, headers)
+
+    chunks: List[bytes] = []
+    completed = False
+
+    async def generate() -> AsyncIterator[bytes]:
+        nonlocal completed
+        async with _read_session(request) as session:
+            async for chunk in render(session, site, version):
+                chunks.append(chunk)
+                yield chunk
+        completed = True
+
+    async def store() -> None:
+        # 客户端中途断开时不缓存不完整的文档
+        if completed:
+            entry = await run_in_threadpool(CachedResponse.build, b"".join(chunks), media_type, etag)
+            _documents.set(key, entry)
+
+    response = StreamingResponse(generate(), media_type=media_type, headers=headers, background=BackgroundTask(store))
+    apply_cache_headers(response, etag, cache_control)
+    return response
+
+
+@router.get("/feed.xml", response_class=Response)
+async def get_feed(request: Request, db: AsyncSession = Depends(get_read_db)):
+    """RSS 2.0：最新发布的博客、摄影作品、AI 演示与 AI 项目"""
+    return await _serve(
+        request, db, RSS_MEDIA_TYPE,
+        lambda session, site, version: render_feed(session, site, last_modified(version)),
+    )
+
+
+@router.get("/sitemap.xml", response_class=Response)
+async def get_sitemap(request: Request, db: AsyncSession = Depends(get_read_db)):
+    """站点地图；URL 超过 SITEMAP_MAX_URLS 时为索引，指向 /sitemap-{分区}-{页码}.xml"""
+    return await _serve(
+        request, db, XML_MEDIA_TYPE,
+        lambda session, site, version: render_sitemap(session, site, version),
+        stream=True,
+    )
+
+
+@router.get("/sitemap-{section}-{page}.xml", response_class=Response)
+async def get_sitemap_page(
+    request: Request,
+    section: str,
+    page: int = Path(..., ge=1),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """站点地图索引中的分页"""
+    if section != PAGES_SECTION and section not in SITEMAP_SECTIONS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="站点地图不存在")
+    if page > page_count(await section_count(db, section)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="站点地图不存在")
+    return await _serve(
+        request, db, XML_MEDIA_TYPE,
+        lambda session, site, version: render_sitemap_page(session, site, version, section, page),
+        stream=True,
+    )
@@ -2,28 +2,31 @@
 首页API路由
 用于获取首页展示数据
 """
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
+import logging
 import random
 
-from app.core.database import get_db
-from app.models.blog import Blog
+from app.core.database import get_read_db
+from app.core.cache import response_cache
+from app.models.blog import Blog, summary_options
 from app.models.photo import Photo
 from app.models.ai_demo import AIDemo
 from app.models.ai_project import AIProject
-from app.schemas.blog import Blog as BlogSchema
+from app.schemas.blog import BlogSummary
 from app.schemas.photo import Photo as PhotoSchema
 from app.schemas.ai_demo import AIDemo as AIDemoSchema
 
 router = APIRouter(prefix="/home", tags=["首页"])
+logger = logging.getLogger(__name__)
 
 
 class HomeOverviewResponse(BaseModel):
-    blogs: List[BlogSchema]
+    blogs: List[BlogSummary]
     photos: List[PhotoSchema]
     projects: List[AIDemoSchema]
     stats: Dict[str, int]
@@ -31,17 +34,23 @@ class HomeOverviewResponse(BaseModel):
 
 @router.get("/overview", response_model=HomeOverviewResponse)
 async def get_home_overview(
+    request: Request,
     blog_limit: int = Query(6, ge=1, le=20, description="博客数量"),
     photo_limit: int = Query(8, ge=1, le=20, description="随机图片数量"),
     project_limit: int = Query(4, ge=1, le=10, description="AI项目数量"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """获取首页概览数据"""
+    """获取首页概览数据（结果及其压缩版本会被短暂缓存）"""
+    cached = response_cache.get("home", request)
+    if cached is not None:
+        return cached.to_response(request)
+    
     try:
         # 获取最新发布的博客
         blog_query = select(Blog).options(
             selectinload(Blog.category),
-            selectinload(Blog.tags)
+            selectinload(Blog.tags),
+            *summary_options(),
         ).where(Blog.is_published == True)  # noqa: E712
         # 按created_at排序（已发布的文章通常published_at也会有值，但为兼容性使用created_at）
         blog_query = blog_query.order_by(Blog.created_at.desc()).limit(blog_limit)
@@ -98,16 +107,15 @@ async def get_home_overview(
             "project_count": project_count,
         }
         
-        return HomeOverviewResponse(
+        overview = HomeOverviewResponse(
             blogs=blogs,
             photos=photos,
             projects=projects,
             stats=stats_dict
         )
+        return response_cache.store("home", request, overview).to_response(request)
     except Exception as e:
-        import traceback
-        print(f"Error in get_home_overview: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("获取首页数据失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"获取首页数据失败: {str(e)}"
@@ -117,7 +125,7 @@ async def get_home_overview(
 @router.get("/random-photos", response_model=List[PhotoSchema])
 async def get_random_photos(
     limit: int = Query(8, ge=1, le=20, description="随机图片数量"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """获取随机图片"""
     try:
@@ -137,9 +145,7 @@ async def get_random_photos(
         
         return photos
     except Exception as e:
-        import traceback
-        print(f"Error in get_random_photos: {str(e)}")
-        print(traceback.format_exc())
+        logger.exception("获取随机图片失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"获取随机图片失败: {str(e)}"
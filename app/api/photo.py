@@ -1,18 +1,33 @@
 """
 摄影作品API路由
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, and_, or_
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime, time, timedelta
+import base64
 import json
-
-from app.core.database import get_db
+import logging
+
+from app.core.database import get_db, get_read_db
+from app.core.cache import response_cache
+from app.core.http_cache import (
+    apply_cache_headers,
+    collection_version,
+    etag_matches,
+    item_version,
+    make_etag,
+    not_modified,
+    public_cache_control,
+    request_fingerprint,
+)
 from app.api.dependencies import get_current_active_user
 from app.models.user import User
 from app.models.photo import Photo, PhotoCategory
+from app.models.photo_timeline import PhotoDay
 from app.schemas.photo import (
     Photo as PhotoSchema,
     PhotoCreate,
@@ -20,18 +35,27 @@ from app.schemas.photo import (
     PhotoCategory as PhotoCategorySchema,
     PhotoCategoryCreate
 )
+from app.utils.geo import gps_from_exif
 from app.utils.oss import oss_service
 from app.services.image_utils import read_image_bytes, generate_image_path
+from app.services.photo_facets import FOCAL_BUCKETS, ISO_BUCKETS, PhotoFilters, bucket_pattern, compute_facets
+from app.services.photo_map import BoundingBox, cluster_photos
 
 router = APIRouter(prefix="/photos", tags=["摄影作品"])
+logger = logging.getLogger(__name__)
 
 
 # ========== 摄影分类管理 ==========
 @router.get("/categories", response_model=List[PhotoCategorySchema])
-async def get_photo_categories(db: AsyncSession = Depends(get_db)):
+async def get_photo_categories(request: Request, db: AsyncSession = Depends(get_read_db)):
     """获取所有摄影分类"""
+    cached = response_cache.get("photo_categories", request)
+    if cached is not None:
+        return cached.to_response(request)
+    
     result = await db.execute(select(PhotoCategory).order_by(PhotoCategory.created_at))
-    return result.scalars().all()
+    categories = [PhotoCategorySchema.model_validate(c) for c in result.scalars().all()]
+    return response_cache.store("photo_categories", request, categories).to_response(request)
 
 
 @router.post("/categories", response_model=PhotoCategorySchema, status_code=status.HTTP_201_CREATED)
@@ -120,50 +144,263 @@ async def delete_photo_category(
 
 
 # ========== 摄影作品管理 ==========
+def _photo_filters(
+    category_id: Optional[int] = None,
+    is_featured: Optional[bool] = None,
+    make: Optional[str] = Query(None, description="相机品牌"),
+    model: Optional[str] = Query(None, description="相机型号"),
+    focal: Optional[str] = Query(None, pattern=bucket_pattern(FOCAL_BUCKETS), description="焦段"),
+    aperture: Optional[float] = Query(None, gt=0, description="光圈 f 值"),
+    iso: Optional[str] = Query(None, pattern=bucket_pattern(ISO_BUCKETS), description="ISO 区间"),
+    year: Optional[int] = Query(None, ge=1900, le=2100, description="拍摄年份"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="拍摄月份（需同时指定年份）"),
+) -> PhotoFilters:
+    if month and not year:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="按月份过滤时需要指定年份")
+    return PhotoFilters(
+        category_id=category_id,
+        is_featured=is_featured,
+        make=make,
+        model=model,
+        focal=focal,
+        aperture=aperture,
+        iso=iso,
+        year=year,
+        month=month,
+    )
+
+
 @router.get("", response_model=List[PhotoSchema])
 async def get_photos(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    category_id: Optional[int] = None,
-    is_featured: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db),
+    filters: PhotoFilters = Depends(_photo_filters),
+    db: AsyncSession = Depends(get_read_db),
     response: Response = None
 ):
-    """获取摄影作品列表"""
+    """获取摄影作品列表（可按分类、精选及 EXIF 分面过滤）"""
     # 构建查询条件（用于总数统计和分页查询）
-    base_query = select(Photo).options(selectinload(Photo.category))
-    
-    if category_id:
-        base_query = base_query.where(Photo.category_id == category_id)
-    
-    if is_featured is not None:
-        base_query = base_query.where(Photo.is_featured == is_featured)
+    criteria = filters.criteria()
     
-    # 计算总数
-    count_query = select(func.count(Photo.id))
-    if category_id:
-        count_query = count_query.where(Photo.category_id == category_id)
-    if is_featured is not None:
-        count_query = count_query.where(Photo.is_featured == is_featured)
-    total_result = await db.execute(count_query)
-    total_count = total_result.scalar() or 0
+    # 版本查询同时给出总数
+    version = await collection_version(db, Photo, criteria, related=(PhotoCategory,))
+    total_count = version[0]
+    etag = make_etag("photos", request_fingerprint(request), version)
+    cache_control = public_cache_control()
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control, {"X-Total-Count": str(total_count)})
     
     # 分页查询
-    query = base_query.order_by(Photo.created_at.desc()).offset(skip).limit(limit)
+    query = select(Photo).options(selectinload(Photo.category))
+    if criteria:
+        query = query.where(*criteria)
+    query = query.order_by(Photo.created_at.desc()).offset(skip).limit(limit)
     result = await db.execute(query)
     photos = result.scalars().all()
     
     # 在响应头中添加总数
     if response is not None:
         response.headers["X-Total-Count"] = str(total_count)
+        apply_cache_headers(response, etag, cache_control)
     
     return photos
 
 
+@router.get("/facets")
+async def get_photo_facets(
+    request: Request,
+    filters: PhotoFilters = Depends(_photo_filters),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    图库分面统计：相机、焦段、光圈、ISO 区间、拍摄年月及数量
+    过滤参数与作品列表相同；结果缓存到下一次作品写入
+    """
+    cached = response_cache.get("photo_facets", request)
+    if cached is not None:
+        return cached.to_response(request)
+
+    facets = await compute_facets(db, filters)
+    return response_cache.store("photo_facets", request, facets).to_response(request)
+
+
+def _bucket_range(bucket: str) -> Tuple[date, date]:
+    """"2024" / "2024-05" / "2024-05-17" -> [开始日期, 结束日期)"""
+    try:
+        parts = [int(part) for part in bucket.split("-")]
+        if len(parts) == 1:
+            return date(parts[0], 1, 1), date(parts[0] + 1, 1, 1)
+        if len(parts) == 2:
+            year, month = parts
+            return date(year, month, 1), date(year + month // 12, month % 12 + 1, 1)
+        if len(parts) == 3:
+            start = date(*parts)
+            return start, start + timedelta(days=1)
+    except ValueError:
+        pass
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="时间段格式应为 YYYY、YYYY-MM 或 YYYY-MM-DD")
+
+
+def _encode_timeline_cursor(photo: Photo) -> str:
+    raw = f"{photo.shoot_time.isoformat()}|{photo.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_timeline_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        shoot_time, photo_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(shoot_time), int(photo_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的分页游标")
+
+
+@router.get("/timeline")
+async def get_photo_timeline(
+    request: Request,
+    granularity: str = Query("month", pattern="^(year|month|day)$", description="按年 / 月 / 日汇总"),
+    year: Optional[int] = Query(None, ge=1900, le=2100, description="只返回该年的数据"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="只返回该月的数据（需同时指定年份）"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    按拍摄时间汇总的作品数与封面（时间倒序），数据来自按日预计算的 photo_days
+    按日汇总时需要指定年份
+    """
+    if month and not year:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="按月份过滤时需要指定年份")
+    if granularity == "day" and not year:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="按日汇总时需要指定年份")
+
+    cached = response_cache.get("photo_timeline", request)
+    if cached is not None:
+        return cached.to_response(request)
+
+    query = select(PhotoDay).order_by(PhotoDay.day.desc())
+    if year:
+        start, end = _bucket_range(f"{year}-{month}" if month else str(year))
+        query = query.where(PhotoDay.day >= start, PhotoDay.day < end)
+    days = (await db.execute(query)).scalars().all()
+
+    key_length = {"year": 4, "month": 7, "day": 10}[granularity]
+    buckets: Dict[str, Dict[str, Any]] = {}
+    for day in days:
+        key = day.day.isoformat()[:key_length]
+        bucket = buckets.setdefault(key, {"key": key, "count": 0, "cover_id": None, "_rank": None})
+        bucket["count"] += day.photo_count
+        # 封面：优先精选，其次最近的一天（days 已按日期倒序）
+        rank = (bool(day.cover_featured), day.day)
+        if day.cover_photo_id and (bucket["_rank"] is None or rank > bucket["_rank"]):
+            bucket["cover_id"], bucket["_rank"] = day.cover_photo_id, rank
+
+    cover_ids = [bucket["cover_id"] for bucket in buckets.values() if bucket["cover_id"]]
+    covers = {}
+    if cover_ids:
+        rows = await db.execute(
+            select(Photo.id, Photo.title, Photo.image_url, Photo.thumbnail_url).where(Photo.id.in_(cover_ids))
+        )
+        covers = {row.id: dict(row._mapping) for row in rows}
+
+    content = {
+        "granularity": granularity,
+        "total": sum(bucket["count"] for bucket in buckets.values()),
+        "buckets": [
+            {"key": bucket["key"], "count": bucket["count"], "cover": covers.get(bucket["cover_id"])}
+            for bucket in buckets.values()
+        ],
+    }
+    return response_cache.store("photo_timeline", request, content).to_response(request)
+
+
+@router.get("/timeline/{bucket}")
+async def get_photo_timeline_bucket(
+    bucket: str,
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(30, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """某一年 / 月 / 日拍摄的作品（按拍摄时间倒序，游标分页）"""
+    start, end = _bucket_range(bucket)
+    query = (
+        select(Photo)
+        .options(selectinload(Photo.category))
+        .where(
+            Photo.shoot_time >= datetime.combine(start, time.min),
+            Photo.shoot_time < datetime.combine(end, time.min),
+        )
+    )
+    if cursor:
+        # 游标自带上一页最后一张作品的 (拍摄时间, ID)，该作品被删除或修改拍摄时间后仍能继续翻页
+        shoot_time, photo_id = _decode_timeline_cursor(cursor)
+        query = query.where(or_(
+            Photo.shoot_time < shoot_time,
+            and_(Photo.shoot_time == shoot_time, Photo.id < photo_id),
+        ))
+    query = query.order_by(Photo.shoot_time.desc(), Photo.id.desc()).limit(limit + 1)
+    photos = (await db.execute(query)).scalars().all()
+
+    count = await db.scalar(
+        select(func.coalesce(func.sum(PhotoDay.photo_count), 0)).where(PhotoDay.day >= start, PhotoDay.day < end)
+    )
+    has_more = len(photos) > limit
+    photos = photos[:limit]
+    return {
+        "key": bucket,
+        "count": count,
+        "items": [PhotoSchema.model_validate(photo) for photo in photos],
+        "next_cursor": _encode_timeline_cursor(photos[-1]) if has_more else None,
+    }
+
+
+@router.get("/map")
+async def get_photo_map(
+    request: Request,
+    min_lat: float = Query(-90, ge=-90, le=90),
+    min_lng: float = Query(-180, ge=-180, le=180),
+    max_lat: float = Query(90, ge=-90, le=90),
+    max_lng: float = Query(180, ge=-180, le=180),
+    zoom: int = Query(2, ge=0, le=22, description="地图缩放级别，决定聚合网格大小"),
+    category_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    地图视图：返回范围内带坐标作品的聚合点（min_lng > max_lng 表示跨越 180° 经线）
+    结果缓存到下一次作品写入
+    """
+    if min_lat > max_lat:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="min_lat 不能大于 max_lat")
+    cached = response_cache.get("photo_map", request)
+    if cached is not None:
+        return cached.to_response(request)
+
+    content = await cluster_photos(db, BoundingBox(min_lat, min_lng, max_lat, max_lng), zoom, category_id)
+    return response_cache.store("photo_map", request, content).to_response(request)
+
+
 @router.get("/{photo_id}", response_model=PhotoSchema)
-async def get_photo(photo_id: int, db: AsyncSession = Depends(get_db)):
+async def get_photo(
+    photo_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    response: Response = None
+):
     """获取单张摄影作品"""
     try:
+        version = await item_version(db, Photo, photo_id, related=(PhotoCategory,))
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="摄影作品不存在"
+            )
+        
+        # 浏览量不参与 ETag，命中缓存时仍然计数
+        etag = make_etag("photo", photo_id, version)
+        cache_control = public_cache_control()
+        if etag_matches(request, etag):
+            await _increment_view_count(db, photo_id)
+            return not_modified(etag, cache_control)
+        
         result = await db.execute(
             select(Photo)
             .options(selectinload(Photo.category))
@@ -177,30 +414,19 @@ async def get_photo(photo_id: int, db: AsyncSession = Depends(get_db)):
                 detail="摄影作品不存在"
             )
         
-        # 增加浏览量（异步更新，不阻塞返回）
-        try:
-            photo.view_count = (photo.view_count or 0) + 1
-            await db.commit()
-            await db.refresh(photo)
-        except Exception as e:
-            # 如果更新浏览量失败，回滚但不影响返回数据
-            await db.rollback()
-            # 重新查询以获取最新数据
-            result = await db.execute(
-                select(Photo)
-                .options(selectinload(Photo.category))
-                .where(Photo.id == photo_id)
-            )
-            photo = result.scalar_one()
-            print(f"更新浏览量失败，已回滚: {e}")
+        # 增加浏览量（失败时不影响返回数据）
+        if await _increment_view_count(db, photo_id):
+            set_committed_value(photo, "view_count", (photo.view_count or 0) + 1)
+        
+        if response is not None:
+            apply_cache_headers(response, etag, cache_control)
         
         return photo
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
         error_msg = str(e)
-        traceback.print_exc()
+        logger.exception("获取照片详情失败: %s", photo_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"获取照片详情失败: {error_msg}"
@@ -283,6 +509,7 @@ async def create_photo_with_file(
         shoot_time=shoot_time_value,
         exif=exif_payload,
     )
+    db_photo.latitude, db_photo.longitude = gps_from_exif(exif_payload)
     db.add(db_photo)
     await db.commit()
     await db.refresh(db_photo)
@@ -389,7 +616,7 @@ async def update_photo_with_file(
             try:
                 oss_service.delete_file(path)
             except Exception as exc:
-                print(f"删除旧图片失败 ({path}): {exc}")
+                logger.warning("删除旧图片失败 (%s): %s", path, exc)
 
     db_photo.title = title
     db_photo.description = description
@@ -403,6 +630,8 @@ async def update_photo_with_file(
     db_photo.iso = iso or upload_result.get("iso")
     db_photo.shoot_time = shoot_time_value
     db_photo.exif = exif_payload
+    # 新图片没有 GPS 时清空旧坐标
+    db_photo.latitude, db_photo.longitude = gps_from_exif(exif_payload)
     db_photo.image_url = upload_result["url"]
     db_photo.thumbnail_url = upload_result.get("thumbnail_url")
     db_photo.width = upload_result.get("width")
@@ -448,13 +677,31 @@ async def delete_photo(
                 oss_service.delete_file(path)
             except Exception as e:
                 # 记录错误但不阻止数据库删除
-                print(f"删除OSS文件失败 ({path}): {e}")
+                logger.warning("删除OSS文件失败 (%s): %s", path, e)
     
     await db.delete(db_photo)
     await db.commit()
     return None
 
 
+async def _increment_view_count(db: AsyncSession, photo_id: int) -> bool:
+    """原子递增浏览量，显式保留 updated_at 以免浏览行为改变内容版本"""
+    try:
+        await db.execute(
+            update(Photo)
+            .where(Photo.id == photo_id)
+            .values(view_count=func.coalesce(Photo.view_count, 0) + 1, updated_at=Photo.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return True
+    except Exception as e:
+        # 如果更新浏览量失败，回滚但不影响返回数据
+        await db.rollback()
+        logger.warning("更新浏览量失败，已回滚: %s", e)
+        return False
+
+
 async def _ensure_category_exists(db: AsyncSession, category_id: Optional[int]):
     if not category_id:
         return
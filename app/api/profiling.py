@@ -0,0 +1,60 @@
+"""
+性能分析结果API路由（仅超级管理员）
+"""
+from enum import Enum
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from app.api.dependencies import get_current_superuser
+from app.core.profiling import PYINSTRUMENT_AVAILABLE, collapsed_stacks, profiles, speedscope_json
+from app.models.user import User
+
+router = APIRouter(prefix="/profiles", tags=["性能分析"])
+
+
+class ProfileFormat(str, Enum):
+    collapsed = "collapsed"
+    speedscope = "speedscope"
+
+
+@router.get("")
+async def list_profiles(
+    current_user: User = Depends(get_current_superuser)
+) -> List[Dict[str, Any]]:
+    """最近的分析结果（按时间倒序）"""
+    return [record.summary() for record in profiles.list()]
+
+
+@router.get("/{profile_id}")
+async def download_profile(
+    profile_id: int,
+    format: ProfileFormat = Query(ProfileFormat.speedscope),
+    current_user: User = Depends(get_current_superuser)
+):
+    """下载分析结果：折叠栈文本或 speedscope JSON（可直接拖入 https://www.speedscope.app）"""
+    if not PYINSTRUMENT_AVAILABLE:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="未安装 pyinstrument")
+
+    record = profiles.get(profile_id)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="分析结果不存在或已被覆盖")
+
+    if format == ProfileFormat.collapsed:
+        content, media_type, suffix = collapsed_stacks(record.session), "text/plain; charset=utf-8", "txt"
+    else:
+        content, media_type, suffix = speedscope_json(record.session), "application/json", "speedscope.json"
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="profile-{record.id}.{suffix}"'},
+    )
+
+
+@router.delete("", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_profiles(
+    current_user: User = Depends(get_current_superuser)
+):
+    """清空分析结果"""
+    profiles.clear()
+    return None
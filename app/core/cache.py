@@ -0,0 +1,239 @@
+"""
+进程内缓存
+- TTLCache: 带过期时间的 LRU 缓存
+- ResponseCache: 按命名空间缓存序列化后的 JSON 响应，并保存预压缩结果
+"""
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, Optional, Set
+import threading
+import time
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.compression import choose_encoding, compress_bytes, supported_encodings
+from app.core.http_cache import apply_cache_headers, body_etag, etag_matches, not_modified, public_cache_control
+from app.core.metrics import CACHE_REQUESTS
+
+
+class TTLCache:
+    """线程安全的 TTL + LRU 缓存；指定 name 时命中情况会记录到 cache_requests_total 指标"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, name: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._hit_metric = CACHE_REQUESTS.labels(name, "hit") if name else None
+        self._miss_metric = CACHE_REQUESTS.labels(name, "miss") if name else None
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] <= now:
+                del self._data[key]
+                item = None
+            if item is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        if self._hit_metric is not None:
+            (self._miss_metric if item is None else self._hit_metric).inc()
+        return default if item is None else item[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+@dataclass
+class CachedResponse:
+    """缓存的响应体，以及各编码的预压缩版本"""
+    body: bytes
+    etag: str
+    media_type: str = "application/json"
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        body: bytes,
+        media_type: str = "application/json",
+        etag: Optional[str] = None,
+    ) -> "CachedResponse":
+        """etag 为空时由响应体生成"""
+        encoded: Dict[str, bytes] = {}
+        if len(body) >= settings.COMPRESSION_MIN_SIZE:
+            for encoding in supported_encodings():
+                encoded[encoding] = compress_bytes(body, encoding)
+        return cls(body=body, etag=etag or body_etag(body), media_type=media_type, encoded=encoded)
+
+    def to_response(
+        self,
+        request: Request,
+        cache_control: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        cache_control = cache_control or public_cache_control()
+        if etag_matches(request, self.etag):
+            return not_modified(self.etag, cache_control, headers)
+        headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+        body = self.body
+        encoding = choose_encoding(request.headers.get("accept-encoding"), tuple(self.encoded))
+        if encoding:
+            body = self.encoded[encoding]
+            headers["Content-Encoding"] = encoding
+        response = Response(content=body, media_type=self.media_type, headers=headers)
+        apply_cache_headers(response, self.etag, cache_control)
+        return response
+
+
+class ResponseCache:
+    """
+    按命名空间缓存 JSON 响应
+
+    失效通过递增命名空间的版本号实现，旧条目由 TTL / LRU 自然淘汰。
+    缓存仅在当前进程内有效，多 worker 部署时依赖较短的 TTL 保证最终一致。
+
+    get() 未命中时记下当时的版本号，store() 只在版本号未变时写入：
+    读取数据库期间提交的失效不会让旧内容登记到新版本下。
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl, name="response")
+        self._generations: Dict[str, int] = defaultdict(int)
+
+    @property
+    def stats(self) -> TTLCache:
+        return self._entries
+
+    def _key(self, namespace: str, generation: int, request: Request) -> Hashable:
+        query = tuple(sorted(request.query_params.multi_items()))
+        return namespace, generation, request.url.path, query
+
+    @staticmethod
+    def _pending(request: Request) -> Dict[str, int]:
+        pending = getattr(request.state, "response_cache_generations", None)
+        if pending is None:
+            pending = request.state.response_cache_generations = {}
+        return pending
+
+    def get(self, namespace: str, request: Request) -> Optional[CachedResponse]:
+        generation = self._generations[namespace]
+        entry = self._entries.get(self._key(namespace, generation, request))
+        if entry is None:
+            self._pending(request)[namespace] = generation
+        return entry
+
+    def store(self, namespace: str, request: Request, content: Any) -> CachedResponse:
+        """
+        序列化并缓存响应内容（与 FastAPI 默认 JSONResponse 输出一致）
+
+        版本号以 get() 时为准；其间命名空间已失效时只返回结果，不写入缓存
+        """
+        body = JSONResponse(content=jsonable_encoder(content)).body
+        entry = CachedResponse.build(body)
+        current = self._generations[namespace]
+        generation = self._pending(request).pop(namespace, current)
+        if generation == current:
+            self._entries.set(self._key(namespace, generation, request), entry)
+        return entry
+
+    def invalidate(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self._generations[namespace] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl=settings.RESPONSE_CACHE_TTL,
+)
+
+# 数据表 -> 受影响的缓存命名空间
+CACHE_NAMESPACES_BY_TABLE: Dict[str, tuple[str, ...]] = {
+    "blogs": ("home", "blog_related"),
+    "blog_tag": ("home", "blog_related"),
+    "categories": ("blog_categories", "home", "blog_related"),
+    "tags": ("blog_tags", "home", "blog_related"),
+    "photos": ("home", "photo_facets", "photo_timeline", "photo_map"),
+    "photo_categories": ("photo_categories", "home"),
+    "ai_demos": ("home",),
+    "ai_projects": ("home",),
+}
+
+# 只修改这些字段时不视为内容变更（例如浏览量、自动维护的内容版本）
+IGNORED_ATTRIBUTES = {"view_count", "like_count", "updated_at", "version"}
+
+
+def _changed_attributes(obj) -> Set[str]:
+    return {
+        attr.key for attr in inspect(obj).attrs
+        if attr.key not in IGNORED_ATTRIBUTES and attr.history.has_changes()
+    }
+
+
+def has_content_changes(obj) -> bool:
+    return bool(_changed_attributes(obj))
+
+
+def changed_tables(session: Session) -> Iterable[str]:
+    """本次 flush 中内容有变化的表（flush 前后均可调用）"""
+    for obj in session.new:
+        yield inspect(obj).mapper.persist_selectable.name
+    for obj in session.deleted:
+        yield inspect(obj).mapper.persist_selectable.name
+    for obj in session.dirty:
+        changed = _changed_attributes(obj)
+        if changed:
+            table = inspect(obj).mapper.persist_selectable.name
+            yield table
+            # 多对多关系变化同时影响关联表
+            if "tags" in changed and table == "blogs":
+                yield "blog_tag"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_cache_invalidations(session: Session, flush_context, instances) -> None:
+    pending: Set[str] = session.info.setdefault("cache_invalidate", set())
+    for table in changed_tables(session):
+        pending.update(CACHE_NAMESPACES_BY_TABLE.get(table, ()))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_cache_invalidations(session: Session) -> None:
+    pending = session.info.pop("cache_invalidate", None)
+    if pending:
+        response_cache.invalidate(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_invalidations(session: Session) -> None:
+    session.info.pop("cache_invalidate", None)
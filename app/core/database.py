@@ -1,24 +1,221 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from typing import List, Optional
+import itertools
+import logging
+import time
+
+from fastapi import Request
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_OVERFLOW, DB_POOL_TIMEOUTS, DB_POOL_WAIT_SECONDS
+from app.core.sql_instrumentation import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """记录取连接等待时间、占用数与溢出数的连接池"""
+    
+    # 指标中的连接池名称（primary / writer / reader / replica-N）
+    label = "primary"
+    # 沿用 SQLAlchemy 连接池的 logger 名称，日志级别随 "sqlalchemy" 统一控制
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.InstrumentedAsyncPool"
+
+    def recreate(self):
+        # engine.dispose() 会重建连接池，保留名称
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.label).inc()
+            raise
+        finally:
+            DB_POOL_WAIT_SECONDS.labels(self.label).observe(time.perf_counter() - started_at)
+            self._report_usage()
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._report_usage()
+
+    def _report_usage(self) -> None:
+        DB_POOL_CHECKED_OUT.labels(self.label).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(self.label).set(max(self.overflow(), 0))
+
+
+def is_sqlite_production(url: str) -> bool:
+    return settings.SQLITE_PRODUCTION_MODE and url.startswith("sqlite") and ":memory:" not in url
+
+
+def _engine_options(url: str, role: str = "primary") -> dict:
+    """根据数据库类型生成引擎参数；role 为 SQLite 生产模式下的 writer / reader"""
+    options = {
+        "echo": settings.DATABASE_ECHO,
+        "future": True,
+        "query_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+    }
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"timeout": settings.SQLITE_BUSY_TIMEOUT / 1000}
+        if not is_sqlite_production(url):
+            # 默认使用 NullPool，连接池参数不适用
+            return options
+        # 单个写连接即写队列：写事务在连接池中排队，不会因抢锁失败报 database is locked
+        options.update(
+            poolclass=InstrumentedAsyncPool,
+            pool_size=1 if role == "writer" else settings.SQLITE_READ_POOL_SIZE,
+            max_overflow=0 if role == "writer" else settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        )
+        return options
+    
+    options.update(
+        poolclass=InstrumentedAsyncPool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        connect_args={"connect_timeout": settings.DATABASE_CONNECT_TIMEOUT},
+    )
+    return options
+
+
+def _create_engine(url: str, role: str = "primary") -> AsyncEngine:
+    target = create_async_engine(url, **_engine_options(url, role))
+    if isinstance(target.pool, InstrumentedAsyncPool):
+        target.pool.label = role
+    if settings.SQL_INSTRUMENTATION:
+        instrument_engine(target)
+    return target
+
+
+def _configure_sqlite(target: AsyncEngine, writer: bool) -> None:
+    """每个新连接设置 PRAGMA；写连接改为显式 BEGIN IMMEDIATE，事务开始即持有写锁"""
+    pragmas = (
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT}",
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+    )
+
+    @event.listens_for(target.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        if writer:
+            # 关闭驱动的隐式事务，由下面的 begin 事件接管
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    if writer:
+        @event.listens_for(target.sync_engine, "begin")
+        def _on_begin(connection) -> None:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
 
 # 创建异步数据库引擎
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
+# SQLite 生产模式下 engine 为单写连接（同时用于建表/迁移），read_engine 为读连接池；
+# 其他数据库两者相同
+if is_sqlite_production(settings.DATABASE_URL):
+    engine = _create_engine(settings.DATABASE_URL, "writer")
+    read_engine = _create_engine(settings.DATABASE_URL, "reader")
+    _configure_sqlite(engine, writer=True)
+    _configure_sqlite(read_engine, writer=False)
+else:
+    engine = _create_engine(settings.DATABASE_URL)
+    read_engine = engine
+
+
+class SQLiteRoutingSession(Session):
+    """
+    SQLite 读写分离会话
+    
+    flush 与 INSERT/UPDATE/DELETE 使用写连接，其余查询使用读连接池；
+    事务中一旦写入，后续语句都走写连接，保证读到本事务未提交的修改。
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or self.info.get("sqlite_writer") or getattr(clause, "is_dml", False):
+            self.info["sqlite_writer"] = True
+            return engine.sync_engine
+        return read_engine.sync_engine
+
+
+@event.listens_for(SQLiteRoutingSession, "after_transaction_end")
+def _release_writer(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("sqlite_writer", None)
+
+
+def _session_factory(bind: AsyncEngine, sync_session_class=Session) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        sync_session_class=sync_session_class,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
 
 # 创建异步会话工厂
-AsyncSessionLocal = async_sessionmaker(
+AsyncSessionLocal = _session_factory(
     engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
+    SQLiteRoutingSession if read_engine is not engine else Session,
 )
 
 
+class ReplicaSet:
+    """
+    只读副本集合
+    
+    按轮询顺序选择副本；建立连接失败的副本在 retry_interval 秒内被跳过，
+    之后再次参与轮询（相当于被动健康检查）。
+    """
+
+    def __init__(self, urls: List[str], retry_interval: float):
+        self.engines = [_create_engine(url, f"replica-{index}") for index, url in enumerate(urls)]
+        self.factories = [_session_factory(replica) for replica in self.engines]
+        self.retry_interval = retry_interval
+        self._unhealthy_until = [0.0] * len(self.engines)
+        self._cursor = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def candidates(self) -> List[int]:
+        """按轮询顺序返回当前可用的副本下标"""
+        if not self.engines:
+            return []
+        start = next(self._cursor) % len(self.engines)
+        now = time.monotonic()
+        order = [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+        return [index for index in order if self._unhealthy_until[index] <= now]
+
+    def mark_unhealthy(self, index: int) -> None:
+        self._unhealthy_until[index] = time.monotonic() + self.retry_interval
+
+    def mark_healthy(self, index: int) -> None:
+        self._unhealthy_until[index] = 0.0
+
+
+replicas = ReplicaSet(settings.DATABASE_REPLICA_URLS, settings.DATABASE_REPLICA_RETRY_INTERVAL)
+
+# 最近写入过数据的用户（key: 用户名），在窗口期内读请求走主库以读到自己的写入。
+# 仅在当前进程内有效，多 worker 部署时依赖负载均衡的会话保持或较短的复制延迟。
+_recent_writers = TTLCache(maxsize=10000, ttl=settings.READ_YOUR_WRITES_WINDOW)
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -31,3 +228,116 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+
+def _request_username(request: Request) -> Optional[str]:
+    # 延迟导入，避免 database 与 security 循环依赖
+    from app.core.security import decode_access_token
+    
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_access_token(token)
+    return payload.get("sub") if payload else None
+
+
+def mark_recent_write(username: str) -> None:
+    _recent_writers.set(username, True)
+
+
+# 依赖注入：获取只读会话（公开列表等只读接口使用，不能在该会话中写入）
+async def get_read_db(request: Request) -> AsyncSession:
+    session: Optional[AsyncSession] = None
+    if replicas:
+        username = _request_username(request)
+        if username is None or _recent_writers.get(username) is None:
+            session = await _open_replica_session()
+    
+    if session is None:
+        session = AsyncSessionLocal()
+    async with session:
+        yield session
+
+
+async def _open_replica_session() -> Optional[AsyncSession]:
+    """按轮询顺序打开副本会话，全部不可用时返回 None（回退到主库）"""
+    for index in replicas.candidates():
+        session = replicas.factories[index]()
+        try:
+            # 提前取得连接，连接失败时可以换下一个副本
+            await session.connection()
+        except (exc.DBAPIError, OSError) as e:
+            await session.close()
+            replicas.mark_unhealthy(index)
+            logger.warning("只读副本 %d 不可用，%d 秒内不再使用: %s", index, replicas.retry_interval, e)
+            continue
+        replicas.mark_healthy(index)
+        return session
+    return None
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_session_write(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_statement_write(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_recent_write(session: Session) -> None:
+    # username 由 get_current_user 写入 session.info
+    username = session.info.get("username")
+    if session.info.pop("has_writes", False) and username:
+        mark_recent_write(username)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_session_write(session: Session) -> None:
+    session.info.pop("has_writes", None)
+
+
+async def _warm_up_engine(target: AsyncEngine) -> int:
+    if not isinstance(target.pool, AsyncAdaptedQueuePool):
+        return 0
+    
+    connections: List[AsyncConnection] = []
+    try:
+        # 同时持有多个连接，保证建立的是不同的物理连接
+        for _ in range(target.pool.size()):
+            connection = await target.connect()
+            connections.append(connection)
+            await connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning("数据库连接池预热失败 (%s): %s", target.url.render_as_string(hide_password=True), e)
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
+
+
+async def warm_up_pool() -> int:
+    """
+    启动时预先建立连接（主库与只读副本），避免首批请求承担建连开销
+    
+    返回成功建立的连接数；数据库不可用时只记录警告，不阻止应用启动。
+    """
+    if not settings.DATABASE_POOL_WARMUP:
+        return 0
+    total = 0
+    targets = [engine, *replicas.engines]
+    if read_engine is not engine:
+        targets.append(read_engine)
+    for target in targets:
+        total += await _warm_up_engine(target)
+    return total
+
+
+async def dispose_engine() -> None:
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+    for replica in replicas.engines:
+        await replica.dispose()
@@ -0,0 +1,154 @@
+"""
+HTTP 缓存工具
+- ETag 生成与 If-None-Match 判断
+- Last-Modified 与 If-Modified-Since 判断
+- Cache-Control 策略
+- 基于行版本 / 表版本（app.models.content_version）的轻量版本查询（不读取整行数据）
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Iterable, Optional, Sequence, Tuple
+import hashlib
+
+from fastapi import Request, Response
+from sqlalchemy import column, func, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def public_cache_control() -> str:
+    """公开内容的缓存策略，允许 CDN 缓存并在后台重新验证"""
+    return (
+        f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE}, "
+        f"s-maxage={settings.PUBLIC_CACHE_S_MAXAGE}, "
+        f"stale-while-revalidate={settings.PUBLIC_CACHE_STALE_WHILE_REVALIDATE}"
+    )
+
+
+def make_etag(*parts: Any, weak: bool = True) -> str:
+    """根据任意可序列化的部件生成 ETag"""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def body_etag(body: bytes) -> str:
+    """根据响应体生成强 ETag"""
+    return f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 使用弱比较"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    target = _opaque(etag)
+    return any(_opaque(candidate) == target for candidate in header.split(","))
+
+
+def as_utc(value: datetime) -> datetime:
+    """数据库返回的无时区时间按 UTC 处理"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    """Last-Modified 等响应头使用的 RFC 7231 日期"""
+    return format_datetime(as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def not_modified_since(request: Request, last_modified: Optional[datetime]) -> bool:
+    """If-Modified-Since 判断；带 If-None-Match 时以 ETag 为准（RFC 7232）"""
+    header = request.headers.get("if-modified-since")
+    if not header or last_modified is None or "if-none-match" in request.headers:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return as_utc(last_modified).replace(microsecond=0) <= as_utc(since)
+
+
+def not_modified(etag: str, cache_control: str, headers: Optional[dict] = None) -> Response:
+    """返回 304 响应（不含响应体）"""
+    response = Response(status_code=304, headers=headers)
+    apply_cache_headers(response, etag, cache_control)
+    return response
+
+
+def apply_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def request_fingerprint(request: Request) -> Tuple:
+    """用于区分同一接口不同查询参数的 ETag"""
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+# app.models.content_version.TableVersion（此处只读取，不导入模型以免循环引用）
+_table_versions = table("table_versions", column("name"), column("version"))
+
+
+def _last_modified(model):
+    return func.max(func.coalesce(model.updated_at, model.created_at))
+
+
+def _table_version(model):
+    return (
+        select(_table_versions.c.version)
+        .where(_table_versions.c.name == model.__table__.name)
+        .scalar_subquery()
+    )
+
+
+async def collection_version(
+    db: AsyncSession,
+    model,
+    criteria: Sequence = (),
+    joins: Iterable = (),
+    related: Iterable = (),
+) -> Tuple:
+    """
+    查询集合版本：(行数, 最后修改时间, 表版本, 关联表的 (最后修改时间, 表版本)...)
+
+    行数兼作列表总数使用；表版本在每次内容写入时递增，是 ETag 的依据（时间戳只精确到秒，
+    仅用于 Last-Modified）。related 中的模型（如分类、标签）被嵌入到响应时，
+    它们的变化同样需要反映到 ETag 上。
+    """
+    columns = [func.count(model.id), _last_modified(model), _table_version(model)]
+    for related_model in related:
+        columns.append(select(_last_modified(related_model)).scalar_subquery())
+        columns.append(_table_version(related_model))
+    query = select(*columns).select_from(model)
+    for join in joins:
+        query = query.join(join)
+    if criteria:
+        query = query.where(*criteria)
+    row = (await db.execute(query)).one()
+    return tuple(row)
+
+
+async def item_version(
+    db: AsyncSession,
+    model,
+    item_id: int,
+    columns: Iterable = (),
+    related: Iterable = (),
+) -> Optional[Tuple]:
+    """
+    查询单条记录的版本：(行版本, columns..., 关联表版本...)
+
+    记录不存在时返回 None。
+    """
+    columns = [model.version, *columns, *(_table_version(related_model) for related_model in related)]
+    row = (await db.execute(select(*columns).where(model.id == item_id))).one_or_none()
+    return None if row is None else tuple(row)
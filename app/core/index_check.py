@@ -0,0 +1,110 @@
+"""
+热点查询索引检查
+对各列表接口的典型查询执行 EXPLAIN，确认使用了迁移中创建的组合索引
+
+用法: python -m app.core.index_check
+（MySQL 的优化器会根据数据量选择执行计划，请在有代表性数据的库上运行）
+"""
+import asyncio
+import sys
+from typing import List, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.database import engine
+from app.models import AIDemo, AIImage, AIProject, Blog, Photo
+
+# (说明, 查询, 期望使用的索引)
+HOT_QUERIES = (
+    (
+        "已发布博客列表",
+        select(Blog.id).where(Blog.is_published == True).order_by(Blog.created_at.desc()).limit(10),  # noqa: E712
+        "ix_blogs_published_created",
+    ),
+    (
+        "分类下已发布博客",
+        select(Blog.id)
+        .where(Blog.category_id == 1, Blog.is_published == True)  # noqa: E712
+        .order_by(Blog.created_at.desc()).limit(10),
+        "ix_blogs_category_published_created",
+    ),
+    (
+        "全部博客（后台）",
+        select(Blog.id).order_by(Blog.created_at.desc()).limit(10),
+        "ix_blogs_created_at",
+    ),
+    (
+        "摄影作品列表",
+        select(Photo.id).order_by(Photo.created_at.desc()).limit(20),
+        "ix_photos_created_at",
+    ),
+    (
+        "分类下摄影作品",
+        select(Photo.id).where(Photo.category_id == 1).order_by(Photo.created_at.desc()).limit(20),
+        "ix_photos_category_created",
+    ),
+    (
+        "精选摄影作品",
+        select(Photo.id).where(Photo.is_featured == True).order_by(Photo.created_at.desc()).limit(20),  # noqa: E712
+        "ix_photos_featured_created",
+    ),
+    (
+        "已发布AI图片",
+        select(AIImage.id).where(AIImage.is_published == True).order_by(AIImage.created_at.desc()).limit(20),  # noqa: E712
+        "ix_ai_images_published_created",
+    ),
+    (
+        "分类下已发布AI图片",
+        select(AIImage.id)
+        .where(AIImage.category == "portrait", AIImage.is_published == True)  # noqa: E712
+        .order_by(AIImage.created_at.desc()).limit(20),
+        "ix_ai_images_category_published_created",
+    ),
+    (
+        "已发布AI Demo",
+        select(AIDemo.id)
+        .where(AIDemo.is_published == True)  # noqa: E712
+        .order_by(AIDemo.sort_order.asc(), AIDemo.created_at.desc()),
+        "ix_ai_demos_published_sort",
+    ),
+    (
+        "已发布AI项目",
+        select(AIProject.id).where(AIProject.is_published == True).order_by(AIProject.created_at.desc()).limit(10),  # noqa: E712
+        "ix_ai_projects_published_created",
+    ),
+)
+
+
+async def explain(conn: AsyncConnection, query) -> str:
+    """返回执行计划文本"""
+    sql = str(query.compile(conn.sync_connection, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        rows = (await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))).all()
+        return "\n".join(str(row[-1]) for row in rows)
+    rows = (await conn.execute(text(f"EXPLAIN {sql}"))).mappings().all()
+    return "\n".join(f"table={row['table']} key={row['key']} extra={row['Extra']}" for row in rows)
+
+
+async def check() -> List[Tuple[str, str, bool]]:
+    results = []
+    async with engine.connect() as conn:
+        for description, query, index_name in HOT_QUERIES:
+            plan = await explain(conn, query)
+            results.append((description, plan, index_name in plan))
+    return results
+
+
+async def main() -> int:
+    failed = 0
+    for description, plan, ok in await check():
+        print(f"[{'OK' if ok else '未使用索引'}] {description}")
+        if not ok:
+            failed += 1
+            print("    " + plan.replace("\n", "\n    "))
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
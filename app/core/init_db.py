@@ -3,10 +3,35 @@
 支持SQLite和MySQL
 """
 import asyncio
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import create_async_engine
 from app.core.database import Base
 from app.core.config import settings
-from app.models import user, blog, photo, ai_project, ai_demo, ai_image  # noqa
+from app.models import user, blog, photo, ai_project, ai_demo, ai_image, token, media, ai_tag, photo_timeline, blog_related, content_version  # noqa
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def _create_and_migrate(sync_conn):
+    """
+    空库：按模型建表并把迁移版本标记为最新
+    已有库：补建缺失的表，再执行未应用的迁移（列、索引等）
+    """
+    is_empty = not inspect(sync_conn).get_table_names()
+    Base.metadata.create_all(sync_conn)
+    
+    config = Config(str(ALEMBIC_INI))
+    # 从任意工作目录启动时都能找到迁移脚本
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    config.attributes["connection"] = sync_conn
+    config.attributes["configure_logger"] = False
+    if is_empty:
+        command.stamp(config, "head")
+    else:
+        command.upgrade(config, "head")
 
 
 async def init_db():
@@ -40,7 +65,7 @@ async def init_db():
     engine = create_async_engine(db_url, echo=True)
     
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_and_migrate)
     
     await engine.dispose()
     print("数据库表结构初始化完成！")
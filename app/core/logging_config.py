@@ -0,0 +1,232 @@
+"""
+结构化日志
+- JSON 格式输出（LOG_FORMAT=text 时为普通文本），每条日志带 request_id
+- 业务代码只把日志放入队列（QueueHandler），由后台线程（QueueListener）格式化并写出，
+  stdout 写入不占用事件循环
+- LOG_RATE_LIMITED_LOGGERS 中的 logger（已知会刷屏的热点路径）按日志模板限流：时间窗口内超过 burst 条后
+  被折叠，窗口结束后的第一条附带被丢弃的条数；ERROR 及以上级别与逐请求SQL日志从不丢弃
+- 使用 logging.getLogger(__name__) 获取 logger，级别由 LOG_LEVEL / LOG_LEVELS 控制
+"""
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+import copy
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# 只接受客户端/网关传入的合法请求ID，避免日志注入
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._\-]{1,64}$")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# LogRecord 自带的属性，其余属性视为 extra 字段输出
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+# 挂了限流过滤器的 (logger, 过滤器)，shutdown_logging 时移除
+_rate_limited: List[Tuple[logging.Logger, logging.Filter]] = []
+
+# 逐请求的SQL汇总、预算与 N+1 告警每条都需要，不参与限流
+_NEVER_RATE_LIMITED = frozenset({"app.core.sql_instrumentation"})
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class RequestIdMiddleware:
+    """为每个请求分配 request_id（优先沿用 X-Request-ID 请求头），并写回响应头"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        request_id = incoming if incoming and _VALID_REQUEST_ID.match(incoming) else uuid.uuid4().hex
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        token = _request_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _request_id.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    """在产生日志的线程/协程中取 request_id（后台线程里已取不到上下文）"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = _request_id.get()
+        return True
+
+
+class RepeatFilter(logging.Filter):
+    """
+    重复日志限流
+
+    按 (logger, 级别, 消息模板) 计数，每个 interval 秒内最多放行 burst 条，
+    其余丢弃；下一个窗口放行的第一条带上 suppressed 字段。ERROR 及以上级别始终放行。
+    挂在具体的 logger 上（Logger.addFilter 只作用于该 logger 自身产生的日志，不含子 logger）。
+    """
+
+    def __init__(self, interval: float, burst: int):
+        super().__init__()
+        self.interval = interval
+        self.burst = max(burst, 1)
+        # key -> (窗口开始时间, 窗口内条数, 被丢弃条数)
+        self._windows: Dict[Tuple, Tuple[float, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.interval <= 0 or record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            started_at, count, suppressed = self._windows.get(key, (now, 0, 0))
+            if now - started_at >= self.interval:
+                if suppressed:
+                    record.suppressed = suppressed
+                started_at, count, suppressed = now, 0, 0
+            if count >= self.burst:
+                self._windows[key] = (started_at, count, suppressed + 1)
+                return False
+            self._windows[key] = (started_at, count + 1, suppressed)
+            if len(self._windows) > 10000:
+                # 模板数量有限，超过上限说明有人把变量拼进了消息，直接重置
+                self._windows.clear()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志一行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            line = f"{line} (此前 {suppressed} 条相同日志已省略)"
+        exception = getattr(record, "exception", None)
+        return f"{line}\n{exception}" if exception else line
+
+
+class _ContextQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 默认实现会把异常堆栈拼进 message；这里改为单独的 exception 字段，
+        # 并保留 extra 字段，交给后台线程的格式化器输出
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exception = _traceback_formatter.formatException(record.exc_info)
+        if record.stack_info:
+            record.exception = _traceback_formatter.formatStack(record.stack_info)
+        record.exc_info = record.exc_text = record.stack_info = None
+        return record
+
+
+_traceback_formatter = logging.Formatter()
+
+
+def _parse_levels(value: str) -> Dict[str, str]:
+    """解析 "app.core.sql_instrumentation=WARNING,sqlalchemy.engine=INFO" """
+    levels = {}
+    for item in value.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> None:
+    """配置根 logger；重复调用时只生效一次"""
+    global _listener
+    if _listener is not None:
+        return
+
+    if settings.LOG_FORMAT == "text":
+        formatter: logging.Formatter = _TextFormatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        )
+    else:
+        formatter = JsonFormatter()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    queue_handler = _ContextQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL.upper())
+    # 移除其他地方（如 basicConfig）装上的处理器，避免重复输出
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    # 连接池创建/回收等 INFO 日志过于频繁（DATABASE_ECHO 单独控制SQL输出，不受影响）
+    logging.getLogger("sqlalchemy").setLevel(logging.WARNING)
+    for name, level in _parse_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+    repeat_filter = RepeatFilter(settings.LOG_RATE_LIMIT_INTERVAL, settings.LOG_RATE_LIMIT_BURST)
+    for name in settings.LOG_RATE_LIMITED_LOGGERS.split(","):
+        name = name.strip()
+        if name and name not in _NEVER_RATE_LIMITED:
+            logger = logging.getLogger(name)
+            logger.addFilter(repeat_filter)
+            _rate_limited.append((logger, repeat_filter))
+
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """停止后台线程并写出队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for logger, log_filter in _rate_limited:
+        logger.removeFilter(log_filter)
+    _rate_limited.clear()
@@ -0,0 +1,228 @@
+"""
+运行指标
+基于 prometheus_client；未安装时所有指标退化为空操作，业务代码无需判断
+
+多进程部署（gunicorn / uvicorn --workers）时设置环境变量 PROMETHEUS_MULTIPROC_DIR，
+各 worker 把指标写入该目录，/metrics 汇总所有 worker 的数据。
+"""
+from contextlib import contextmanager
+from typing import Iterator, Optional, Sequence, Tuple
+import os
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.request_context import route_template
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    )
+    from prometheus_client import multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR") or os.environ.get("prometheus_multiproc_dir")
+
+
+class _NoopMetric:
+    """prometheus_client 不可用时的占位指标"""
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def dec(self, amount: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def observe(self, value: float) -> None:
+        pass
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        yield
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Counter(name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = (), multiprocess_mode: str = "livesum"):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return Gauge(name, documentation, labelnames, multiprocess_mode=multiprocess_mode)
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Optional[Sequence[float]] = None,
+):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    if buckets is None:
+        return Histogram(name, documentation, labelnames)
+    return Histogram(name, documentation, labelnames, buckets=buckets)
+
+
+# 认证
+PASSWORD_HASH_SECONDS = histogram(
+    "password_hash_duration_seconds",
+    "bcrypt 哈希/校验耗时（不含线程池排队时间）",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0),
+)
+PASSWORD_HASH_QUEUE_SECONDS = histogram(
+    "password_hash_queue_seconds",
+    "bcrypt 任务在线程池中的排队时间",
+    ["operation"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOGIN_ATTEMPTS = counter(
+    "login_attempts_total",
+    "登录请求数（按结果分类）",
+    ["result"],
+)
+
+# 数据库连接池
+DB_POOL_WAIT_SECONDS = histogram(
+    "db_pool_checkout_wait_seconds",
+    "从连接池取连接的等待时间（含溢出时新建连接）",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+DB_POOL_TIMEOUTS = counter(
+    "db_pool_checkout_timeouts_total",
+    "等待连接超时次数",
+    ["pool"],
+)
+DB_POOL_CHECKED_OUT = gauge(
+    "db_pool_checked_out_connections",
+    "当前被占用的连接数",
+    ["pool"],
+)
+DB_POOL_OVERFLOW = gauge(
+    "db_pool_overflow_connections",
+    "当前超出 pool_size 的连接数",
+    ["pool"],
+)
+
+# HTTP（route 使用路由模板，避免原始路径导致标签基数失控）
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds",
+    "请求处理耗时",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = gauge(
+    "http_requests_in_progress",
+    "正在处理的请求数",
+    ["method"],
+)
+HTTP_RESPONSE_SIZE_BYTES = histogram(
+    "http_response_size_bytes",
+    "响应体大小（压缩后）",
+    ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+SQL_STATEMENTS_PER_REQUEST = histogram(
+    "sql_statements_per_request",
+    "单个请求执行的SQL语句数",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+
+# 图片处理流水线
+IMAGE_PIPELINE_IN_PROGRESS = gauge(
+    "image_pipeline_in_progress",
+    "正在处理的图片数（排队深度）",
+)
+IMAGE_PIPELINE_STAGE_SECONDS = histogram(
+    "image_pipeline_stage_seconds",
+    "图片处理各阶段耗时",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+# 对象存储
+OSS_REQUEST_SECONDS = histogram(
+    "oss_request_duration_seconds",
+    "OSS 调用耗时",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+OSS_ERRORS = counter(
+    "oss_errors_total",
+    "OSS 调用失败次数",
+    ["operation"],
+)
+
+# 进程内缓存（命中率 = hit / (hit + miss)）
+CACHE_REQUESTS = counter(
+    "cache_requests_total",
+    "进程内缓存查询次数",
+    ["cache", "result"],
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """生成 Prometheus 文本格式的指标，返回 (内容, Content-Type)"""
+    if not PROMETHEUS_AVAILABLE:
+        return b"# prometheus_client is not installed\n", CONTENT_TYPE_LATEST
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """worker 退出时清理其 live* 类型的仪表数据"""
+    if PROMETHEUS_AVAILABLE and MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+class MetricsMiddleware:
+    """记录请求耗时、并发数与响应大小（应作为最外层中间件，统计压缩后的大小）"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started_at = time.perf_counter()
+        status_code = 500
+        response_size = 0
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            in_progress.dec()
+            # 路由匹配后 scope 中才有 endpoint，因此在请求结束时再取路由模板
+            route = route_template(scope)
+            HTTP_REQUEST_SECONDS.labels(method, route, str(status_code)).observe(time.perf_counter() - started_at)
+            HTTP_RESPONSE_SIZE_BYTES.labels(method, route).observe(response_size)
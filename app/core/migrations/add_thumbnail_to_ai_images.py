@@ -1,6 +1,6 @@
 import asyncio
 from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy import text
+from sqlalchemy import inspect, text
 from app.core.config import settings
 
 async def migrate():
@@ -11,14 +11,11 @@ async def migrate():
     async with engine.begin() as conn:
         try:
             print("Checking if column exists...")
-            # Check if column exists
-            result = await conn.execute(text(
-                "SELECT count(*) FROM information_schema.columns "
-                "WHERE table_schema = 'personal_web' "
-                "AND table_name = 'ai_images' "
-                "AND column_name = 'thumbnail_url'"
-            ))
-            exists = result.scalar()
+            # 通过 inspector 检查，不依赖具体的库名（table_schema）
+            columns = await conn.run_sync(
+                lambda sync_conn: {column["name"] for column in inspect(sync_conn).get_columns("ai_images")}
+            )
+            exists = "thumbnail_url" in columns
             
             if not exists:
                 print("Adding thumbnail_url column...")
@@ -0,0 +1,47 @@
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import inspect, text
+from app.core.config import settings
+
+# 为分类/标签表补充 updated_at，用于生成列表接口的 ETag
+TABLES = ("categories", "tags", "photo_categories")
+
+
+def _missing_tables(sync_conn):
+    inspector = inspect(sync_conn)
+    missing = []
+    for table in TABLES:
+        columns = {column["name"] for column in inspector.get_columns(table)}
+        if "updated_at" not in columns:
+            missing.append(table)
+    return missing
+
+
+async def migrate():
+    db_url = settings.DATABASE_URL
+    print(f"Connecting to {db_url.split('@')[-1] if '@' in db_url else db_url}")
+    engine = create_async_engine(db_url, echo=True)
+    is_mysql = "mysql" in db_url.lower()
+    
+    async with engine.begin() as conn:
+        try:
+            missing = await conn.run_sync(_missing_tables)
+            for table in missing:
+                print(f"Adding updated_at column to {table}...")
+                if is_mysql:
+                    ddl = (
+                        f"ALTER TABLE {table} ADD COLUMN updated_at DATETIME(6) DEFAULT NULL "
+                        f"ON UPDATE CURRENT_TIMESTAMP(6) COMMENT '更新时间'"
+                    )
+                else:
+                    ddl = f"ALTER TABLE {table} ADD COLUMN updated_at DATETIME DEFAULT NULL"
+                await conn.execute(text(ddl))
+            if not missing:
+                print("Columns already exist.")
+        except Exception as e:
+            print(f"Migration failed: {e}")
+            
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(migrate())
@@ -0,0 +1,187 @@
+"""
+慢请求采样分析
+- 按比例随机采样请求，或分析所有请求并只保留耗时超过阈值的
+- 使用 pyinstrument 统计采样（async 模式，按请求隔离协程），未安装时中间件不生效
+- 最近 N 份结果保存在进程内环形缓冲区，可导出为折叠栈（flamegraph.pl / speedscope 均可导入）
+  或 speedscope JSON
+
+注意：线程池中执行的同步代码（如 bcrypt、图片压缩）不在采样范围内，
+在结果中表现为等待（[await]）时间。
+"""
+from collections import Counter, deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import itertools
+import random
+import threading
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.request_context import route_template
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+
+@dataclass
+class ProfileRecord:
+    id: int
+    method: str
+    path: str
+    route: str
+    status_code: int
+    duration: float  # 秒
+    reason: str  # sampled / slow
+    created_at: datetime
+    session: Any  # pyinstrument.session.Session
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status_code": self.status_code,
+            "duration_ms": round(self.duration * 1000, 1),
+            "reason": self.reason,
+            "created_at": self.created_at,
+        }
+
+
+class ProfileStore:
+    """保留最近 maxlen 份分析结果的环形缓冲区"""
+
+    def __init__(self, maxlen: int):
+        self._records: deque = deque(maxlen=max(maxlen, 1))
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, **fields) -> ProfileRecord:
+        with self._lock:
+            record = ProfileRecord(id=next(self._ids), created_at=datetime.utcnow(), **fields)
+            self._records.append(record)
+        return record
+
+    def list(self) -> List[ProfileRecord]:
+        """按时间倒序返回"""
+        with self._lock:
+            return list(reversed(self._records))
+
+    def get(self, profile_id: int) -> Optional[ProfileRecord]:
+        with self._lock:
+            for record in self._records:
+                if record.id == profile_id:
+                    return record
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+
+
+# 当前进程的分析结果（多 worker 部署时每个进程各自保存）
+profiles = ProfileStore(settings.PROFILER_MAX_PROFILES)
+
+
+def _frame_label(frame) -> str:
+    # 折叠栈格式以 ; 分隔帧，标签中不能出现分号
+    if frame.file_path_short and frame.line_no:
+        label = f"{frame.function} ({frame.file_path_short}:{frame.line_no})"
+    else:
+        label = frame.function
+    return label.replace(";", ",")
+
+
+def collapsed_stacks(session) -> str:
+    """
+    折叠栈文本：每行 "根帧;...;叶帧 权重"，权重为微秒
+    采样时间全部落在叶子帧（pyinstrument 用 [self] / [await] 子帧表示自身耗时）
+    """
+    root = session.root_frame()
+    if root is None:
+        return ""
+    weights: Counter = Counter()
+    # 调用栈可能很深，使用显式栈代替递归
+    pending = [(root, (_frame_label(root),))]
+    while pending:
+        frame, path = pending.pop()
+        if not frame.children:
+            weights[";".join(path)] += frame.time
+            continue
+        for child in frame.children:
+            pending.append((child, path + (_frame_label(child),)))
+    lines = [f"{stack} {round(weight * 1_000_000)}" for stack, weight in weights.items()]
+    return "\n".join(sorted(lines)) + "\n"
+
+
+def speedscope_json(session) -> str:
+    return SpeedscopeRenderer().render(session)
+
+
+class ProfilerMiddleware:
+    """
+    请求采样分析中间件
+
+    sample_rate: 随机分析的请求比例（0~1）
+    slow_threshold: 大于 0 时分析所有请求，只保留耗时不低于该值（秒）的结果；
+                    每个请求都会承担采样开销，排查问题期间再开启
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        sample_rate: float = 0.0,
+        slow_threshold: float = 0.0,
+        interval: float = 0.001,
+    ) -> None:
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.interval = interval
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not PYINSTRUMENT_AVAILABLE:
+            await self.app(scope, receive, send)
+            return
+
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled and self.slow_threshold <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        started_at = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            session = profiler.stop()
+            duration = time.perf_counter() - started_at
+            slow = self.slow_threshold > 0 and duration >= self.slow_threshold
+            if sampled or slow:
+                self.store.add(
+                    method=scope["method"],
+                    path=scope["path"],
+                    route=route_template(scope),
+                    status_code=status_code,
+                    duration=duration,
+                    reason="slow" if slow else "sampled",
+                    session=session,
+                )
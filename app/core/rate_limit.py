@@ -0,0 +1,92 @@
+"""
+限流工具
+- RateLimiter: 按 key 的滑动窗口计数（进程内）
+- ConcurrencyLimiter: 限制同时执行的任务数，排队超时即拒绝
+"""
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Hashable, Optional
+import asyncio
+import math
+import threading
+import time
+
+from fastapi import HTTPException, Request, status
+
+from app.core.cache import TTLCache
+
+
+class RateLimiter:
+    """
+    滑动窗口限流器
+
+    每个 key 最多保留 limit 个时间戳；空闲 key 随 TTL 过期，
+    key 总数受 maxsize 限制，内存占用有上界。
+    多 worker 部署时每个进程独立计数。
+    """
+
+    def __init__(self, limit: int, window: float, maxsize: int = 10000):
+        self.limit = limit
+        self.window = window
+        self._hits = TTLCache(maxsize=maxsize, ttl=window)
+        self._lock = threading.Lock()
+
+    def hit(self, key: Hashable) -> Optional[float]:
+        """记录一次请求；超限时返回需要等待的秒数，否则返回 None"""
+        if self.limit <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                hits = deque(maxlen=self.limit)
+            while hits and hits[0] <= now - self.window:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return hits[0] + self.window - now
+            hits.append(now)
+            self._hits.set(key, hits)
+        return None
+
+    def reset(self, key: Hashable) -> None:
+        with self._lock:
+            self._hits.pop(key)
+
+
+class ConcurrencyLimiter:
+    """限制并发数；等待超过 timeout 秒时返回 503"""
+
+    def __init__(self, limit: int, timeout: float):
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="服务繁忙，请稍后再试",
+                headers={"Retry-After": str(max(1, math.ceil(self.timeout)))},
+            )
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+def client_ip(request: Request) -> str:
+    """客户端地址（部署在反向代理后时需以 --proxy-headers 启动 uvicorn）"""
+    return request.client.host if request.client else "unknown"
+
+
+def enforce(limiter: RateLimiter, key: Hashable) -> None:
+    """超限时抛出 429 并附带 Retry-After"""
+    retry_after = limiter.hit(key)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="请求过于频繁，请稍后再试",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
@@ -0,0 +1,44 @@
+"""
+请求上下文工具
+- route_template: 取匹配到的路由模板（如 /api/blogs/{blog_id}），用于日志与指标，避免原始路径导致基数爆炸
+"""
+from typing import Dict, List
+
+from starlette.routing import Match
+from starlette.types import Scope
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+# endpoint id -> 注册了该 endpoint 的路由
+_routes_by_endpoint: Dict[int, List] = {}
+
+
+def _index_routes(scope: Scope) -> None:
+    router = getattr(scope.get("app"), "router", None)
+    for route in getattr(router, "routes", ()):
+        endpoint = getattr(route, "endpoint", None)
+        if endpoint is not None:
+            _routes_by_endpoint.setdefault(id(endpoint), []).append(route)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    返回当前请求匹配到的路由模板
+
+    路由匹配后 scope 中只有 endpoint，这里按 endpoint 反查路由；
+    请求尚未进入路由或未匹配（404）时返回 UNMATCHED_ROUTE。
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    if not _routes_by_endpoint:
+        _index_routes(scope)
+    routes = _routes_by_endpoint.get(id(endpoint), ())
+    if len(routes) == 1:
+        return routes[0].path
+    # 同一个函数注册在多个路径上时，取与当前请求匹配的那个
+    for route in routes:
+        match, _ = route.matches({**scope, "type": "http"})
+        if match == Match.FULL:
+            return route.path
+    return getattr(endpoint, "__name__", UNMATCHED_ROUTE)
@@ -1,12 +1,29 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
 from jose import JWTError, jwt
+import asyncio
 import bcrypt
+import hashlib
+import time
+import uuid
 from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.metrics import PASSWORD_HASH_QUEUE_SECONDS, PASSWORD_HASH_SECONDS
 
 # bcrypt 最多支持 72 字节
 BCRYPT_MAX_LENGTH = 72
 
+# 已验证的JWT载荷缓存（key: 令牌的 SHA-256），避免重复验签
+_token_payload_cache = TTLCache(maxsize=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL, name="jwt_payload")
+
+# bcrypt 专用线程池：哈希计算是CPU密集操作，不能阻塞事件循环，
+# 也不占用默认线程池（文件读写、同步SDK调用等共用）
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+
 
 def _truncate_password(password: str) -> bytes:
     """截断密码到 bcrypt 支持的最大长度"""
@@ -39,6 +56,32 @@ def get_password_hash(password: str) -> str:
     return hashed.decode('utf-8')
 
 
+def _timed(operation: str, submitted_at: float, func: Callable, *args):
+    started_at = time.perf_counter()
+    PASSWORD_HASH_QUEUE_SECONDS.labels(operation).observe(started_at - submitted_at)
+    try:
+        return func(*args)
+    finally:
+        PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - started_at)
+
+
+async def _run_in_hash_executor(operation: str, func: Callable, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, _timed, operation, time.perf_counter(), func, *args
+    )
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """在 bcrypt 线程池中验证密码"""
+    return await _run_in_hash_executor("verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """在 bcrypt 线程池中生成密码哈希"""
+    return await _run_in_hash_executor("hash", get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """创建JWT访问令牌"""
     to_encode = data.copy()
@@ -47,15 +90,57 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
+    to_encode.setdefault("type", "access")
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
+def create_refresh_token(username: str, family: Optional[str] = None) -> str:
+    """
+    创建刷新令牌
+    
+    每个令牌有唯一的 jti；轮换产生的新令牌沿用同一个家族ID（fam），
+    检测到令牌被重复使用时可以吊销整个家族。
+    """
+    expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode = {
+        "sub": username,
+        "type": "refresh",
+        "jti": uuid.uuid4().hex,
+        "fam": family or uuid.uuid4().hex,
+        "exp": expire,
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def decode_refresh_token(token: str) -> Optional[dict]:
+    """解码刷新令牌，类型不符或缺少必要字段时返回 None（不做缓存，刷新请求频率很低）"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("type") != "refresh" or not all(payload.get(key) for key in ("sub", "jti", "fam")):
+        return None
+    return payload
+
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """解码JWT令牌"""
+    """解码JWT令牌（验签结果会被短暂缓存，缓存时长不超过令牌有效期）"""
+    cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload = _token_payload_cache.get(cache_key)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return dict(payload)
+        _token_payload_cache.pop(cache_key)
+        return None
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+    
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        _token_payload_cache.set(cache_key, payload, ttl=min(settings.AUTH_CACHE_TTL, expires_in))
+    return dict(payload)
 
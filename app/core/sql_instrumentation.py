@@ -0,0 +1,158 @@
+"""
+请求级 SQL 统计
+- 通过 SQLAlchemy 游标事件累计每个请求的语句数、数据库耗时与返回行数
+- 统计结果写入 Server-Timing 响应头并输出一条日志
+- 语句数超过预算、或同一条 SQL 在一个请求内重复执行多次（疑似 N+1）时输出警告
+"""
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import SQL_STATEMENTS_PER_REQUEST
+from app.core.request_context import route_template
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SQLStats:
+    statements: int = 0
+    db_time: float = 0.0  # 秒
+    rows: int = 0
+    by_statement: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float, rows: int) -> None:
+        self.statements += 1
+        self.db_time += elapsed
+        self.rows += rows
+        self.by_statement[statement] += 1
+
+    def repeated(self, threshold: int):
+        """返回执行次数不少于 threshold 的语句及次数"""
+        return [(sql, count) for sql, count in self.by_statement.most_common() if count >= threshold]
+
+
+_current_stats: ContextVar[Optional[SQLStats]] = ContextVar("sql_stats", default=None)
+
+
+def current_stats() -> Optional[SQLStats]:
+    return _current_stats.get()
+
+
+def _fetched_rows(cursor) -> int:
+    # 异步驱动的适配游标在 execute 时已把结果读入 _rows；
+    # 其他驱动退回 rowcount（SELECT 时部分驱动为 -1）
+    rows = getattr(cursor, "_rows", None)
+    if rows is not None:
+        return len(rows)
+    return max(getattr(cursor, "rowcount", 0) or 0, 0)
+
+
+def instrument_engine(target: AsyncEngine) -> None:
+    """为引擎注册游标事件；不在请求上下文中执行的语句（后台任务、脚本）不做统计"""
+    sync_engine = target.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if _current_stats.get() is not None:
+            conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = _current_stats.get()
+        started = conn.info.get("query_started_at")
+        if stats is None or not started:
+            return
+        stats.record(statement, time.perf_counter() - started.pop(), _fetched_rows(cursor))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _on_error(exception_context) -> None:
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
+
+
+class SQLInstrumentationMiddleware:
+    """为每个请求建立统计上下文，输出 Server-Timing 头与日志"""
+
+    def __init__(self, app: ASGIApp, server_timing: bool = True) -> None:
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = SQLStats()
+        token = _current_stats.set(stats)
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", _server_timing(stats, time.perf_counter() - started_at))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            _report(scope, stats, status_code, time.perf_counter() - started_at)
+
+
+def _server_timing(stats: SQLStats, elapsed: float) -> str:
+    return (
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} queries", '
+        f"app;dur={elapsed * 1000:.1f}"
+    )
+
+
+def _report(scope: Scope, stats: SQLStats, status_code: int, elapsed: float) -> None:
+    route = route_template(scope)
+    SQL_STATEMENTS_PER_REQUEST.labels(route).observe(stats.statements)
+    fields = {
+        "method": scope["method"],
+        "route": route,
+        "status": status_code,
+        "duration_ms": round(elapsed * 1000, 1),
+        "sql_statements": stats.statements,
+        "sql_time_ms": round(stats.db_time * 1000, 1),
+        "sql_rows": stats.rows,
+    }
+    logger.info(
+        "%s %s %d %.1fms sql=%d/%.1fms rows=%d",
+        fields["method"], route, status_code, fields["duration_ms"],
+        stats.statements, fields["sql_time_ms"], stats.rows,
+        extra={"request_sql": fields},
+    )
+
+    budget = settings.SQL_STATEMENT_BUDGET
+    if budget and stats.statements > budget:
+        logger.warning(
+            "%s %s 执行了 %d 条SQL，超过预算 %d",
+            fields["method"], route, stats.statements, budget,
+            extra={"request_sql": fields},
+        )
+
+    threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+    if threshold:
+        for statement, count in stats.repeated(threshold):
+            logger.warning(
+                "%s %s 疑似 N+1：同一条SQL执行了 %d 次: %s",
+                fields["method"], route, count, " ".join(statement.split())[:300],
+                extra={"request_sql": fields},
+            )
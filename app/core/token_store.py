@@ -0,0 +1,75 @@
+"""
+刷新令牌吊销表
+- 数据库表 revoked_tokens 是权威来源，主键冲突保证同一个 jti 只能被轮换一次
+- 进程内只保留已确认吊销的 ID 及其过期时间，命中时无需查库
+- 过期记录定期清理，表的大小与有效期内的刷新次数成正比
+"""
+from datetime import datetime
+from typing import Dict
+import time
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.token import RevokedToken
+
+# 过期记录的清理间隔（秒）
+PURGE_INTERVAL = 3600
+
+_revoked: Dict[str, datetime] = {}
+_last_purge = 0.0
+
+
+def _remember(token_id: str, expires_at: datetime) -> None:
+    _revoked[token_id] = expires_at
+
+
+def _purge_memory(now: datetime) -> None:
+    for token_id in [key for key, expires_at in _revoked.items() if expires_at <= now]:
+        _revoked.pop(token_id, None)
+
+
+async def _purge_expired(db: AsyncSession) -> None:
+    global _last_purge
+    if time.monotonic() - _last_purge < PURGE_INTERVAL:
+        return
+    _last_purge = time.monotonic()
+    now = datetime.utcnow()
+    _purge_memory(now)
+    await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+
+
+async def is_revoked(db: AsyncSession, *token_ids: str) -> bool:
+    """任一 ID（jti 或家族ID）已被吊销时返回 True"""
+    now = datetime.utcnow()
+    for token_id in token_ids:
+        expires_at = _revoked.get(token_id)
+        if expires_at is not None and expires_at > now:
+            return True
+    result = await db.execute(
+        select(RevokedToken.token_id, RevokedToken.expires_at)
+        .where(RevokedToken.token_id.in_(token_ids))
+    )
+    rows = result.all()
+    for token_id, expires_at in rows:
+        _remember(token_id, expires_at)
+    return bool(rows)
+
+
+async def revoke(db: AsyncSession, token_id: str, expires_at: datetime) -> bool:
+    """
+    吊销 jti 或家族ID 并提交事务
+    
+    返回 False 表示该 ID 已被吊销过（并发轮换或重放同一个刷新令牌）。
+    """
+    try:
+        await db.execute(insert(RevokedToken).values(token_id=token_id, expires_at=expires_at))
+        await _purge_expired(db)
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        _remember(token_id, expires_at)
+        return False
+    _remember(token_id, expires_at)
+    return True
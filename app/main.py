@@ -1,13 +1,43 @@
 """
 FastAPI主应用文件
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import os
+import secrets
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
+from app.core.database import dispose_engine, warm_up_pool
+from app.core.compression import CompressionMiddleware
+from app.core.logging_config import RequestIdMiddleware, setup_logging, shutdown_logging
+from app.core.metrics import MetricsMiddleware, mark_process_dead, render_metrics
+from app.core.profiling import ProfilerMiddleware, profiles
+from app.core.sql_instrumentation import SQLInstrumentationMiddleware
+from app.models.blog_related import related_refresher
+from app.models.content_version import table_version_bumper
 from app.api import auth
-from app.api import blog, photo, ai_project, upload, user, media, ai_demo, ai_image, home
+from app.api import blog, photo, ai_project, upload, user, media, ai_demo, ai_image, home, profiling, feed
+
+
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """应用启动与关闭"""
+    setup_logging()
+    await warm_up_pool()
+    yield
+    await related_refresher.drain()
+    await table_version_bumper.drain()
+    await dispose_engine()
+    mark_process_dead()
+    shutdown_logging()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="个人综合展示网站API",
@@ -15,6 +45,20 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# 请求级SQL统计（Server-Timing 响应头 + 日志）
+if settings.SQL_INSTRUMENTATION:
+    app.add_middleware(SQLInstrumentationMiddleware, server_timing=settings.SQL_SERVER_TIMING)
+
+# 慢请求采样分析（默认关闭）
+if settings.PROFILER_ENABLED:
+    app.add_middleware(
+        ProfilerMiddleware,
+        store=profiles,
+        sample_rate=settings.PROFILER_SAMPLE_RATE,
+        slow_threshold=settings.PROFILER_SLOW_THRESHOLD,
+        interval=settings.PROFILER_INTERVAL,
+    )
+
 # 配置CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,6 +68,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 配置响应压缩（gzip / Brotli）
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
+# 请求指标（最外层，统计压缩后的响应大小与完整耗时）
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# 请求ID（最外层，其他中间件与接口的日志都能带上 request_id）
+app.add_middleware(RequestIdMiddleware)
+
 # 注册路由
 app.include_router(auth.router, prefix="/api")
 app.include_router(blog.router, prefix="/api")
@@ -35,6 +94,17 @@ app.include_router(media.router, prefix="/api")
 app.include_router(ai_demo.router, prefix="/api")
 app.include_router(ai_image.router, prefix="/api")
 app.include_router(home.router, prefix="/api")
+app.include_router(profiling.router, prefix="/api")
+app.include_router(feed.router, prefix="/api")
+
+# 本地存储后端：由应用直接提供上传文件的访问
+if settings.STORAGE_BACKEND == "local" and settings.LOCAL_STORAGE_BASE_URL.startswith("/"):
+    os.makedirs(settings.LOCAL_STORAGE_DIR, exist_ok=True)
+    app.mount(
+        settings.LOCAL_STORAGE_BASE_URL.rstrip("/"),
+        StaticFiles(directory=settings.LOCAL_STORAGE_DIR),
+        name="uploads",
+    )
 
 
 @app.get("/")
@@ -51,3 +121,17 @@ async def root():
 async def health_check():
     """健康检查"""
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus 指标（需配置 METRICS_TOKEN）"""
+    if not settings.METRICS_ENABLED or not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    # 按字节比较：compare_digest 不接受含非 ASCII 字符的 str
+    provided = request.headers.get("Authorization", "")
+    if not secrets.compare_digest(provided.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="无效的指标访问令牌")
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
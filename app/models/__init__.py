@@ -4,6 +4,12 @@ from app.models.photo import Photo, PhotoCategory
 from app.models.ai_project import AIProject
 from app.models.ai_demo import AIDemo
 from app.models.ai_image import AIImage
+from app.models.token import RevokedToken
+from app.models.media import MediaAsset
+from app.models.ai_tag import ai_image_tags, ai_demo_tags
+from app.models.photo_timeline import PhotoDay
+from app.models.blog_related import BlogRelated
+from app.models.content_version import TableVersion
 
 __all__ = [
     "User",
@@ -15,4 +21,11 @@ __all__ = [
     "AIProject",
     "AIDemo",
     "AIImage",
+    "RevokedToken",
+    "MediaAsset",
+    "ai_image_tags",
+    "ai_demo_tags",
+    "PhotoDay",
+    "BlogRelated",
+    "TableVersion",
 ]
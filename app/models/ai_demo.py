@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Index
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -7,6 +7,12 @@ from app.core.database import Base
 class AIDemo(Base):
     """AI 实验室 Demo 元数据"""
     __tablename__ = "ai_demos"
+    __table_args__ = (
+        # 列表接口按 sort_order、created_at 排序；首页先按精选排序
+        Index("ix_ai_demos_published_sort", "is_published", "sort_order", "created_at"),
+        Index("ix_ai_demos_published_featured_sort", "is_published", "is_featured", "sort_order"),
+        Index("ix_ai_demos_category_published_sort", "category", "is_published", "sort_order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False, index=True)
@@ -23,6 +29,7 @@ class AIDemo(Base):
     is_published = Column(Boolean, default=False)
     sort_order = Column(Integer, default=0)
     view_count = Column(Integer, default=0)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # 内容版本，修改内容时自动递增（自动维护）
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     published_at = Column(DateTime(timezone=True), nullable=True)
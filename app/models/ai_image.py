@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, JSON
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, JSON, Index
+from sqlalchemy.sql import func, false
 from app.core.database import Base
 
 class AIImage(Base):
     """AI 生成图片模型"""
     __tablename__ = "ai_images"
+    __table_args__ = (
+        # 列表接口：按发布状态 / 精选 / 分类过滤，按创建时间倒序
+        Index("ix_ai_images_published_created", "is_published", "created_at"),
+        Index("ix_ai_images_featured_published_created", "is_featured", "is_published", "created_at"),
+        Index("ix_ai_images_category_published_created", "category", "is_published", "created_at"),
+        # 公开图库按 NSFW 标记过滤
+        Index("ix_ai_images_nsfw_published_created", "is_nsfw", "is_published", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=True)
@@ -16,9 +24,11 @@ class AIImage(Base):
     parameters = Column(JSON, nullable=True)  # 其他参数：seed, cfg_scale, steps 等
     category = Column(String(100), nullable=True)
     tags = Column(String(500), nullable=True)
+    is_nsfw = Column(Boolean, nullable=False, default=False, server_default=false())  # 由 tags 是否含 nsfw 自动计算
     is_featured = Column(Boolean, default=False)
     is_published = Column(Boolean, default=True)
     view_count = Column(Integer, default=0)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # 内容版本，修改内容时自动递增（自动维护）
     like_count = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
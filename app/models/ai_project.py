@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -6,6 +6,11 @@ from app.core.database import Base
 class AIProject(Base):
     """AI项目模型"""
     __tablename__ = "ai_projects"
+    __table_args__ = (
+        # 列表接口：按发布状态 / 精选过滤，按创建时间倒序
+        Index("ix_ai_projects_published_created", "is_published", "created_at"),
+        Index("ix_ai_projects_featured_published_created", "is_featured", "is_published", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False, index=True)
@@ -19,6 +24,7 @@ class AIProject(Base):
     is_featured = Column(Boolean, default=False)  # 是否精选
     is_published = Column(Boolean, default=False)
     view_count = Column(Integer, default=0)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # 内容版本，修改内容时自动递增（自动维护）
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     published_at = Column(DateTime(timezone=True), nullable=True)
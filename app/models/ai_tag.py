@@ -0,0 +1,138 @@
+"""
+AI 图片 / AI Demo 标签索引
+
+tags 列仍是接口读写的逗号分隔字符串；ai_image_tags、ai_demo_tags 按 (标签, 记录ID)
+保存拆分后的标签（小写、去重），用于按标签过滤。
+AI 图片的 is_nsfw 由标签计算得出，公开图库按该列走索引过滤。
+
+每次 ORM flush 时同步，与源数据处于同一事务；直接用 Core 语句写入源表时调用 rebuild_ai_tags 重建。
+"""
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import (
+    Column, ForeignKey, Index, Integer, String, Table,
+    delete, distinct, event, func, insert, inspect, select, update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.models.ai_demo import AIDemo
+from app.models.ai_image import AIImage
+
+NSFW_TAG = "nsfw"
+TAG_MAX_LENGTH = 50
+
+ai_image_tags = Table(
+    "ai_image_tags",
+    Base.metadata,
+    Column("tag", String(TAG_MAX_LENGTH), primary_key=True),
+    Column("ai_image_id", Integer, ForeignKey("ai_images.id", ondelete="CASCADE"), primary_key=True),
+    # 主键 (tag, ai_image_id) 用于按标签查图片；删除/重建时按图片查标签
+    Index("ix_ai_image_tags_image", "ai_image_id"),
+)
+
+ai_demo_tags = Table(
+    "ai_demo_tags",
+    Base.metadata,
+    Column("tag", String(TAG_MAX_LENGTH), primary_key=True),
+    Column("ai_demo_id", Integer, ForeignKey("ai_demos.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_ai_demo_tags_demo", "ai_demo_id"),
+)
+
+# 模型 -> (标签表, 标签表中的外键列)
+_TAG_TABLES = {
+    AIImage: (ai_image_tags, ai_image_tags.c.ai_image_id),
+    AIDemo: (ai_demo_tags, ai_demo_tags.c.ai_demo_id),
+}
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """拆分逗号分隔的标签（兼容中文逗号），去空白、转小写、去重并保持顺序"""
+    if not value:
+        return []
+    tags: List[str] = []
+    for item in value.replace("，", ",").split(","):
+        tag = item.strip().lower()[:TAG_MAX_LENGTH]
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def tag_filter(model, tags: Iterable[str], match_all: bool = False):
+    """
+    按标签过滤的条件：match_all 为 True 时需包含全部标签（AND），否则包含任一即可（OR）
+    tags 应已经过 parse_tags 规范化
+    """
+    table, owner_column = _TAG_TABLES[model]
+    tags = list(tags)
+    matched = select(owner_column).where(table.c.tag.in_(tags))
+    if match_all and len(tags) > 1:
+        matched = matched.group_by(owner_column).having(func.count(distinct(table.c.tag)) == len(tags))
+    return model.id.in_(matched)
+
+
+def _sync_tags(connection: Connection, model, rows: Dict[int, Optional[str]]) -> None:
+    table, owner_column = _TAG_TABLES[model]
+    connection.execute(delete(table).where(owner_column.in_(list(rows))))
+    values = [
+        {"tag": tag, owner_column.key: owner_id}
+        for owner_id, tags in rows.items()
+        for tag in parse_tags(tags)
+    ]
+    if values:
+        connection.execute(insert(table), values)
+
+
+def rebuild_ai_tags(connection: Connection, batch_size: int = 2000) -> None:
+    """按 tags 列全量重建标签表，并重新计算 AI 图片的 is_nsfw"""
+    for model, (table, _) in _TAG_TABLES.items():
+        connection.execute(delete(table))
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                select(model.id, model.tags)
+                .where(model.id > last_id, model.tags.isnot(None), model.tags != "")
+                .order_by(model.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            _sync_tags(connection, model, dict(rows))
+            last_id = rows[-1][0]
+
+    nsfw_ids = select(ai_image_tags.c.ai_image_id).where(ai_image_tags.c.tag == NSFW_TAG)
+    # 显式保留 updated_at，重建不改变内容版本
+    connection.execute(
+        update(AIImage).values(is_nsfw=AIImage.id.in_(nsfw_ids), updated_at=AIImage.updated_at)
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _compute_nsfw(session: Session, flush_context, instances) -> None:
+    for obj in [*session.new, *session.dirty]:
+        if isinstance(obj, AIImage) and (obj in session.new or inspect(obj).attrs.tags.history.has_changes()):
+            obj.is_nsfw = NSFW_TAG in parse_tags(obj.tags)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_changed_tags(session: Session, flush_context) -> None:
+    changed: Dict[type, Dict[int, Optional[str]]] = {}
+    for obj in [*session.new, *session.deleted, *session.dirty]:
+        model = type(obj)
+        if model not in _TAG_TABLES:
+            continue
+        state = inspect(obj)
+        # 新记录此时还没有 identity，主键已在 INSERT 后写回对象
+        owner_id = state.dict.get("id")
+        if owner_id is None:
+            continue
+        if obj in session.deleted:
+            changed.setdefault(model, {})[owner_id] = None
+        elif obj in session.new or state.attrs.tags.history.has_changes():
+            changed.setdefault(model, {})[owner_id] = state.dict.get("tags")
+    if not changed:
+        return
+    connection = session.connection()
+    for model, rows in changed.items():
+        _sync_tags(connection, model, rows)
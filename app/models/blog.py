@@ -1,7 +1,15 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Table
-from sqlalchemy.orm import relationship
+from typing import Optional
+
+from sqlalchemy import (
+    Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Table, Index, JSON,
+    bindparam, event, inspect, select, update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, defer, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.utils.markdown_render import RENDER_AVAILABLE, RENDER_VERSION, render_markdown
+from app.utils.plain_text import EXCERPT_LENGTH, make_excerpt, markdown_to_text, normalize_search_text
 
 # 博客和标签的多对多关系表
 blog_tag = Table(
@@ -21,6 +29,7 @@ class Category(Base):
     slug = Column(String(50), unique=True, nullable=False, index=True)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     blogs = relationship("Blog", back_populates="category")
 
@@ -33,6 +42,7 @@ class Tag(Base):
     name = Column(String(30), unique=True, nullable=False, index=True)
     slug = Column(String(30), unique=True, nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     blogs = relationship("Blog", secondary=blog_tag, back_populates="tags")
 
@@ -40,6 +50,12 @@ class Tag(Base):
 class Blog(Base):
     """博客模型"""
     __tablename__ = "blogs"
+    __table_args__ = (
+        # 列表接口：按发布状态 / 分类过滤，按创建时间倒序
+        Index("ix_blogs_created_at", "created_at"),
+        Index("ix_blogs_published_created", "is_published", "created_at"),
+        Index("ix_blogs_category_published_created", "category_id", "is_published", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False, index=True)
@@ -49,12 +65,102 @@ class Blog(Base):
     cover_image = Column(String(500), nullable=True)  # 封面图片URL
     is_published = Column(Boolean, default=False)
     view_count = Column(Integer, default=0)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # 内容版本，修改内容时自动递增（自动维护）
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     published_at = Column(DateTime(timezone=True), nullable=True)
+    # 保存时由 content 渲染（自动维护）；render_version 与当前渲染规则不一致时在访问详情时重新渲染
+    content_html = Column(Text(16777215), nullable=True)  # 过滤后的 HTML
+    toc = Column(JSON, nullable=True)  # 目录 [{"id", "text", "level"}]
+    word_count = Column(Integer, nullable=True)
+    reading_time = Column(Integer, nullable=True)  # 阅读时长（分钟）
+    render_version = Column(Integer, nullable=True)
+    # 由 content 提取的纯文本（自动维护）：excerpt 为空时列表使用 auto_excerpt；search_text 供搜索匹配
+    auto_excerpt = Column(String(EXCERPT_LENGTH + 1), nullable=True)
+    search_text = Column(Text(16777215), nullable=True)  # 标题 + 摘要 + 正文（含代码），已规范化
     
     category = relationship("Category", back_populates="blogs")
     tags = relationship("Tag", secondary=blog_tag, back_populates="blogs")
 
+
+
+def rendered_values(content: Optional[str]) -> dict:
+    """content 渲染后的各列；渲染依赖未安装时全部为空，前端回退为客户端渲染"""
+    rendered = render_markdown(content)
+    if rendered is None:
+        return {"content_html": None, "toc": None, "word_count": None, "reading_time": None, "render_version": None}
+    return {
+        "content_html": rendered.html,
+        "toc": rendered.toc,
+        "word_count": rendered.word_count,
+        "reading_time": rendered.reading_time,
+        "render_version": RENDER_VERSION,
+    }
+
+
+def summary_options() -> list:
+    """列表查询不加载正文及由正文派生的大字段"""
+    return [defer(Blog.content), defer(Blog.content_html), defer(Blog.toc), defer(Blog.search_text)]
+
+
+def text_values(title: Optional[str], excerpt: Optional[str], content: Optional[str]) -> dict:
+    return {
+        "auto_excerpt": make_excerpt(markdown_to_text(content)) or None,
+        "search_text": normalize_search_text(title, excerpt, markdown_to_text(content, keep_code=True)),
+    }
+
+
+def rebuild_blog_text(connection: Connection, batch_size: int = 500) -> None:
+    """按 content 重新提取全部文章的纯文本列"""
+    table = Blog.__table__
+    # 显式保留 updated_at，重建不改变内容版本
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values(
+            updated_at=table.c.updated_at,
+            auto_excerpt=bindparam("_auto_excerpt"),
+            search_text=bindparam("_search_text"),
+        )
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, table.c.title, table.c.excerpt, table.c.content)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        connection.execute(statement, [
+            {"_id": row.id, **{f"_{column}": value for column, value in text_values(row.title, row.excerpt, row.content).items()}}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+def current_render_version() -> Optional[int]:
+    """生效的渲染规则版本；未安装渲染依赖时为 None（不重新渲染）"""
+    return RENDER_VERSION if RENDER_AVAILABLE else None
+
+
+def needs_render(blog) -> bool:
+    return RENDER_AVAILABLE and blog.render_version != RENDER_VERSION
+
+
+@event.listens_for(Session, "before_flush")
+def _render_content(session: Session, flush_context, instances) -> None:
+    for obj in [*session.new, *session.dirty]:
+        if not isinstance(obj, Blog):
+            continue
+        state = inspect(obj)
+        is_new = obj in session.new
+        if is_new or state.attrs.content.history.has_changes():
+            for column, value in rendered_values(obj.content).items():
+                setattr(obj, column, value)
+        if is_new or any(state.attrs[field].history.has_changes() for field in ("title", "excerpt", "content")):
+            for column, value in text_values(obj.title, obj.excerpt, obj.content).items():
+                setattr(obj, column, value)
@@ -0,0 +1,291 @@
+"""
+博客相关文章
+
+blog_related 按 (文章ID, 排名) 保存预先计算的相关文章，详情页只需一次按主键的范围查询。
+相关度 = 正文 TF-IDF 余弦相似度、标签 Jaccard 相似度与是否同分类的加权和，只在已发布文章之间计算。
+
+文章新增、删除或修改正文 / 标题 / 摘要 / 发布状态 / 分类 / 标签后，在事务提交后由后台任务刷新：
+重新计算变化的文章，以及列表中包含它、或它的新相关度足以进入其列表的文章。
+计算在线程池中进行，读写使用独立会话，不阻塞事件循环，也不延长写事务；
+刷新完成前详情页返回的是上一次的结果。
+IDF 随语料变化会有漂移，需要精确结果时调用 rebuild_blog_related 全量重建。
+依赖 numpy 与 scipy，未安装时不计算（接口返回空列表）。
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Column, Float, ForeignKey, Integer, delete, event, func, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.cache import response_cache
+from app.core.database import AsyncSessionLocal, Base
+from app.models.blog import Blog, blog_tag
+from app.utils.text_similarity import SIMILARITY_AVAILABLE, binary_matrix, jaccard, np, tfidf_matrix
+
+logger = logging.getLogger(__name__)
+
+RELATED_LIMIT = 6
+MIN_SCORE = 0.05
+TEXT_WEIGHT = 0.6
+TAG_WEIGHT = 0.3
+CATEGORY_WEIGHT = 0.1
+
+# 影响相关度的字段（search_text 由标题、摘要与正文生成）
+_WATCHED_FIELDS = ("search_text", "is_published", "category_id", "tags")
+# 全量重建时每批计算的文章数（相似度矩阵为 批大小 × 文章数 的稠密数组）
+_BATCH_SIZE = 256
+
+
+class BlogRelated(Base):
+    """预先计算的相关文章（自动维护，不要直接修改）"""
+    __tablename__ = "blog_related"
+
+    blog_id = Column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, primary_key=True)  # 从 0 开始，越小越相关
+    related_id = Column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+
+
+def _load_corpus(connection: Connection) -> Tuple[list, list]:
+    """已发布文章的 (id, search_text, category_id) 与 (文章ID, 标签ID)"""
+    rows = connection.execute(
+        select(Blog.id, Blog.search_text, Blog.category_id)
+        .where(Blog.is_published == True)  # noqa: E712
+        .order_by(Blog.id)
+    ).all()
+    tag_rows = connection.execute(
+        select(blog_tag.c.blog_id, blog_tag.c.tag_id).where(blog_tag.c.blog_id.in_(
+            select(Blog.id).where(Blog.is_published == True)  # noqa: E712
+        ))
+    ).all()
+    return rows, tag_rows
+
+
+class _Corpus:
+    """已发布文章的向量化表示，行号与 ids 对应（只做计算，不访问数据库）"""
+
+    def __init__(self, rows: list, tag_rows: list):
+        self.ids: List[int] = [row.id for row in rows]
+        self.index: Dict[int, int] = {blog_id: row for row, blog_id in enumerate(self.ids)}
+        if not rows:
+            return
+
+        tag_columns: Dict[int, int] = {}
+        groups: List[List[int]] = [[] for _ in rows]
+        for blog_id, tag_id in tag_rows:
+            if blog_id in self.index:
+                groups[self.index[blog_id]].append(tag_columns.setdefault(tag_id, len(tag_columns)))
+
+        self.text = tfidf_matrix([row.search_text or "" for row in rows])
+        self.tags = binary_matrix(groups, len(tag_columns))
+        # 无分类记为 -1，比较时排除
+        self.categories = np.array([row.category_id or -1 for row in rows])
+
+    def scores(self, rows: List[int]) -> "np.ndarray":
+        """rows 中各文章与全部文章的相关度（len(rows) × 文章数），与自身的相关度为 -1"""
+        text = (self.text[rows] @ self.text.T).toarray()
+        tags = jaccard(self.tags, rows)
+        categories = self.categories[rows][:, None]
+        same_category = (categories == self.categories[None, :]) & (categories >= 0)
+        scores = TEXT_WEIGHT * text + TAG_WEIGHT * tags + CATEGORY_WEIGHT * same_category
+        scores[np.arange(len(rows)), rows] = -1.0
+        return scores
+
+
+def _top_related(corpus: _Corpus, rows: List[int]) -> List[dict]:
+    values = []
+    for start in range(0, len(rows), _BATCH_SIZE):
+        batch = rows[start:start + _BATCH_SIZE]
+        scores = corpus.scores(batch)
+        limit = min(RELATED_LIMIT, scores.shape[1] - 1)
+        if limit <= 0:
+            break
+        # argpartition 取前 limit 个，再只对这几个排序
+        top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+        for offset, row in enumerate(batch):
+            candidates = sorted(top[offset], key=lambda column: -scores[offset, column])
+            rank = 0
+            for column in candidates:
+                score = float(scores[offset, column])
+                if score < MIN_SCORE:
+                    break
+                values.append({
+                    "blog_id": corpus.ids[row],
+                    "rank": rank,
+                    "related_id": corpus.ids[column],
+                    "score": round(score, 6),
+                })
+                rank += 1
+    return values
+
+
+def _write_statements(blog_ids: Iterable[int], values: List[dict]) -> Iterator[tuple]:
+    """替换 blog_ids 的列表：(语句, 参数) 序列"""
+    table = BlogRelated.__table__
+    blog_ids = list(blog_ids)
+    for start in range(0, len(blog_ids), 500):
+        yield delete(table).where(table.c.blog_id.in_(blog_ids[start:start + 500])), None
+    if values:
+        yield insert(table), values
+
+
+def _write(connection: Connection, blog_ids: Iterable[int], values: List[dict]) -> None:
+    for statement, parameters in _write_statements(blog_ids, values):
+        connection.execute(statement, parameters)
+
+
+@dataclass
+class _RefreshInput:
+    """增量刷新需要读取的数据"""
+    rows: list
+    tag_rows: list
+    listing: Set[int]  # 列表中包含变化文章的文章
+    lists: Dict[int, Tuple[int, float]]  # 文章ID -> (列表长度, 最低分)
+
+
+def _load_refresh(connection: Connection, changed: Set[int]) -> _RefreshInput:
+    table = BlogRelated.__table__
+    rows, tag_rows = _load_corpus(connection)
+    listing = set(connection.execute(
+        select(table.c.blog_id).where(table.c.related_id.in_(changed)).distinct()
+    ).scalars())
+    lists = {
+        blog_id: (count, lowest)
+        for blog_id, count, lowest in connection.execute(
+            select(table.c.blog_id, func.count(), func.min(table.c.score)).group_by(table.c.blog_id)
+        ).all()
+    }
+    return _RefreshInput(rows, tag_rows, listing, lists)
+
+
+def _plan_refresh(data: _RefreshInput, changed: Set[int]) -> Tuple[Set[int], List[dict]]:
+    """计算需要替换列表的文章及其新列表（纯计算，可在线程池中执行）"""
+    corpus = _Corpus(data.rows, data.tag_rows)
+
+    # 列表中包含变化文章的文章需要重算（分数变化，或该文章已删除 / 取消发布）
+    targets = set(data.listing)
+    targets.update(blog_id for blog_id in changed if blog_id in corpus.index)
+
+    # 相关度是对称的：变化文章对其他文章的新分数超过对方列表的最低分（或对方列表未满）时也要重算
+    changed_rows = [corpus.index[blog_id] for blog_id in changed if blog_id in corpus.index]
+    if changed_rows:
+        scores = corpus.scores(changed_rows).max(axis=0)
+        for column in np.flatnonzero(scores >= MIN_SCORE):
+            count, lowest = data.lists.get(corpus.ids[column], (0, None))
+            if count < RELATED_LIMIT or scores[column] > lowest:
+                targets.add(corpus.ids[column])
+
+    rows = sorted(corpus.index[blog_id] for blog_id in targets if blog_id in corpus.index)
+    return changed | targets, _top_related(corpus, rows) if rows else []
+
+
+def refresh_blog_related(connection: Connection, changed_ids: Iterable[int]) -> None:
+    """增量刷新（同步执行）：changed_ids 为新增、修改或删除的文章"""
+    if not SIMILARITY_AVAILABLE:
+        return
+    changed: Set[int] = set(changed_ids)
+    blog_ids, values = _plan_refresh(_load_refresh(connection, changed), changed)
+    _write(connection, blog_ids, values)
+
+
+def rebuild_blog_related(connection: Connection) -> None:
+    """按当前语料全量重建"""
+    if not SIMILARITY_AVAILABLE:
+        logger.warning("未安装 numpy / scipy，跳过相关文章计算")
+        return
+    connection.execute(delete(BlogRelated.__table__))
+    corpus = _Corpus(*_load_corpus(connection))
+    if corpus.ids:
+        _write(connection, [], _top_related(corpus, list(range(len(corpus.ids)))))
+
+
+async def _refresh_in_background(changed: Set[int]) -> None:
+    async with AsyncSessionLocal() as session:
+        data = await session.run_sync(lambda sync_session: _load_refresh(sync_session.connection(), changed))
+        blog_ids, values = await run_in_threadpool(_plan_refresh, data, changed)
+        # 经会话执行 DML，SQLite 生产模式下走写连接
+        for statement, parameters in _write_statements(blog_ids, values):
+            await session.execute(statement, parameters)
+        await session.commit()
+    response_cache.invalidate("blog_related")
+
+
+class RelatedRefresher:
+    """
+    事务提交后在后台刷新相关文章
+
+    同一时间只运行一个刷新，运行期间提交的变化合并到下一轮；失败时记录日志，
+    可调用 rebuild_blog_related 全量重建。
+    """
+
+    def __init__(self):
+        self._pending: Set[int] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self, blog_ids: Iterable[int]) -> None:
+        self._pending.update(blog_ids)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._pending:
+            changed, self._pending = self._pending, set()
+            try:
+                await _refresh_in_background(changed)
+            except Exception:
+                logger.exception("刷新相关文章失败: %s", sorted(changed))
+
+    async def drain(self) -> None:
+        """等待进行中的刷新完成（应用关闭时调用）"""
+        if self._task is not None:
+            await self._task
+
+
+related_refresher = RelatedRefresher()
+
+
+def _changed_blog_ids(session: Session) -> Set[int]:
+    changed: Set[int] = set()
+    for obj in [*session.new, *session.deleted, *session.dirty]:
+        if not isinstance(obj, Blog):
+            continue
+        state = inspect(obj)
+        # 新记录此时还没有 identity，主键已在 INSERT 后写回对象
+        blog_id: Optional[int] = state.dict.get("id")
+        if blog_id is None:
+            continue
+        if obj in session.dirty and not any(
+            state.attrs[field].history.has_changes() for field in _WATCHED_FIELDS
+        ):
+            continue
+        changed.add(blog_id)
+    return changed
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_related(session: Session, flush_context) -> None:
+    changed = _changed_blog_ids(session)
+    if changed:
+        session.info.setdefault("blog_related_changed", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _schedule_related_refresh(session: Session) -> None:
+    changed = session.info.pop("blog_related_changed", None)
+    if not changed or not SIMILARITY_AVAILABLE:
+        return
+    try:
+        related_refresher.schedule(changed)
+    except RuntimeError:
+        # 没有运行中的事件循环（同步脚本）：直接用新连接刷新
+        with session.get_bind().begin() as connection:
+            refresh_blog_related(connection, changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_related(session: Session) -> None:
+    session.info.pop("blog_related_changed", None)
@@ -0,0 +1,143 @@
+"""
+内容版本
+
+ETag 与静态导出的版本依据，不依赖 updated_at（SQLite CURRENT_TIMESTAMP、MySQL DATETIME 只精确到秒，
+同一秒内的两次修改无法区分）：
+- 行版本：博客、摄影作品、AI 图片 / 演示 / 项目的 version 列，修改内容字段时在 flush 前递增
+- 表版本：table_versions 记录各表的写入次数，用于列表等集合。新增、删除或修改内容的事务提交后，
+  由后台任务逐表以单独的短事务递增：不在业务事务内更新这几行，并发写入不会因此互相等待或死锁
+  （MySQL 行锁、SQLite 写锁）。提交后到递增完成之间的请求仍可能拿到旧的表版本，
+  但列表版本同时包含记录数与最大更新时间，下一次递增后 ETag 一定变化
+
+只修改浏览量等字段（app.core.cache.IGNORED_ATTRIBUTES）不改变版本；
+直接用 Core 语句写入这些表时，需在提交后调用 bump_table_versions。
+"""
+from typing import Iterable, Optional, Set
+import asyncio
+import logging
+
+from sqlalchemy import Column, Integer, String, event, insert, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.cache import changed_tables, has_content_changes
+from app.core.database import AsyncSessionLocal, Base
+from app.models.ai_demo import AIDemo
+from app.models.ai_image import AIImage
+from app.models.ai_project import AIProject
+from app.models.blog import Blog
+from app.models.photo import Photo
+
+# 记录表版本的表（即 collection_version / item_version 涉及的表）
+VERSIONED_TABLES = (
+    "blogs", "categories", "tags", "photos", "photo_categories", "ai_images", "ai_demos", "ai_projects",
+)
+_ROW_VERSIONED = (Blog, Photo, AIImage, AIDemo, AIProject)
+
+logger = logging.getLogger(__name__)
+
+
+class TableVersion(Base):
+    """各表的写入版本（自动维护，不要直接修改）"""
+    __tablename__ = "table_versions"
+
+    name = Column(String(64), primary_key=True)  # 表名
+    version = Column(Integer, nullable=False, default=0)
+
+
+@event.listens_for(TableVersion.__table__, "after_create")
+def _seed_table_versions(target, connection: Connection, **kw) -> None:
+    connection.execute(insert(target), [{"name": name, "version": 0} for name in VERSIONED_TABLES])
+
+
+def _bump_statements(name: str):
+    table = TableVersion.__table__
+    return (
+        update(table).where(table.c.name == name).values(version=table.c.version + 1),
+        insert(table).values(name=name, version=1),
+    )
+
+
+def bump_table_versions(engine: Engine, tables: Iterable[str]) -> None:
+    """递增表版本（同步）：按表名顺序，每张表单独一个短事务"""
+    for name in sorted(set(tables).intersection(VERSIONED_TABLES)):
+        bump, seed = _bump_statements(name)
+        with engine.begin() as connection:
+            if connection.execute(bump).rowcount == 0:
+                connection.execute(seed)
+
+
+async def _bump_in_background(tables: Set[str]) -> None:
+    async with AsyncSessionLocal() as session:
+        for name in sorted(tables.intersection(VERSIONED_TABLES)):
+            bump, seed = _bump_statements(name)
+            # 经会话执行 DML，SQLite 生产模式下走写连接
+            if (await session.execute(bump)).rowcount == 0:
+                await session.execute(seed)
+            await session.commit()
+
+
+class TableVersionBumper:
+    """
+    事务提交后在后台递增表版本
+
+    同一时间只运行一个任务，运行期间提交的表合并到下一轮（版本只需变化，合并不影响正确性）；
+    失败时记录日志，对应列表的 ETag 在下一次写入前可能不变。
+    """
+
+    def __init__(self):
+        self._pending: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self, tables: Iterable[str]) -> None:
+        self._pending.update(tables)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._pending:
+            tables, self._pending = self._pending, set()
+            try:
+                await _bump_in_background(tables)
+            except Exception:
+                logger.exception("递增表版本失败: %s", sorted(tables))
+
+    async def drain(self) -> None:
+        """等待进行中的递增完成（应用关闭时调用）"""
+        if self._task is not None:
+            await self._task
+
+
+table_version_bumper = TableVersionBumper()
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_row_versions(session: Session, flush_context, instances) -> None:
+    for obj in session.dirty:
+        if isinstance(obj, _ROW_VERSIONED) and has_content_changes(obj):
+            # SQL 表达式在 UPDATE 中求值，并发修改不会丢失递增
+            obj.version = type(obj).version + 1
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_tables(session: Session, flush_context) -> None:
+    tables = set(changed_tables(session))
+    if tables:
+        session.info.setdefault("table_versions_changed", set()).update(tables)
+
+
+@event.listens_for(Session, "after_commit")
+def _schedule_table_version_bump(session: Session) -> None:
+    tables = session.info.pop("table_versions_changed", None)
+    if not tables:
+        return
+    try:
+        table_version_bumper.schedule(tables)
+    except RuntimeError:
+        # 没有运行中的事件循环（同步脚本）：直接用新连接递增
+        bump_table_versions(session.get_bind(), tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tables(session: Session) -> None:
+    session.info.pop("table_versions_changed", None)
@@ -0,0 +1,171 @@
+"""
+媒体资源索引
+
+media_assets 是博客封面、摄影作品、AI 图片、AI 项目/Demo 封面的冗余汇总表，
+媒体列表、筛选与统计只查这一张表。
+
+每次 ORM flush 后按变更的源记录同步（先删后 INSERT ... SELECT），与源数据处于同一事务；
+直接用 Core 语句批量写入源表时（如 benchmarks.dataset），写完后调用 rebuild_media_assets 重建。
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple, Type
+
+from sqlalchemy import (
+    Column, DateTime, Index, Integer, String, UniqueConstraint,
+    delete, event, func, insert, inspect, literal, null, select,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.models.ai_demo import AIDemo
+from app.models.ai_image import AIImage
+from app.models.ai_project import AIProject
+from app.models.blog import Blog
+from app.models.photo import Photo
+
+
+class MediaAsset(Base):
+    """媒体资源（由源表自动维护，不要直接修改）"""
+    __tablename__ = "media_assets"
+    __table_args__ = (
+        UniqueConstraint("owner_type", "owner_id", "asset_type", name="uq_media_assets_owner"),
+        # 列表：全部 / 按类型，按 (created_at, id) 倒序做游标分页
+        Index("ix_media_assets_created_id", "created_at", "id"),
+        Index("ix_media_assets_type_created_id", "asset_type", "created_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    asset_type = Column(String(20), nullable=False)  # blog_cover / photo / ai_image / ai_cover / ai_demo_cover
+    owner_type = Column(String(20), nullable=False)  # blog / photo / ai_image / ai_project / ai_demo
+    owner_id = Column(Integer, nullable=False)
+    title = Column(String(200), nullable=True)
+    url = Column(String(500), nullable=False)
+    thumbnail_url = Column(String(500), nullable=True)
+    file_size = Column(Integer, nullable=True)  # 字节
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)  # 源记录的创建时间
+
+
+def _no_dimensions():
+    return null(), null(), null()
+
+
+@dataclass(frozen=True)
+class MediaSource:
+    asset_type: str
+    owner_type: str
+    model: Type[Base]
+    url: str  # 图片URL所在列
+    thumbnail_url: Optional[str] = None
+    # (文件大小, 宽, 高) 的取值表达式
+    dimensions: Callable[[], tuple] = _no_dimensions
+    # 源记录上除标题、URL、创建时间外影响媒体记录的字段，修改时重新同步
+    extra_fields: Tuple[str, ...] = ()
+
+    @property
+    def watched(self) -> Set[str]:
+        fields = {"title", "created_at", self.url, *self.extra_fields}
+        if self.thumbnail_url:
+            fields.add(self.thumbnail_url)
+        return fields
+
+    def select_rows(self, owner_ids: Optional[Iterable[int]] = None):
+        """源表 -> media_assets 行的 SELECT，owner_ids 为空表示全部"""
+        model = self.model
+        url = getattr(model, self.url)
+        statement = select(
+            literal(self.asset_type),
+            literal(self.owner_type),
+            model.id,
+            model.title,
+            url,
+            getattr(model, self.thumbnail_url) if self.thumbnail_url else null(),
+            *self.dimensions(),
+            func.coalesce(model.created_at, func.current_timestamp()),
+        ).where(url.isnot(None), url != "")
+        if owner_ids is not None:
+            statement = statement.where(model.id.in_(list(owner_ids)))
+        return statement
+
+
+MEDIA_SOURCES: Dict[str, MediaSource] = {
+    source.asset_type: source
+    for source in (
+        MediaSource("blog_cover", "blog", Blog, "cover_image"),
+        MediaSource(
+            "photo", "photo", Photo, "image_url", "thumbnail_url",
+            dimensions=lambda: (Photo.file_size, Photo.width, Photo.height),
+            extra_fields=("file_size", "width", "height"),
+        ),
+        MediaSource(
+            "ai_image", "ai_image", AIImage, "image_url", "thumbnail_url",
+            # AI 图片没有尺寸列，取生成参数中的宽高
+            dimensions=lambda: (
+                null(),
+                AIImage.parameters["width"].as_integer(),
+                AIImage.parameters["height"].as_integer(),
+            ),
+            extra_fields=("parameters",),
+        ),
+        MediaSource("ai_cover", "ai_project", AIProject, "cover_image"),
+        MediaSource("ai_demo_cover", "ai_demo", AIDemo, "cover_image"),
+    )
+}
+
+_SOURCES_BY_MODEL = {source.model: source for source in MEDIA_SOURCES.values()}
+
+_INSERT_COLUMNS = (
+    "asset_type", "owner_type", "owner_id", "title", "url", "thumbnail_url",
+    "file_size", "width", "height", "created_at",
+)
+
+
+def sync_media_assets(connection: Connection, source: MediaSource, owner_ids: Iterable[int]) -> None:
+    """重新生成指定源记录的媒体记录（源记录已删除或不再有图片时只删除）"""
+    owner_ids = list(owner_ids)
+    if not owner_ids:
+        return
+    connection.execute(
+        delete(MediaAsset.__table__).where(
+            MediaAsset.asset_type == source.asset_type,
+            MediaAsset.owner_type == source.owner_type,
+            MediaAsset.owner_id.in_(owner_ids),
+        )
+    )
+    connection.execute(
+        insert(MediaAsset.__table__).from_select(_INSERT_COLUMNS, source.select_rows(owner_ids))
+    )
+
+
+def rebuild_media_assets(connection: Connection) -> None:
+    """按源表全量重建 media_assets"""
+    connection.execute(delete(MediaAsset.__table__))
+    for source in MEDIA_SOURCES.values():
+        connection.execute(insert(MediaAsset.__table__).from_select(_INSERT_COLUMNS, source.select_rows()))
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_changed_media(session: Session, flush_context) -> None:
+    changed: Dict[MediaSource, Set[int]] = {}
+    for obj in [*session.new, *session.deleted, *session.dirty]:
+        source = _SOURCES_BY_MODEL.get(type(obj))
+        if source is None:
+            continue
+        state = inspect(obj)
+        # 新记录此时还没有 identity，主键已在 INSERT 后写回对象
+        owner_id = state.dict.get("id")
+        if owner_id is None:
+            continue
+        if obj in session.dirty and not any(
+            state.attrs[key].history.has_changes() for key in source.watched
+        ):
+            # 浏览量等字段的修改不影响媒体记录
+            continue
+        changed.setdefault(source, set()).add(owner_id)
+    if not changed:
+        return
+    connection = session.connection()
+    for source, owner_ids in changed.items():
+        sync_media_assets(connection, source, sorted(owner_ids))
@@ -1,7 +1,15 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON
-from sqlalchemy.orm import relationship
+from typing import Optional
+import re
+
+from sqlalchemy import (
+    Column, Integer, Float, String, Text, DateTime, ForeignKey, Boolean, JSON, Index,
+    bindparam, event, inspect, select, update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.utils.geo import geohash_encode, gps_from_exif
 
 
 class PhotoCategory(Base):
@@ -14,6 +22,7 @@ class PhotoCategory(Base):
     description = Column(Text, nullable=True)
     cover_image = Column(String(500), nullable=True)  # 分类封面图
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     photos = relationship("Photo", back_populates="category")
 
@@ -21,6 +30,21 @@ class PhotoCategory(Base):
 class Photo(Base):
     """摄影作品模型"""
     __tablename__ = "photos"
+    __table_args__ = (
+        # 列表接口：按分类 / 精选过滤，按创建时间倒序
+        Index("ix_photos_created_at", "created_at"),
+        Index("ix_photos_category_created", "category_id", "created_at"),
+        Index("ix_photos_featured_created", "is_featured", "created_at"),
+        # 图库按 EXIF 分面过滤
+        Index("ix_photos_camera_created", "make", "model", "created_at"),
+        Index("ix_photos_focal_created", "focal_length_mm", "created_at"),
+        Index("ix_photos_aperture_created", "aperture_value", "created_at"),
+        Index("ix_photos_iso_created", "iso_value", "created_at"),
+        Index("ix_photos_shoot_time", "shoot_time"),
+        # 地图视图：按经纬度框选，按 geohash 前缀聚合（包含坐标列，聚合时只读索引）
+        Index("ix_photos_lat_lng", "latitude", "longitude"),
+        Index("ix_photos_geohash", "geohash", "latitude", "longitude"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False, index=True)
@@ -37,12 +61,137 @@ class Photo(Base):
     shutter_speed = Column(String(50), nullable=True)  # 快门速度
     iso = Column(String(20), nullable=True)  # ISO
     shoot_time = Column(DateTime(timezone=True), nullable=True)  # 拍摄时间
+    # 由上面的文本字段解析出的数值，用于分面统计与范围过滤（自动维护）
+    focal_length_mm = Column(Float, nullable=True)
+    aperture_value = Column(Float, nullable=True)  # f 值
+    iso_value = Column(Integer, nullable=True)
+    latitude = Column(Float, nullable=True)  # 纬度（十进制度数，南纬为负）
+    longitude = Column(Float, nullable=True)  # 经度（西经为负）
+    geohash = Column(String(12), nullable=True)  # 由经纬度计算（自动维护）
     exif = Column(JSON, nullable=True)  # 原始EXIF数据
     category_id = Column(Integer, ForeignKey("photo_categories.id"), nullable=True)
     is_featured = Column(Boolean, default=False)  # 是否精选
     view_count = Column(Integer, default=0)
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # 内容版本，修改内容时自动递增（自动维护）
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     category = relationship("PhotoCategory", back_populates="photos")
 
+
+# 文本字段 -> 数值列
+EXIF_VALUE_FIELDS = {
+    "focal_length": "focal_length_mm",
+    "aperture": "aperture_value",
+    "iso": "iso_value",
+}
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_exif_number(value: Optional[str]) -> Optional[float]:
+    """取文本中的第一个数字，如 "35mm" -> 35.0、"f/2.8" -> 2.8、"ISO 400" -> 400.0"""
+    match = _NUMBER.search(value) if value else None
+    return float(match.group()) if match else None
+
+
+def exif_values(photo) -> dict:
+    values = {column: parse_exif_number(getattr(photo, field)) for field, column in EXIF_VALUE_FIELDS.items()}
+    if values["iso_value"] is not None:
+        values["iso_value"] = int(values["iso_value"])
+    return values
+
+
+def rebuild_photo_exif_values(connection: Connection, batch_size: int = 2000) -> None:
+    """按文本字段重新计算全部作品的数值列"""
+    table = Photo.__table__
+    # 显式保留 updated_at，重建不改变内容版本
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values(
+            updated_at=table.c.updated_at,
+            **{column: bindparam(f"_{column}") for column in EXIF_VALUE_FIELDS.values()},
+        )
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, table.c.focal_length, table.c.aperture, table.c.iso)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        connection.execute(statement, [
+            {"_id": row.id, **{f"_{column}": value for column, value in exif_values(row).items()}}
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+
+@event.listens_for(Session, "before_flush")
+def _compute_exif_values(session: Session, flush_context, instances) -> None:
+    for obj in [*session.new, *session.dirty]:
+        if not isinstance(obj, Photo):
+            continue
+        state = inspect(obj)
+        if obj in session.new or any(state.attrs[field].history.has_changes() for field in EXIF_VALUE_FIELDS):
+            for column, value in exif_values(obj).items():
+                setattr(obj, column, value)
+
+
+def geo_values(latitude: Optional[float], longitude: Optional[float]) -> dict:
+    if latitude is None or longitude is None:
+        return {"latitude": None, "longitude": None, "geohash": None}
+    return {"latitude": latitude, "longitude": longitude, "geohash": geohash_encode(latitude, longitude)}
+
+
+def rebuild_photo_geo(connection: Connection, batch_size: int = 2000) -> None:
+    """回填坐标：已有经纬度的只重新计算 geohash，否则从原始 EXIF 中解析 GPS"""
+    table = Photo.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values(
+            updated_at=table.c.updated_at,
+            **{column: bindparam(f"_{column}") for column in ("latitude", "longitude", "geohash")},
+        )
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, table.c.latitude, table.c.longitude, table.c.exif)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        params = []
+        for row in rows:
+            latitude, longitude = row.latitude, row.longitude
+            if latitude is None or longitude is None:
+                latitude, longitude = gps_from_exif(row.exif)
+            params.append({"_id": row.id, **{f"_{key}": value for key, value in geo_values(latitude, longitude).items()}})
+        connection.execute(statement, params)
+        last_id = rows[-1].id
+
+
+@event.listens_for(Session, "before_flush")
+def _compute_geo(session: Session, flush_context, instances) -> None:
+    for obj in [*session.new, *session.dirty]:
+        if not isinstance(obj, Photo):
+            continue
+        state = inspect(obj)
+        coordinates_changed = any(state.attrs[field].history.has_changes() for field in ("latitude", "longitude"))
+        exif_changed = obj in session.new or state.attrs.exif.history.has_changes()
+        if not (coordinates_changed or exif_changed):
+            continue
+        latitude, longitude = obj.latitude, obj.longitude
+        if not coordinates_changed and (latitude is None or longitude is None):
+            # 未显式给出坐标时取 EXIF 中的 GPS
+            latitude, longitude = gps_from_exif(obj.exif)
+        for column, value in geo_values(latitude, longitude).items():
+            setattr(obj, column, value)
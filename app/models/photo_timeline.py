@@ -0,0 +1,109 @@
+"""
+摄影作品时间线汇总
+
+photo_days 按拍摄日期（shoot_time 的日期部分）保存作品数与封面，时间线/日历接口只读这张表，
+年、月的汇总由日记录在内存中合并（每年最多 366 行）。
+
+作品新增、删除，或修改拍摄时间、精选状态、图片时，在同一事务内重新计算受影响的日期；
+直接用 Core 语句写入 photos 时调用 rebuild_photo_days 重建。
+"""
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional, Set
+
+from sqlalchemy import Boolean, Column, Date, Integer, delete, event, func, inspect, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.models.photo import Photo
+
+# 影响日汇总（数量、封面）的字段
+_WATCHED_FIELDS = ("shoot_time", "is_featured", "image_url", "thumbnail_url")
+
+
+class PhotoDay(Base):
+    """按拍摄日期汇总的作品数与封面（自动维护，不要直接修改）"""
+    __tablename__ = "photo_days"
+
+    day = Column(Date, primary_key=True)
+    photo_count = Column(Integer, nullable=False, default=0)
+    cover_photo_id = Column(Integer, nullable=True)  # 优先精选作品，其次当天最晚拍摄的作品
+    cover_featured = Column(Boolean, nullable=False, default=False)
+
+
+def day_range(day: date) -> tuple:
+    start = datetime(day.year, day.month, day.day)
+    return start, start + timedelta(days=1)
+
+
+def refresh_photo_days(connection: Connection, days: Iterable[date]) -> None:
+    """重新计算指定日期的汇总，当天没有作品时删除该行"""
+    table = PhotoDay.__table__
+    for day in sorted(set(days)):
+        start, end = day_range(day)
+        in_day = (Photo.shoot_time >= start, Photo.shoot_time < end)
+        count = connection.scalar(select(func.count(Photo.id)).where(*in_day))
+        connection.execute(delete(table).where(table.c.day == day))
+        if not count:
+            continue
+        cover = connection.execute(
+            select(Photo.id, Photo.is_featured)
+            .where(*in_day)
+            .order_by(Photo.is_featured.desc(), Photo.shoot_time.desc(), Photo.id.desc())
+            .limit(1)
+        ).first()
+        connection.execute(insert(table).values(
+            day=day,
+            photo_count=count,
+            cover_photo_id=cover.id,
+            cover_featured=bool(cover.is_featured),
+        ))
+
+
+def rebuild_photo_days(connection: Connection) -> None:
+    """按 photos 全量重建"""
+    connection.execute(delete(PhotoDay.__table__))
+    day = func.date(Photo.shoot_time)
+    values = connection.execute(
+        select(day).where(Photo.shoot_time.isnot(None)).group_by(day)
+    ).scalars().all()
+    # SQLite 的 date() 返回字符串
+    refresh_photo_days(connection, (date.fromisoformat(str(value)[:10]) for value in values))
+
+
+def _day_of(value: Optional[datetime]) -> Optional[date]:
+    return value.date() if isinstance(value, datetime) else None
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changed_days(session: Session, flush_context, instances) -> None:
+    # 在 flush 前读取（删除的对象可能需要加载拍摄时间），flush 后再计算
+    days: Set[date] = set()
+    for obj in [*session.new, *session.deleted, *session.dirty]:
+        if not isinstance(obj, Photo):
+            continue
+        state = inspect(obj)
+        if obj in session.dirty and not any(
+            state.attrs[field].history.has_changes() for field in _WATCHED_FIELDS
+        ):
+            continue
+        history = state.attrs.shoot_time.history
+        values = [*history.added, *history.deleted, *history.unchanged]
+        if not values:
+            # 属性已过期（如提交后未重新加载），读取时会从数据库加载
+            values = [obj.shoot_time]
+        days.update(day for day in map(_day_of, values) if day)
+    if days:
+        session.info.setdefault("photo_days", set()).update(days)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_changed_days(session: Session, flush_context) -> None:
+    days = session.info.pop("photo_days", None)
+    if days:
+        refresh_photo_days(session.connection(), days)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_days(session: Session) -> None:
+    session.info.pop("photo_days", None)
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, DateTime
+from app.core.database import Base
+
+
+class RevokedToken(Base):
+    """已吊销的刷新令牌（jti）或令牌家族，过期后可清理"""
+    __tablename__ = "revoked_tokens"
+    
+    token_id = Column(String(32), primary_key=True)  # jti 或 家族ID
+    expires_at = Column(DateTime, nullable=False, index=True)  # UTC
@@ -24,6 +24,7 @@ class AIImageUpdate(AIImageBase):
 
 class AIImage(AIImageBase):
     id: int
+    is_nsfw: bool = False
     view_count: int
     like_count: int
     created_at: datetime
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 
 
 class CategoryBase(BaseModel):
@@ -75,3 +75,40 @@ class Blog(BlogBase):
     class Config:
         from_attributes = True
 
+
+
+class BlogSummary(BaseModel):
+    """列表项：不含正文；未填写摘要时使用由正文提取的自动摘要"""
+    id: int
+    title: str
+    slug: str
+    excerpt: Optional[str] = None
+    cover_image: Optional[str] = None
+    is_published: bool = False
+    category_id: Optional[int] = None
+    view_count: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    published_at: Optional[datetime] = None
+    category: Optional[Category] = None
+    tags: List[Tag] = []
+    word_count: Optional[int] = None
+    reading_time: Optional[int] = None
+    auto_excerpt: Optional[str] = Field(None, exclude=True)
+    
+    @model_validator(mode="after")
+    def _fill_excerpt(self):
+        if not self.excerpt:
+            self.excerpt = self.auto_excerpt
+        return self
+    
+    class Config:
+        from_attributes = True
+
+
+class BlogDetail(Blog):
+    """详情：附带服务端渲染结果（content_html 为空时前端自行渲染 content）"""
+    content_html: Optional[str] = None
+    toc: Optional[List[Dict[str, Any]]] = None
+    word_count: Optional[int] = None
+    reading_time: Optional[int] = None
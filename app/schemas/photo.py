@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, Dict, Any
 
@@ -39,6 +39,8 @@ class PhotoBase(BaseModel):
     shutter_speed: Optional[str] = None
     iso: Optional[str] = None
     shoot_time: Optional[datetime] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     exif: Optional[Dict[str, Any]] = None
 
 
@@ -63,6 +65,8 @@ class PhotoUpdate(BaseModel):
     shutter_speed: Optional[str] = None
     iso: Optional[str] = None
     shoot_time: Optional[datetime] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     exif: Optional[Dict[str, Any]] = None
 
 
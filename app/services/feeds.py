@@ -0,0 +1,293 @@
+"""
+RSS 订阅与站点地图
+
+内容来自已发布的博客、摄影作品、AI 演示与 AI 项目，链接指向前台页面（settings.SITE_URL）。
+- 版本（各表的表版本与最后修改时间）只需一次聚合查询，据此生成 ETag 与 Last-Modified
+- 站点地图按主键分批读取，以异步生成器逐批输出，不在内存中拼出整个文档
+- URL 总数超过 SITEMAP_MAX_URLS 时 sitemap.xml 改为索引，按分区（页面 / 博客 / 摄影）分页
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from heapq import nlargest
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.http_cache import as_utc, collection_version, http_date
+from app.models.ai_demo import AIDemo
+from app.models.ai_project import AIProject
+from app.models.blog import Blog, Category
+from app.models.photo import Photo
+
+# 每次查询读取的行数
+_BATCH_SIZE = 2000
+# 内容版本包含的表（博客分类名出现在 RSS 中）
+_VERSION_MODELS = (Blog, Photo, AIDemo, AIProject, Category)
+
+
+async def content_version(db: AsyncSession) -> Tuple:
+    """_VERSION_MODELS 各表的版本，结构见 collection_version；浏览量更新不会改变它"""
+    return await collection_version(db, _VERSION_MODELS[0], related=_VERSION_MODELS[1:])
+
+
+def _modified_by_model(version: Tuple) -> Dict[type, datetime]:
+    # (行数, 最后修改时间, 表版本, 关联表的 (最后修改时间, 表版本)...)：最后修改时间位于奇数位置
+    return {model: as_utc(value) for model, value in zip(_VERSION_MODELS, version[1::2]) if value is not None}
+
+
+def last_modified(version: Tuple) -> Optional[datetime]:
+    times = _modified_by_model(version).values()
+    return max(times) if times else None
+
+
+def _w3c_date(value: Optional[datetime]) -> Optional[str]:
+    return as_utc(value).replace(microsecond=0).isoformat() if value else None
+
+
+# ---------- RSS ----------
+
+@dataclass
+class FeedItem:
+    title: str
+    link: str
+    guid: str
+    published: datetime
+    description: str = ""
+    category: Optional[str] = None
+
+    def to_xml(self) -> str:
+        parts = [
+            "<item>",
+            f"<title>{escape(self.title)}</title>",
+            f"<link>{escape(self.link)}</link>",
+            f'<guid isPermaLink="{"true" if self.guid == self.link else "false"}">{escape(self.guid)}</guid>',
+            f"<pubDate>{http_date(self.published)}</pubDate>",
+        ]
+        if self.category:
+            parts.append(f"<category>{escape(self.category)}</category>")
+        if self.description:
+            parts.append(f"<description>{escape(self.description)}</description>")
+        parts.append("</item>")
+        return "".join(parts)
+
+
+async def _feed_items(db: AsyncSession, site: str, limit: int) -> List[FeedItem]:
+    """各来源分别取最新的 limit 条，合并后再取前 limit 条"""
+    blogs = (await db.execute(
+        select(
+            Blog.id, Blog.title, Blog.excerpt, Blog.auto_excerpt, Blog.created_at, Blog.published_at,
+            Category.name.label("category"),
+        )
+        .outerjoin(Category, Blog.category_id == Category.id)
+        .where(Blog.is_published == True)  # noqa: E712
+        .order_by(Blog.created_at.desc())
+        .limit(limit)
+    )).all()
+    photos = (await db.execute(
+        select(Photo.id, Photo.title, Photo.description, Photo.created_at)
+        .order_by(Photo.created_at.desc())
+        .limit(limit)
+    )).all()
+    demos = (await db.execute(
+        select(AIDemo.slug, AIDemo.title, AIDemo.description, AIDemo.category, AIDemo.created_at, AIDemo.published_at)
+        .where(AIDemo.is_published == True)  # noqa: E712
+        .order_by(AIDemo.created_at.desc())
+        .limit(limit)
+    )).all()
+    projects = (await db.execute(
+        select(AIProject.slug, AIProject.title, AIProject.description, AIProject.created_at, AIProject.published_at)
+        .where(AIProject.is_published == True)  # noqa: E712
+        .order_by(AIProject.created_at.desc())
+        .limit(limit)
+    )).all()
+
+    items: List[FeedItem] = []
+    for row in blogs:
+        link = f"{site}/blog/{row.id}"
+        items.append(FeedItem(
+            title=row.title, link=link, guid=link, published=row.published_at or row.created_at,
+            description=row.excerpt or row.auto_excerpt or "", category=row.category or "博客",
+        ))
+    for row in photos:
+        link = f"{site}/gallery/{row.id}"
+        items.append(FeedItem(
+            title=row.title, link=link, guid=link, published=row.created_at,
+            description=row.description or "", category="摄影",
+        ))
+    # AI 演示与项目没有独立详情页，链接到列表页，guid 用 slug 区分
+    for row in demos:
+        items.append(FeedItem(
+            title=row.title, link=f"{site}/ai-demo", guid=f"{site}/ai-demo#{row.slug}",
+            published=row.published_at or row.created_at,
+            description=row.description or "", category=row.category or "AI 演示",
+        ))
+    for row in projects:
+        items.append(FeedItem(
+            title=row.title, link=f"{site}/ai-project", guid=f"{site}/ai-project#{row.slug}",
+            published=row.published_at or row.created_at,
+            description=row.description or "", category="AI 项目",
+        ))
+    items = [item for item in items if item.published is not None]
+    return nlargest(limit, items, key=lambda item: as_utc(item.published))
+
+
+async def render_feed(db: AsyncSession, site: str, updated: Optional[datetime]) -> AsyncIterator[bytes]:
+    """RSS 2.0（最新的 FEED_ITEM_LIMIT 条内容）"""
+    items = await _feed_items(db, site, settings.FEED_ITEM_LIMIT)
+    head = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>',
+        f"<title>{escape(settings.APP_NAME)}</title>",
+        f"<link>{escape(site)}/</link>",
+        f'<atom:link href="{escape(site)}/api/feed.xml" rel="self" type="application/rss+xml"/>',
+        "<description>博客、摄影作品与 AI 作品更新</description>",
+        "<language>zh-CN</language>",
+    ]
+    if updated:
+        head.append(f"<lastBuildDate>{http_date(updated)}</lastBuildDate>")
+    yield "".join(head).encode("utf-8")
+    for item in items:
+        yield item.to_xml().encode("utf-8")
+    yield b"</channel></rss>\n"
+
+
+# ---------- 站点地图 ----------
+
+@dataclass
+class SitemapSection:
+    """按主键分批读取的一类详情页"""
+    model: type
+    path: str  # 前台路径前缀，后接主键
+    criteria: Callable[[], Sequence] = lambda: ()
+
+
+SITEMAP_SECTIONS: Dict[str, SitemapSection] = {
+    "blogs": SitemapSection(Blog, "/blog/", lambda: (Blog.is_published == True,)),  # noqa: E712
+    "photos": SitemapSection(Photo, "/gallery/"),
+}
+
+# 前台固定页面，值为决定其最后修改时间的模型
+_PAGES: Tuple[Tuple[str, Tuple[type, ...]], ...] = (
+    ("/", (Blog, Photo, AIDemo, AIProject)),
+    ("/blog", (Blog,)),
+    ("/gallery", (Photo,)),
+    ("/ai-gallery", ()),
+    ("/ai-demo", (AIDemo,)),
+    ("/ai-project", (AIProject,)),
+)
+PAGES_SECTION = "pages"
+
+_URLSET_HEAD = b'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_URLSET_TAIL = b"</urlset>\n"
+
+
+def _url_entry(location: str, modified: Optional[datetime]) -> str:
+    lastmod = _w3c_date(modified)
+    if lastmod:
+        return f"<url><loc>{escape(location)}</loc><lastmod>{lastmod}</lastmod></url>\n"
+    return f"<url><loc>{escape(location)}</loc></url>\n"
+
+
+def _modified_column(model):
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+async def section_count(db: AsyncSession, section: str) -> int:
+    if section == PAGES_SECTION:
+        return len(_PAGES)
+    spec = SITEMAP_SECTIONS[section]
+    return (await db.execute(select(func.count(spec.model.id)).where(*spec.criteria()))).scalar_one()
+
+
+def page_count(count: int) -> int:
+    return max(1, -(-count // settings.SITEMAP_MAX_URLS))
+
+
+def _page_entries(site: str, version: Tuple) -> bytes:
+    modified = _modified_by_model(version)
+    lines = []
+    for path, models in _PAGES:
+        times = [modified[model] for model in models if model in modified]
+        lines.append(_url_entry(f"{site}{path}", max(times) if times else None))
+    return "".join(lines).encode("utf-8")
+
+
+async def _section_entries(
+    db: AsyncSession,
+    site: str,
+    section: str,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> AsyncIterator[bytes]:
+    """按主键顺序输出 [offset, offset + limit) 范围内的 URL；首批用 OFFSET 定位，之后按主键续读"""
+    spec = SITEMAP_SECTIONS[section]
+    model = spec.model
+    remaining = limit
+    last_id: Optional[int] = None
+    while remaining is None or remaining > 0:
+        size = _BATCH_SIZE if remaining is None else min(_BATCH_SIZE, remaining)
+        query = (
+            select(model.id, _modified_column(model).label("modified"))
+            .where(*spec.criteria())
+            .order_by(model.id)
+            .limit(size)
+        )
+        query = query.offset(offset) if last_id is None else query.where(model.id > last_id)
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+        yield "".join(_url_entry(f"{site}{spec.path}{row.id}", row.modified) for row in rows).encode("utf-8")
+        last_id = rows[-1].id
+        if remaining is not None:
+            remaining -= len(rows)
+        if len(rows) < size:
+            break
+
+
+async def render_sitemap(db: AsyncSession, site: str, version: Tuple) -> AsyncIterator[bytes]:
+    """URL 不超过 SITEMAP_MAX_URLS 时直接输出全部 URL，否则输出站点地图索引"""
+    counts = {section: await section_count(db, section) for section in (PAGES_SECTION, *SITEMAP_SECTIONS)}
+    if sum(counts.values()) <= settings.SITEMAP_MAX_URLS:
+        yield _URLSET_HEAD
+        yield _page_entries(site, version)
+        for section in SITEMAP_SECTIONS:
+            async for chunk in _section_entries(db, site, section):
+                yield chunk
+        yield _URLSET_TAIL
+        return
+
+    modified = _modified_by_model(version)
+    updated = last_modified(version)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+    ]
+    for section, count in counts.items():
+        section_updated = modified.get(SITEMAP_SECTIONS[section].model) if section in SITEMAP_SECTIONS else updated
+        lastmod = _w3c_date(section_updated)
+        for page in range(1, page_count(count) + 1):
+            lines.append(f"<sitemap><loc>{escape(site)}/api/sitemap-{section}-{page}.xml</loc>")
+            lines.append(f"<lastmod>{lastmod}</lastmod></sitemap>\n" if lastmod else "</sitemap>\n")
+    lines.append("</sitemapindex>\n")
+    yield "".join(lines).encode("utf-8")
+
+
+async def render_sitemap_page(
+    db: AsyncSession,
+    site: str,
+    version: Tuple,
+    section: str,
+    page: int,
+) -> AsyncIterator[bytes]:
+    """站点地图索引中的一页（page 从 1 开始）"""
+    yield _URLSET_HEAD
+    if section == PAGES_SECTION:
+        yield _page_entries(site, version)
+    else:
+        limit = settings.SITEMAP_MAX_URLS
+        async for chunk in _section_entries(db, site, section, offset=(page - 1) * limit, limit=limit):
+            yield chunk
+    yield _URLSET_TAIL
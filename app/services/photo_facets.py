@@ -0,0 +1,153 @@
+"""
+摄影作品分面：按相机、焦段、光圈、ISO 区间、拍摄年月统计数量并过滤
+
+过滤条件只作用在带索引的列上（make/model、focal_length_mm、aperture_value、iso_value、shoot_time）；
+每个分面的计数应用除自身以外的全部过滤条件，选中某一项后同一分面的其他选项仍然可见。
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import extract, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.photo import Photo
+
+# (键, 名称, 下限, 上限)，区间左闭右开
+FOCAL_BUCKETS: Tuple[Tuple[str, str, Optional[float], Optional[float]], ...] = (
+    ("ultra_wide", "超广角 (<24mm)", None, 24),
+    ("wide", "广角 (24-35mm)", 24, 36),
+    ("standard", "标准 (36-70mm)", 36, 71),
+    ("tele", "中长焦 (71-200mm)", 71, 201),
+    ("super_tele", "超长焦 (>200mm)", 201, None),
+)
+ISO_BUCKETS: Tuple[Tuple[str, str, Optional[int], Optional[int]], ...] = (
+    ("low", "ISO ≤200", None, 201),
+    ("medium", "ISO 201-800", 201, 801),
+    ("high", "ISO 801-3200", 801, 3201),
+    ("extreme", "ISO >3200", 3201, None),
+)
+
+
+def bucket_pattern(buckets) -> str:
+    """用于 Query(pattern=...) 校验分桶参数"""
+    return "^(" + "|".join(key for key, *_ in buckets) + ")$"
+
+
+def _range(column, buckets, key: str) -> list:
+    _, _, low, high = next(bucket for bucket in buckets if bucket[0] == key)
+    criteria = []
+    if low is not None:
+        criteria.append(column >= low)
+    if high is not None:
+        criteria.append(column < high)
+    return criteria
+
+
+def _bucket_of(buckets, value: float) -> Optional[str]:
+    for key, _, low, high in buckets:
+        if (low is None or value >= low) and (high is None or value < high):
+            return key
+    return None
+
+
+@dataclass
+class PhotoFilters:
+    category_id: Optional[int] = None
+    is_featured: Optional[bool] = None
+    make: Optional[str] = None
+    model: Optional[str] = None
+    focal: Optional[str] = None  # FOCAL_BUCKETS 的键
+    aperture: Optional[float] = None
+    iso: Optional[str] = None  # ISO_BUCKETS 的键
+    year: Optional[int] = None
+    month: Optional[int] = None  # 需同时指定 year
+
+    def criteria(self, exclude: str = "") -> list:
+        """SQL 过滤条件；exclude 为分面名称（camera/focal/aperture/iso/date），跳过该分面自身的条件"""
+        criteria = []
+        if self.category_id:
+            criteria.append(Photo.category_id == self.category_id)
+        if self.is_featured is not None:
+            criteria.append(Photo.is_featured == self.is_featured)
+        if exclude != "camera":
+            if self.make:
+                criteria.append(Photo.make == self.make)
+            if self.model:
+                criteria.append(Photo.model == self.model)
+        if self.focal and exclude != "focal":
+            criteria.extend(_range(Photo.focal_length_mm, FOCAL_BUCKETS, self.focal))
+        if self.aperture is not None and exclude != "aperture":
+            criteria.append(Photo.aperture_value == self.aperture)
+        if self.iso and exclude != "iso":
+            criteria.extend(_range(Photo.iso_value, ISO_BUCKETS, self.iso))
+        if self.year and exclude != "date":
+            # 用拍摄时间范围而不是 YEAR()/MONTH()，保证走 shoot_time 索引
+            if self.month:
+                start = datetime(self.year, self.month, 1)
+                end = datetime(self.year + self.month // 12, self.month % 12 + 1, 1)
+            else:
+                start, end = datetime(self.year, 1, 1), datetime(self.year + 1, 1, 1)
+            criteria.extend([Photo.shoot_time >= start, Photo.shoot_time < end])
+        return criteria
+
+
+async def _grouped(db: AsyncSession, filters: PhotoFilters, facet: str, *columns) -> List[tuple]:
+    query = (
+        select(*columns, func.count(Photo.id))
+        .where(*filters.criteria(exclude=facet), *(column.isnot(None) for column in columns))
+        .group_by(*columns)
+    )
+    return (await db.execute(query)).all()
+
+
+def _bucketed(buckets, rows) -> List[Dict[str, Any]]:
+    counts = {key: 0 for key, *_ in buckets}
+    for value, count in rows:
+        key = _bucket_of(buckets, value)
+        if key:
+            counts[key] += count
+    return [
+        {"key": key, "label": label, "count": counts[key]}
+        for key, label, *_ in buckets
+        if counts[key]
+    ]
+
+
+async def compute_facets(db: AsyncSession, filters: PhotoFilters) -> Dict[str, Any]:
+    """各分面的取值与数量（数值列先按原值分组，再在内存中归入区间，分组数很少）"""
+    total = await db.scalar(select(func.count(Photo.id)).where(*filters.criteria()))
+
+    cameras = await _grouped(db, filters, "camera", Photo.make, Photo.model)
+    focal_rows = await _grouped(db, filters, "focal", Photo.focal_length_mm)
+    aperture_rows = await _grouped(db, filters, "aperture", Photo.aperture_value)
+    iso_rows = await _grouped(db, filters, "iso", Photo.iso_value)
+
+    year, month = extract("year", Photo.shoot_time), extract("month", Photo.shoot_time)
+    date_rows = (await db.execute(
+        select(year, month, func.count(Photo.id))
+        .where(*filters.criteria(exclude="date"), Photo.shoot_time.isnot(None))
+        .group_by(year, month)
+    )).all()
+    years: Dict[int, Dict[str, Any]] = {}
+    for row_year, row_month, count in date_rows:
+        entry = years.setdefault(int(row_year), {"year": int(row_year), "count": 0, "months": []})
+        entry["count"] += count
+        entry["months"].append({"month": int(row_month), "count": count})
+    for entry in years.values():
+        entry["months"].sort(key=lambda item: item["month"])
+
+    return {
+        "total": total or 0,
+        "cameras": [
+            {"make": make, "model": model, "count": count}
+            for make, model, count in sorted(cameras, key=lambda row: -row[2])
+        ],
+        "focal_lengths": _bucketed(FOCAL_BUCKETS, focal_rows),
+        "apertures": [
+            {"value": value, "label": f"f/{value:g}", "count": count}
+            for value, count in sorted(aperture_rows)
+        ],
+        "iso": _bucketed(ISO_BUCKETS, iso_rows),
+        "dates": [years[key] for key in sorted(years, reverse=True)],
+    }
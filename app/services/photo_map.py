@@ -0,0 +1,97 @@
+"""
+摄影作品地图：按经纬度范围查询，并按缩放级别在服务端聚合
+
+同一 geohash 前缀（网格）内的作品合并为一个聚合点，返回数量、坐标均值与范围和一张代表作品；
+网格长度随缩放级别变化，整个世界地图也只返回几百个点。
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.photo import Photo
+from app.utils.geo import geohash_precision_for_zoom
+
+
+@dataclass
+class BoundingBox:
+    min_lat: float
+    min_lng: float
+    max_lat: float
+    max_lng: float
+
+    def criteria(self) -> list:
+        criteria = [Photo.latitude >= self.min_lat, Photo.latitude <= self.max_lat]
+        if self.min_lng <= self.max_lng:
+            criteria.extend([Photo.longitude >= self.min_lng, Photo.longitude <= self.max_lng])
+        else:
+            # 跨越 180° 经线的范围
+            criteria.append(or_(Photo.longitude >= self.min_lng, Photo.longitude <= self.max_lng))
+        return criteria
+
+
+async def cluster_photos(
+    db: AsyncSession,
+    bbox: BoundingBox,
+    zoom: int,
+    category_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    precision = geohash_precision_for_zoom(zoom)
+    cell = func.substr(Photo.geohash, 1, precision)
+    criteria = [*bbox.criteria(), Photo.geohash.isnot(None)]
+    if category_id:
+        criteria.append(Photo.category_id == category_id)
+
+    rows = (await db.execute(
+        select(
+            cell.label("cell"),
+            func.count(Photo.id).label("count"),
+            func.avg(Photo.latitude).label("latitude"),
+            func.avg(Photo.longitude).label("longitude"),
+            func.min(Photo.latitude).label("min_lat"),
+            func.max(Photo.latitude).label("max_lat"),
+            func.min(Photo.longitude).label("min_lng"),
+            func.max(Photo.longitude).label("max_lng"),
+            func.max(Photo.id).label("photo_id"),
+        )
+        .where(*criteria)
+        .group_by(cell)
+    )).all()
+
+    # 代表作品（网格内最新上传的一张），只按主键取聚合点数量那么多行
+    photo_ids = [row.photo_id for row in rows]
+    photos = {}
+    if photo_ids:
+        photos = {
+            photo.id: photo
+            for photo in (await db.execute(
+                select(Photo.id, Photo.title, Photo.image_url, Photo.thumbnail_url, Photo.latitude, Photo.longitude)
+                .where(Photo.id.in_(photo_ids))
+            )).all()
+        }
+
+    clusters: List[Dict[str, Any]] = []
+    for row in sorted(rows, key=lambda row: -row.count):
+        photo = photos.get(row.photo_id)
+        single = row.count == 1
+        clusters.append({
+            "geohash": row.cell,
+            "count": row.count,
+            # 单张作品直接使用其坐标
+            "latitude": photo.latitude if single and photo else round(row.latitude, 6),
+            "longitude": photo.longitude if single and photo else round(row.longitude, 6),
+            "bounds": [row.min_lat, row.min_lng, row.max_lat, row.max_lng],
+            "photo": {
+                "id": photo.id,
+                "title": photo.title,
+                "thumbnail_url": photo.thumbnail_url or photo.image_url,
+            } if photo else None,
+        })
+
+    return {
+        "zoom": zoom,
+        "precision": precision,
+        "total": sum(cluster["count"] for cluster in clusters),
+        "clusters": clusters,
+    }
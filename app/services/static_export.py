@@ -0,0 +1,421 @@
+"""
+公开内容静态导出
+
+    python -m app.services.static_export --output static-export          # 增量导出
+    python -m app.services.static_export --output static-export --full   # 忽略清单，全部重新生成
+
+把公开接口返回的 JSON 写入与接口路径对应的目录树，并生成 .gz / .br 预压缩文件，
+流量高峰时可由 Nginx（gzip_static / brotli_static）直接提供：
+- 详情：api/blogs/{id}.json、api/photos/{id}.json、api/ai-images/{id}.json、api/ai-demos/{id}.json、api/ai-projects/{id}.json
+- 列表：{接口路径}/list/{skip}-{limit}.json，分页大小与前台一致，例如
+  location = /api/blogs { try_files /api/blogs/list/${arg_skip}-${arg_limit}.json @backend; }
+- 首页概览、分类与标签：api/home/overview.json、api/blogs/categories.json、api/blogs/tags.json、api/photos/categories.json
+
+manifest.json 记录每个详情文件对应记录的行版本，以及每组列表的版本、文件与总数（静态文件无法携带
+X-Total-Count）。再次导出时只重新生成行版本变化的详情与版本变化的列表组，并删除已下线内容的文件。
+
+详情与列表直接按批读取，用接口的查询条件、排序与响应模型序列化：列表一次顺序读取后切分为各页，
+不必逐页请求接口（每次请求都会重复统计总数）；导出也不会增加浏览量。
+首页概览、分类与标签经应用本身（进程内 ASGI 调用）生成，与接口输出完全一致。
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.compression import compress_bytes, supported_encodings
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, dispose_engine
+from app.core.http_cache import collection_version
+from app.models.ai_demo import AIDemo
+from app.models.ai_image import AIImage
+from app.models.ai_project import AIProject
+from app.models.blog import (
+    Blog, Category, Tag, current_render_version, needs_render, rendered_values, summary_options,
+)
+from app.models.photo import Photo, PhotoCategory
+from app.schemas.ai_demo import AIDemo as AIDemoSchema
+from app.schemas.ai_image import AIImage as AIImageSchema
+from app.schemas.ai_project import AIProject as AIProjectSchema
+from app.schemas.blog import BlogDetail, BlogSummary
+from app.schemas.photo import Photo as PhotoSchema
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 2
+# 每次读取并序列化的记录数
+_BATCH_SIZE = 200
+_COMPRESSED_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+
+def _render_blog(blog: Blog) -> None:
+    """与详情接口一致：未渲染（或渲染规则已变化）的文章先渲染，只修改内存中的对象"""
+    if needs_render(blog):
+        for column, value in rendered_values(blog.content).items():
+            set_committed_value(blog, column, value)
+
+
+@dataclass
+class DetailSource:
+    """一类详情文件：{directory}/{id}.json"""
+    directory: str
+    model: type
+    schema: type
+    criteria: Callable[[], Sequence] = lambda: ()
+    options: Callable[[], Sequence] = lambda: ()
+    related: Tuple[type, ...] = ()  # 嵌入详情的关联表，其版本变化时该类详情全部重新生成
+    prepare: Optional[Callable[[Any], None]] = None
+    # 影响输出但不体现在行版本中的全局版本（如渲染规则），变化时该类详情全部重新生成
+    global_version: Callable[[], Any] = lambda: None
+
+
+@dataclass
+class CollectionSource:
+    """
+    一组列表文件，版本由 collection_version(model, criteria, related) 给出，与接口 ETag 的依据相同
+
+    指定 schema 时按接口的排序（order_by，默认 created_at 倒序）分页写入 {path}/list/{skip}-{page_size}.json；
+    否则经应用请求接口，写入单个文件 {path}.json
+    """
+    name: str
+    path: str
+    model: type
+    criteria: Callable[[], Sequence] = lambda: ()
+    related: Tuple[type, ...] = ()
+    schema: Optional[type] = None
+    options: Callable[[], Sequence] = lambda: ()
+    order_by: Callable[[], Sequence] = lambda: ()
+    page_size: int = 20
+
+
+def _published(model) -> Callable[[], Sequence]:
+    return lambda: (model.is_published == True,)  # noqa: E712
+
+
+def _public_ai_images() -> Sequence:
+    # 与 published_only=true 且不带访问码时一致
+    return (AIImage.is_published == True, AIImage.is_nsfw == False)  # noqa: E712
+
+
+DETAIL_SOURCES: Tuple[DetailSource, ...] = (
+    DetailSource(
+        "api/blogs", Blog, BlogDetail, _published(Blog),
+        options=lambda: (selectinload(Blog.category), selectinload(Blog.tags)),
+        related=(Category, Tag),
+        prepare=_render_blog,
+        global_version=current_render_version,
+    ),
+    DetailSource(
+        "api/photos", Photo, PhotoSchema,
+        options=lambda: (selectinload(Photo.category),),
+        related=(PhotoCategory,),
+    ),
+    DetailSource("api/ai-images", AIImage, AIImageSchema, _public_ai_images),
+    DetailSource("api/ai-demos", AIDemo, AIDemoSchema, _published(AIDemo)),
+    DetailSource("api/ai-projects", AIProject, AIProjectSchema, _published(AIProject)),
+)
+
+# 分页大小与前台（Web/services/dataService.ts）的默认值一致
+COLLECTION_SOURCES: Tuple[CollectionSource, ...] = (
+    CollectionSource(
+        "blogs", "/api/blogs", Blog, _published(Blog), (Category, Tag), BlogSummary,
+        lambda: (selectinload(Blog.category), selectinload(Blog.tags), *summary_options()),
+        page_size=12,
+    ),
+    CollectionSource(
+        "photos", "/api/photos", Photo, related=(PhotoCategory,), schema=PhotoSchema,
+        options=lambda: (selectinload(Photo.category),), page_size=15,
+    ),
+    CollectionSource("ai_images", "/api/ai-images", AIImage, _public_ai_images, schema=AIImageSchema, page_size=15),
+    CollectionSource(
+        "ai_demos", "/api/ai-demos", AIDemo, _published(AIDemo), schema=AIDemoSchema,
+        order_by=lambda: (AIDemo.sort_order.asc(), AIDemo.created_at.desc()), page_size=12,
+    ),
+    CollectionSource(
+        "ai_projects", "/api/ai-projects", AIProject, _published(AIProject), schema=AIProjectSchema, page_size=12,
+    ),
+    CollectionSource("blog_categories", "/api/blogs/categories", Category),
+    CollectionSource("blog_tags", "/api/blogs/tags", Tag),
+    CollectionSource("photo_categories", "/api/photos/categories", PhotoCategory),
+    CollectionSource(
+        "home", "/api/home/overview", Blog, related=(Photo, PhotoCategory, AIDemo, AIProject, Category, Tag),
+    ),
+)
+
+
+# ---------- 文件写入 ----------
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    temporary = path.with_name(f".{path.name}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+def _write_variants(path: Path, body: bytes) -> None:
+    """写入 JSON 及其预压缩版本；小于压缩阈值时不生成压缩文件（并删除旧的）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write(path, body)
+    encodings = supported_encodings() if len(body) >= settings.COMPRESSION_MIN_SIZE else ()
+    for encoding, suffix in _COMPRESSED_SUFFIXES.items():
+        target = path.with_name(path.name + suffix)
+        if encoding in encodings:
+            _atomic_write(target, compress_bytes(body, encoding))
+        else:
+            target.unlink(missing_ok=True)
+
+
+class _Writer:
+    """压缩与写盘在线程池中进行，与数据库读取重叠"""
+
+    def __init__(self, root: Path, workers: int):
+        self.root = root
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="static-export")
+        self._pending: List[Future] = []
+
+    def write(self, relative: str, body: bytes) -> None:
+        self._pending.append(self._pool.submit(_write_variants, self.root / relative, body))
+
+    def remove(self, relative: str) -> None:
+        for suffix in ("", *_COMPRESSED_SUFFIXES.values()):
+            (self.root / (relative + suffix)).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        try:
+            for future in self._pending:
+                future.result()
+        finally:
+            self._pool.shutdown()
+
+
+def _json_body(content: Any) -> bytes:
+    """与接口（及 ResponseCache）输出的 JSON 一致"""
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+# ---------- 详情 ----------
+
+async def _export_details(
+    session: AsyncSession,
+    source: DetailSource,
+    previous: Dict[str, str],
+    writer: _Writer,
+    full: bool,
+) -> Tuple[Dict[str, str], int, int]:
+    """返回 (新的 {id: 版本}, 写入数, 删除数)"""
+    model = source.model
+    related = ""
+    if source.related:
+        related = repr(tuple(await collection_version(session, source.related[0], related=source.related[1:])))
+    rows = (await session.execute(select(model.id, model.version).where(*source.criteria()))).all()
+    shared = f"{related}|{source.global_version()}"
+    current = {str(row.id): f"{row.version}|{shared}" for row in rows}
+
+    changed = [int(key) for key, stamp in current.items() if full or previous.get(key) != stamp]
+    for start in range(0, len(changed), _BATCH_SIZE):
+        batch = changed[start:start + _BATCH_SIZE]
+        objects = (await session.execute(
+            select(model).options(*source.options()).where(model.id.in_(batch))
+        )).scalars().all()
+        for obj in objects:
+            if source.prepare is not None:
+                source.prepare(obj)
+            writer.write(f"{source.directory}/{obj.id}.json", _json_body(source.schema.model_validate(obj)))
+        # 不保留已序列化的对象
+        session.expunge_all()
+
+    removed = previous.keys() - current.keys()
+    for key in removed:
+        writer.remove(f"{source.directory}/{key}.json")
+    return current, len(changed), len(removed)
+
+
+# ---------- 列表 ----------
+
+async def _asgi_get(app, path: str) -> Tuple[int, bytes]:
+    """进程内调用应用（经过全部中间件），不依赖 HTTP 客户端"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"static-export")],
+        "client": ("127.0.0.1", 0),
+        "server": ("static-export", 80),
+    }
+    status = 500
+    chunks: List[bytes] = []
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+async def _write_pages(session: AsyncSession, source: CollectionSource, writer: _Writer) -> List[str]:
+    """按接口的排序顺序读取整个集合并切分为各页；没有内容时也输出第一页（空列表）"""
+    model = source.model
+    query = select(model).options(*source.options()).where(*source.criteria()).order_by(
+        *(source.order_by() or (model.created_at.desc(),))
+    )
+    # 每批为整数页
+    batch_size = source.page_size * max(1, _BATCH_SIZE // source.page_size)
+    files: List[str] = []
+    skip = 0
+    while True:
+        objects = (await session.execute(query.offset(skip).limit(batch_size))).scalars().unique().all()
+        for start in range(0, len(objects), source.page_size):
+            relative = f"{source.path.lstrip('/')}/list/{skip + start}-{source.page_size}.json"
+            page = [source.schema.model_validate(obj) for obj in objects[start:start + source.page_size]]
+            writer.write(relative, _json_body(page))
+            files.append(relative)
+        session.expunge_all()
+        if len(objects) < batch_size:
+            break
+        skip += batch_size
+    if not files:
+        relative = f"{source.path.lstrip('/')}/list/0-{source.page_size}.json"
+        writer.write(relative, _json_body([]))
+        files.append(relative)
+    return files
+
+
+async def _export_collection(
+    app,
+    session: AsyncSession,
+    source: CollectionSource,
+    previous: Dict[str, Any],
+    writer: _Writer,
+    full: bool,
+) -> Optional[Dict[str, Any]]:
+    """版本未变化时返回 None，否则返回新的清单条目"""
+    version = await collection_version(session, source.model, source.criteria(), related=source.related)
+    stamp = repr(tuple(version))
+    limit = source.page_size if source.schema is not None else None
+    if not full and previous.get("version") == stamp and previous.get("limit") == limit:
+        return None
+
+    if source.schema is not None:
+        files = await _write_pages(session, source, writer)
+    else:
+        status, body = await _asgi_get(app, source.path)
+        if status != 200:
+            raise RuntimeError(f"{source.path} 返回 {status}")
+        files = [f"{source.path.lstrip('/')}.json"]
+        writer.write(files[0], body)
+
+    for stale in set(previous.get("files", [])) - set(files):
+        writer.remove(stale)
+    return {"version": stamp, "total": version[0] if limit else None, "limit": limit, "files": files}
+
+
+# ---------- 导出 ----------
+
+def load_manifest(output: Path) -> Dict[str, Any]:
+    path = output / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        logger.warning("导出清单无法读取，将全部重新生成: %s", path)
+        return {}
+    return manifest if manifest.get("format") == MANIFEST_FORMAT else {}
+
+
+async def export_static(
+    output: Path,
+    full: bool = False,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[str, int, int, float], None]] = None,
+) -> Dict[str, Any]:
+    """
+    导出（或增量更新）output 目录，返回新的清单
+
+    progress(名称, 写入文件数, 删除文件数, 耗时秒) 在每类内容完成后调用
+    """
+    from app.main import app
+
+    output.mkdir(parents=True, exist_ok=True)
+    previous = {} if full else load_manifest(output)
+    full = full or not previous
+    manifest: Dict[str, Any] = {"format": MANIFEST_FORMAT, "details": {}, "collections": {}}
+    writer = _Writer(output, workers or os.cpu_count() or 4)
+    try:
+        async with AsyncSessionLocal() as session:
+            for source in DETAIL_SOURCES:
+                started_at = time.perf_counter()
+                current, written, removed = await _export_details(
+                    session, source, previous.get("details", {}).get(source.directory, {}), writer, full,
+                )
+                manifest["details"][source.directory] = current
+                if progress is not None:
+                    progress(source.directory, written, removed, time.perf_counter() - started_at)
+
+            for source in COLLECTION_SOURCES:
+                started_at = time.perf_counter()
+                entry = previous.get("collections", {}).get(source.name, {})
+                updated = await _export_collection(app, session, source, entry, writer, full)
+                manifest["collections"][source.name] = updated or entry
+                if progress is not None:
+                    progress(source.name, len(updated["files"]) if updated else 0, 0, time.perf_counter() - started_at)
+    finally:
+        # 文件全部落盘后才写清单，中途失败时下次导出会重新生成未完成的部分
+        writer.close()
+
+    manifest["generated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    _atomic_write(output / MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+    return manifest
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="导出公开内容的静态 JSON（含 .gz / .br 预压缩文件）")
+    parser.add_argument("--output", default="static-export", help="输出目录")
+    parser.add_argument("--full", action="store_true", help="忽略导出清单，全部重新生成")
+    parser.add_argument("--workers", type=int, default=None, help="压缩与写盘线程数，默认 CPU 核数")
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+
+    def report(name: str, written: int, removed: int, elapsed: float) -> None:
+        print(f"{name:<18}写入 {written:>8}  删除 {removed:>6}  {elapsed:>8.1f}s")
+
+    started_at = time.perf_counter()
+    try:
+        await export_static(Path(args.output), full=args.full, workers=args.workers, progress=report)
+    finally:
+        await dispose_engine()
+    print(f"完成，用时 {time.perf_counter() - started_at:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+GPS 坐标解析与 geohash 编码
+
+EXIF 中的经纬度为 (度, 分, 秒) 三个分数加 N/S、E/W 方向；
+exifread 与 Pillow 解析结果、以及经 _make_serializable 存入 exif JSON 后的 [分子, 分母] 形式都能处理。
+"""
+from fractions import Fraction
+from typing import Any, Dict, Optional, Tuple
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 12
+
+# exifread 的键 / Pillow GPS IFD 的键（存在 exif["GPSInfo"] 下）
+_EXIFREAD_KEYS = ("GPS GPSLatitude", "GPS GPSLatitudeRef", "GPS GPSLongitude", "GPS GPSLongitudeRef")
+_PILLOW_KEYS = ("GPSLatitude", "GPSLatitudeRef", "GPSLongitude", "GPSLongitudeRef")
+
+
+def _number(value) -> Optional[float]:
+    if hasattr(value, "numerator") and hasattr(value, "denominator"):
+        return float(value.numerator) / float(value.denominator) if value.denominator else None
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        numerator, denominator = value
+        return float(numerator) / float(denominator) if denominator else None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(Fraction(value.strip()))
+        except (ValueError, ZeroDivisionError):
+            return None
+    return None
+
+
+def _ref(value) -> str:
+    if isinstance(value, (list, tuple)):
+        value = value[0] if value else ""
+    if isinstance(value, bytes):
+        value = value.decode("ascii", errors="ignore")
+    return str(value or "").strip().upper()[:1]
+
+
+def dms_to_degrees(values, ref) -> Optional[float]:
+    """(度, 分, 秒) + 方向 -> 十进制度数，S / W 为负"""
+    if values is None:
+        return None
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+    parts = [_number(value) for value in values[:3]]
+    if not parts or any(part is None for part in parts):
+        return None
+    degrees = sum(part / 60 ** index for index, part in enumerate(parts))
+    return -degrees if _ref(ref) in ("S", "W") else degrees
+
+
+def gps_from_exif(exif: Optional[Dict[str, Any]]) -> Tuple[Optional[float], Optional[float]]:
+    """从 EXIF 标签映射中取 (纬度, 经度)，缺失或超出范围时返回 (None, None)"""
+    if not isinstance(exif, dict):
+        return None, None
+    source, keys = exif, _EXIFREAD_KEYS
+    if _EXIFREAD_KEYS[0] not in exif and isinstance(exif.get("GPSInfo"), dict):
+        source, keys = exif["GPSInfo"], _PILLOW_KEYS
+    lat_key, lat_ref_key, lng_key, lng_ref_key = keys
+    latitude = dms_to_degrees(source.get(lat_key), source.get(lat_ref_key))
+    longitude = dms_to_degrees(source.get(lng_key), source.get(lng_ref_key))
+    if latitude is None or longitude is None:
+        return None, None
+    # 部分相机未定位时写入 0/0
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or (latitude == 0 and longitude == 0):
+        return None, None
+    return round(latitude, 7), round(longitude, 7)
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """标准 geohash；前缀相同的点位于同一网格，前缀越长网格越小"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_precision_for_zoom(zoom: int) -> int:
+    """
+    地图缩放级别（0-20，Web 墨卡托）对应的聚合网格长度
+    每个网格约为屏幕上几十像素，整屏聚合结果在几百个以内
+    """
+    thresholds = (2, 4, 7, 9, 12, 14, 17)
+    for precision, max_zoom in enumerate(thresholds, start=1):
+        if zoom <= max_zoom:
+            return precision
+    return len(thresholds) + 1
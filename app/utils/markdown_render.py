@@ -0,0 +1,145 @@
+"""
+博客 Markdown 服务端渲染
+
+保存时把 Markdown 渲染为经过白名单过滤的 HTML，同时生成目录、字数与阅读时长，
+详情页直接返回缓存的 HTML，前端不必再解析 Markdown。
+Mermaid 代码块保留为 <pre><code class="language-mermaid">，由前端绘制图表。
+
+依赖 markdown 与 nh3，任一未安装时不渲染（返回 None），前端回退为客户端渲染。
+"""
+from dataclasses import dataclass
+from html import unescape
+from typing import Any, Dict, List, Optional
+import math
+import re
+
+try:
+    import markdown
+    from markdown.extensions import Extension
+    from markdown.inlinepatterns import SimpleTagInlineProcessor
+    from markdown.preprocessors import Preprocessor
+    MARKDOWN_AVAILABLE = True
+except ImportError:
+    MARKDOWN_AVAILABLE = False
+
+try:
+    import nh3
+    NH3_AVAILABLE = True
+except ImportError:
+    NH3_AVAILABLE = False
+
+RENDER_AVAILABLE = MARKDOWN_AVAILABLE and NH3_AVAILABLE
+
+# 渲染规则（扩展、白名单、统计口径）变化时加一，已保存的结果会在访问时重新渲染
+RENDER_VERSION = 1
+
+# 中文约 400 字/分钟，英文约 200 词/分钟
+CJK_CHARS_PER_MINUTE = 400
+WORDS_PER_MINUTE = 200
+
+_HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+_SLUG_REMOVE = re.compile(r"[^\w\- ]")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+_TAG = re.compile(r"<[^>]+>")
+_CODE_BLOCK = re.compile(r"<pre>.*?</pre>", re.S)
+_CJK = re.compile(r"[㐀-䶿一-鿿豈-﫿]")
+_WORD = re.compile(r"[A-Za-z0-9]+(?:['’-][A-Za-z0-9]+)*")
+
+
+@dataclass
+class RenderedMarkdown:
+    html: str
+    toc: List[Dict[str, Any]]  # [{"id", "text", "level"}]，顺序与正文一致
+    word_count: int
+    reading_time: int  # 分钟
+
+
+def slugify(value: str, separator: str = "-") -> str:
+    """与前端 rehype-slug（github-slugger）一致：小写、去掉标点、每个空格替换为 "-"，保留中文"""
+    return _SLUG_REMOVE.sub("", unescape(value).strip().lower()).replace(" ", separator)
+
+
+if MARKDOWN_AVAILABLE:
+    class _ListSpacingPreprocessor(Preprocessor):
+        """GFM 中段落后紧跟的列表无需空行，Python-Markdown 需要；在这种位置补一个空行"""
+
+        def run(self, lines: List[str]) -> List[str]:
+            result: List[str] = []
+            in_fence = False
+            for line in lines:
+                if _FENCE.match(line):
+                    in_fence = not in_fence
+                elif (
+                    not in_fence
+                    and _LIST_ITEM.match(line)
+                    and result
+                    and result[-1].strip()
+                    and not _LIST_ITEM.match(result[-1])
+                    and not result[-1].startswith((" ", "\t"))
+                ):
+                    result.append("")
+                result.append(line)
+            return result
+
+    class _GfmExtension(Extension):
+        """补齐与前端 remark-gfm 的差异：列表前空行、~~删除线~~"""
+
+        def extendMarkdown(self, md) -> None:
+            md.preprocessors.register(_ListSpacingPreprocessor(md), "gfm_list_spacing", 35)
+            md.inlinePatterns.register(SimpleTagInlineProcessor(r"(~~)(.+?)~~", "del"), "gfm_del", 45)
+
+
+def _new_renderer():
+    return markdown.Markdown(
+        extensions=["extra", "sane_lists", "toc", _GfmExtension()],
+        extension_configs={"toc": {"slugify": slugify, "toc_depth": "1-6"}},
+    )
+
+
+def _sanitize(html: str) -> str:
+    tags = set(nh3.ALLOWED_TAGS)
+    attributes = {tag: set(values) for tag, values in nh3.ALLOWED_ATTRIBUTES.items()}
+    for heading in _HEADINGS:
+        attributes.setdefault(heading, set()).add("id")
+    attributes.setdefault("a", set()).update({"title", "id"})
+    attributes.setdefault("img", set()).add("title")
+    attributes.setdefault("code", set()).add("class")  # language-xxx，代码高亮与 Mermaid 依赖
+    attributes.setdefault("li", set()).add("id")  # 脚注
+    attributes.setdefault("sup", set()).add("id")
+    return nh3.clean(html, tags=tags, attributes=attributes, link_rel="noopener noreferrer")
+
+
+def _flatten_toc(tokens: List[dict]) -> List[Dict[str, Any]]:
+    items: List[Dict[str, Any]] = []
+    for token in tokens:
+        items.append({"id": token["id"], "text": unescape(token["name"]), "level": token["level"]})
+        items.extend(_flatten_toc(token.get("children", [])))
+    return items
+
+
+def count_words(text: str) -> int:
+    """中日韩文字按字计，其余按词计"""
+    return len(_CJK.findall(text)) + len(_WORD.findall(text))
+
+
+def reading_minutes(text: str) -> int:
+    cjk = len(_CJK.findall(text))
+    words = len(_WORD.findall(text))
+    return max(1, math.ceil(cjk / CJK_CHARS_PER_MINUTE + words / WORDS_PER_MINUTE))
+
+
+def render_markdown(content: Optional[str]) -> Optional[RenderedMarkdown]:
+    if not RENDER_AVAILABLE:
+        return None
+    renderer = _new_renderer()
+    html = _sanitize(renderer.convert(content or ""))
+    # 统计字数时不计代码块
+    text = unescape(_TAG.sub(" ", _CODE_BLOCK.sub(" ", html)))
+    return RenderedMarkdown(
+        html=html,
+        toc=_flatten_toc(getattr(renderer, "toc_tokens", [])),
+        word_count=count_words(text),
+        reading_time=reading_minutes(text),
+    )
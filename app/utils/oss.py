@@ -1,12 +1,22 @@
 """
 OSS云存储服务工具
 """
+from contextlib import contextmanager
 from typing import Optional, Dict, Any
 from datetime import datetime
 from fractions import Fraction
+from pathlib import Path
 import io
+import logging
 import numbers
+import time
 from app.core.config import settings
+from app.core.metrics import (
+    IMAGE_PIPELINE_IN_PROGRESS, IMAGE_PIPELINE_STAGE_SECONDS, OSS_ERRORS, OSS_REQUEST_SECONDS,
+)
+from app.utils.geo import gps_from_exif
+
+logger = logging.getLogger(__name__)
 
 try:
     import oss2
@@ -27,6 +37,8 @@ try:
 except ImportError:
     EXIFREAD_AVAILABLE = False
 
+_GPS_IFD_TAG = 0x8825
+
 
 def _has_fraction_attrs(value) -> bool:
     return hasattr(value, "numerator") and hasattr(value, "denominator")
@@ -222,6 +234,7 @@ def _extract_with_exifread(image_bytes: bytes) -> tuple[Optional[Dict[str, Any]]
             get_printable("EXIF DateTimeOriginal", "EXIF DateTimeDigitized", "Image DateTime")
         ),
     }
+    summary["latitude"], summary["longitude"] = gps_from_exif(raw_values)
     return mapped, summary
 
 
@@ -245,6 +258,15 @@ def _extract_with_pillow(image_bytes: bytes) -> tuple[Optional[Dict[str, Any]],
         raw_values[tag_name] = value
         mapped[tag_name] = _make_serializable(value)
 
+    # GPSInfo 在主 IFD 中只是子 IFD 的偏移量，需要单独读取
+    try:
+        gps_ifd = exif_data.get_ifd(_GPS_IFD_TAG)
+    except Exception:
+        gps_ifd = {}
+    if gps_ifd:
+        raw_values["GPSInfo"] = {ExifTags.GPSTAGS.get(key, str(key)): value for key, value in gps_ifd.items()}
+        mapped["GPSInfo"] = _make_serializable(raw_values["GPSInfo"])
+
     summary = {
         "make": mapped.get("Make") or None,
         "model": mapped.get("Model") or None,
@@ -262,6 +284,7 @@ def _extract_with_pillow(image_bytes: bytes) -> tuple[Optional[Dict[str, Any]],
             or mapped.get("DateTime")
         ),
     }
+    summary["latitude"], summary["longitude"] = gps_from_exif(raw_values)
     return mapped, summary
 
 
@@ -272,10 +295,65 @@ def _extract_exif_metadata(image_bytes: bytes) -> tuple[Optional[Dict[str, Any]]
     return _extract_with_pillow(image_bytes)
 
 
+@contextmanager
+def _track_oss_call(operation: str):
+    """记录 OSS 调用耗时与失败次数"""
+    started_at = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        OSS_ERRORS.labels(operation).inc()
+        raise
+    finally:
+        OSS_REQUEST_SECONDS.labels(operation).observe(time.perf_counter() - started_at)
+
+
+class _PipelineTimer:
+    """图片处理分阶段计时：mark(stage) 记录自上一次标记以来的耗时"""
+
+    def __init__(self):
+        self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        IMAGE_PIPELINE_STAGE_SECONDS.labels(stage).observe(now - self._last)
+        self._last = now
+
+
+class LocalBucket:
+    """本地目录存储，实现 OSSService 用到的 oss2.Bucket 接口（put_object / delete_object）"""
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+
+    def _resolve(self, key: str) -> Path:
+        path = (self.root / key.lstrip("/")).resolve()
+        if path != self.root and self.root not in path.parents:
+            raise ValueError(f"非法的存储路径: {key}")
+        return path
+
+    def put_object(self, key: str, data: bytes, headers: Optional[dict] = None) -> None:
+        path = self._resolve(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换，读取方不会看到写了一半的文件
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.write_bytes(data)
+        temp_path.replace(path)
+
+    def delete_object(self, key: str) -> None:
+        self._resolve(key).unlink(missing_ok=True)
+
+
 class OSSService:
     """OSS服务类"""
     
     def __init__(self):
+        self.local = settings.STORAGE_BACKEND == "local"
+        if self.local:
+            self.bucket = LocalBucket(settings.LOCAL_STORAGE_DIR)
+            self.enabled = True
+            return
+        
         if not OSS2_AVAILABLE:
             self.bucket = None
             self.enabled = False
@@ -326,16 +404,24 @@ class OSSService:
                 headers['Content-Type'] = content_type
             
             # OSS会自动创建路径中的文件夹结构，无需手动创建
-            self.bucket.put_object(file_path, file_content, headers=headers)
+            with _track_oss_call("put_object"):
+                self.bucket.put_object(file_path, file_content, headers=headers)
             
-            if settings.OSS_BASE_URL:
-                return f"{settings.OSS_BASE_URL.rstrip('/')}/{file_path.lstrip('/')}"
-            else:
-                return f"https://{settings.OSS_BUCKET_NAME}.{settings.OSS_ENDPOINT}/{file_path.lstrip('/')}"
+            return self.public_url(file_path)
         except Exception as e:
-            print(f"OSS上传失败: {e}")
+            logger.error("OSS上传失败: %s", e)
             return None
     
+    def public_url(self, file_path: str) -> str:
+        """对象路径对应的访问URL"""
+        if self.local:
+            base_url = settings.LOCAL_STORAGE_BASE_URL
+        elif settings.OSS_BASE_URL:
+            base_url = settings.OSS_BASE_URL
+        else:
+            base_url = f"https://{settings.OSS_BUCKET_NAME}.{settings.OSS_ENDPOINT}"
+        return f"{base_url.rstrip('/')}/{file_path.lstrip('/')}"
+    
     def extract_oss_path(self, url: str) -> Optional[str]:
         """
         从完整的URL中提取OSS对象路径
@@ -346,6 +432,12 @@ class OSSService:
         # 去除查询参数
         clean_url = url.split('?', 1)[0]
         
+        # 本地存储
+        if self.local:
+            base_url = settings.LOCAL_STORAGE_BASE_URL.rstrip('/') + '/'
+            if clean_url.startswith(base_url):
+                return clean_url[len(base_url):].lstrip('/')
+        
         # 优先处理自定义CDN域名
         if settings.OSS_BASE_URL and clean_url.startswith(settings.OSS_BASE_URL):
             path = clean_url[len(settings.OSS_BASE_URL):]
@@ -391,8 +483,11 @@ class OSSService:
         if not PIL_AVAILABLE:
             return None
         
+        IMAGE_PIPELINE_IN_PROGRESS.inc()
         try:
+            timer = _PipelineTimer()
             raw_exif, exif_summary = _extract_exif_metadata(image_content)
+            timer.mark("exif")
             # 打开图片
             image = Image.open(io.BytesIO(image_content))
             original_format = image.format
@@ -421,6 +516,7 @@ class OSSService:
                 image.save(output, format='JPEG', quality=quality, optimize=True)
             
             compressed_content = output.getvalue()
+            timer.mark("compress")
             
             # 上传原图（或压缩后的图）
             image_url = self.upload_file(
@@ -428,6 +524,7 @@ class OSSService:
                 file_path,
                 content_type=f"image/{original_format.lower() if original_format else 'jpeg'}"
             )
+            timer.mark("upload")
             
             if not image_url:
                 return None
@@ -455,6 +552,9 @@ class OSSService:
                 result["iso"] = exif_summary["iso"]
             if exif_summary.get("shoot_time"):
                 result["shoot_time"] = exif_summary["shoot_time"].isoformat()
+            if exif_summary.get("latitude") is not None:
+                result["latitude"] = exif_summary["latitude"]
+                result["longitude"] = exif_summary["longitude"]
             
             # 生成高质量 WebP 缩略图
             # 增大缩略图尺寸以提高画质（从 400x400 提升到 1200x1200）
@@ -475,6 +575,7 @@ class OSSService:
                 method=6  # 更高压缩质量
             )
             thumbnail_content = thumbnail_output.getvalue()
+            timer.mark("thumbnail")
             
             # 上传缩略图（使用 .webp 后缀）
             base_path = file_path.rsplit('.', 1)[0]
@@ -485,14 +586,17 @@ class OSSService:
                 content_type="image/webp"
             )
             
+            timer.mark("thumbnail_upload")
             if thumbnail_url:
                 result["thumbnail_url"] = thumbnail_url
             
             return result
             
         except Exception as e:
-            print(f"图片上传失败: {e}")
+            logger.error("图片上传失败: %s", e)
             return None
+        finally:
+            IMAGE_PIPELINE_IN_PROGRESS.dec()
 
     def analyze_image(self, image_content: bytes) -> Optional[dict]:
         """
@@ -527,9 +631,12 @@ class OSSService:
             shoot_time = exif_summary.get("shoot_time")
             if shoot_time:
                 analysis["shoot_time"] = shoot_time.isoformat()
+            if exif_summary.get("latitude") is not None:
+                analysis["latitude"] = exif_summary["latitude"]
+                analysis["longitude"] = exif_summary["longitude"]
             return analysis
         except Exception as exc:
-            print(f"图片解析失败: {exc}")
+            logger.warning("图片解析失败: %s", exc)
             return None
     
     def delete_file(self, file_path: str) -> bool:
@@ -546,10 +653,11 @@ class OSSService:
             return False
         
         try:
-            self.bucket.delete_object(file_path)
+            with _track_oss_call("delete_object"):
+                self.bucket.delete_object(file_path)
             return True
         except Exception as e:
-            print(f"OSS删除失败: {e}")
+            logger.error("OSS删除失败: %s", e)
             return False
 
 
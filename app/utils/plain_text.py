@@ -0,0 +1,80 @@
+"""
+Markdown 纯文本提取
+
+博客写入时从 content 中去掉 Markdown / HTML 标记得到纯文本，用于生成摘要与搜索文本。
+只用正则处理，不依赖 Markdown 渲染库，迁移回填全部文章也很快。
+"""
+from html import unescape
+from typing import Optional
+import re
+import unicodedata
+
+EXCERPT_LENGTH = 200
+
+_FENCED_CODE = re.compile(r"^[ \t]*(```|~~~)[^\n]*\n.*?^[ \t]*\1[ \t]*$", re.M | re.S)
+_FENCE_MARKER = re.compile(r"^[ \t]*(```|~~~)[^\n]*$", re.M)
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.S)
+# 内容不是正文的元素连同内容一起去掉（未闭合时去掉到文末）
+_RAW_ELEMENT = re.compile(r"<(script|style|iframe)\b[^>]*>.*?(?:</\1\s*>|\Z)", re.I | re.S)
+_HTML_TAG = re.compile(r"</?[A-Za-z][^>]*>")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\((?:[^()\n]|\([^()\n]*\))*\)|!\[([^\]]*)\]\[[^\]]*\]")
+_LINK = re.compile(r"\[([^\]]+)\]\((?:[^()\n]|\([^()\n]*\))*\)|\[([^\]]+)\]\[[^\]]*\]")
+_AUTOLINK = re.compile(r"<((?:https?|mailto):[^>]+)>")
+_REFERENCE_DEFINITION = re.compile(r"^[ \t]*\[[^\]]+\]:[ \t]*\S+.*$", re.M)
+_LINE_PREFIX = re.compile(r"^[ \t]*(?:#{1,6}[ \t]+|>[ \t]?|[-*+][ \t]+(?:\[[ xX]\][ \t]+)?|\d+[.)][ \t]+)", re.M)
+_HEADING_CLOSE = re.compile(r"[ \t]+#+[ \t]*$", re.M)
+_RULE = re.compile(r"^[ \t]*(?:[-*_][ \t]*){3,}$", re.M)
+_TABLE_DELIMITER = re.compile(r"^[ \t]*\|?[ \t]*:?-{3,}:?[ \t]*(?:\|[ \t]*:?-{3,}:?[ \t]*)*\|?[ \t]*$", re.M)
+_EMPHASIS = re.compile(r"(\*\*|__|~~)(.+?)\1|(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)")
+_INLINE_CODE = re.compile(r"`+([^`]*)`+")
+_FOOTNOTE_REF = re.compile(r"\[\^[^\]]+\]:?")
+_WHITESPACE = re.compile(r"\s+")
+
+_SENTENCE_END = "。！？!?.；;…"
+
+
+def markdown_to_text(content: Optional[str], keep_code: bool = False) -> str:
+    """去掉 Markdown / HTML 标记，返回单行纯文本；keep_code 为 False 时丢弃代码块"""
+    if not content:
+        return ""
+    text = content.replace("\r\n", "\n")
+    text = _FENCED_CODE.sub(lambda m: m.group(0) if keep_code else " ", text)
+    text = _FENCE_MARKER.sub(" ", text)
+    text = _HTML_COMMENT.sub(" ", text)
+    text = _RAW_ELEMENT.sub(" ", text)
+    text = _IMAGE.sub(lambda m: m.group(1) or m.group(2) or "", text)
+    text = _LINK.sub(lambda m: m.group(1) or m.group(2), text)
+    text = _AUTOLINK.sub(r"\1", text)
+    text = _HTML_TAG.sub(" ", text)
+    text = _REFERENCE_DEFINITION.sub(" ", text)
+    text = _FOOTNOTE_REF.sub("", text)
+    text = _RULE.sub(" ", text)
+    text = _TABLE_DELIMITER.sub(" ", text)
+    text = _HEADING_CLOSE.sub("", text)
+    text = _LINE_PREFIX.sub("", text)
+    text = _INLINE_CODE.sub(r"\1", text)
+    # 嵌套强调（如 ***粗斜体***）需要多次替换
+    for _ in range(3):
+        stripped = _EMPHASIS.sub(lambda m: next(group for group in m.groups()[1:] if group is not None), text)
+        if stripped == text:
+            break
+        text = stripped
+    text = text.replace("|", " ")
+    return _WHITESPACE.sub(" ", unescape(text)).strip()
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    """截取不超过 length 个字符的摘要，尽量在句末断开，否则加省略号"""
+    if len(text) <= length:
+        return text
+    cut = text[:length]
+    boundary = max(cut.rfind(mark) for mark in _SENTENCE_END)
+    if boundary >= length // 2:
+        return cut[:boundary + 1]
+    return cut.rstrip() + "…"
+
+
+def normalize_search_text(*parts: Optional[str]) -> str:
+    """搜索用文本：NFKC 规范化（全角转半角等）、小写、合并空白"""
+    text = " ".join(part for part in parts if part)
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text).lower()).strip()
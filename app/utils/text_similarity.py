@@ -0,0 +1,98 @@
+"""
+文本相似度：TF-IDF 稀疏矩阵与余弦相似度
+
+中文没有空格分词，按相邻两字（bigram）切分：把文本转为码点数组，用 numpy 一次性取出相邻的两个汉字
+并编码为整数，避免逐个创建字符串；英文、数字按单词切分。
+依赖 numpy 与 scipy，未安装时 SIMILARITY_AVAILABLE 为 False，调用方应跳过计算。
+"""
+from collections import Counter
+from typing import Dict, List, Sequence
+import re
+
+try:
+    import numpy as np
+    from scipy import sparse
+    SIMILARITY_AVAILABLE = True
+except ImportError:
+    np = None
+    sparse = None
+    SIMILARITY_AVAILABLE = False
+
+_WORD = re.compile(r"[a-z][a-z0-9_]+|[0-9]+[a-z][a-z0-9_]*")
+# (起, 止) 闭区间：CJK 扩展 A、基本区、兼容区
+_CJK_RANGES = ((0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF))
+
+
+def _cjk_bigrams(text: str) -> "np.ndarray":
+    """相邻两个汉字编码为 (前字码点 << 21) | 后字码点"""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+    is_cjk = np.zeros(len(codes), dtype=bool)
+    for low, high in _CJK_RANGES:
+        is_cjk |= (codes >= low) & (codes <= high)
+    pairs = is_cjk[:-1] & is_cjk[1:]
+    return (codes[:-1][pairs].astype(np.int64) << 21) | codes[1:][pairs]
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def tfidf_matrix(documents: Sequence[str], min_df: int = 2, max_df: float = 0.5):
+    """
+    每行一篇文档、按行 L2 归一化的 TF-IDF 矩阵（CSR），两行的点积即余弦相似度
+    只在一篇文档中出现（min_df）或超过 max_df 比例文档中出现的词不参与计算；
+    text 应已小写（如 Blog.search_text）
+    """
+    vocabulary: Dict[str, int] = {}
+    rows: List[int] = []
+    columns: List[int] = []
+    values: List[int] = []
+    bigram_rows: List["np.ndarray"] = []
+    bigrams: List["np.ndarray"] = []
+    for row, document in enumerate(documents):
+        for word, count in Counter(_WORD.findall(document or "")).items():
+            rows.append(row)
+            columns.append(vocabulary.setdefault(word, len(vocabulary)))
+            values.append(count)
+        keys = _cjk_bigrams(document or "")
+        bigrams.append(keys)
+        bigram_rows.append(np.full(len(keys), row))
+
+    # 汉字 bigram 的列号排在单词之后
+    keys, bigram_columns = np.unique(np.concatenate(bigrams or [np.empty(0, np.int64)]), return_inverse=True)
+    all_rows = np.concatenate([np.asarray(rows, dtype=np.int64), *bigram_rows])
+    all_columns = np.concatenate([np.asarray(columns, dtype=np.int64), bigram_columns.ravel() + len(vocabulary)])
+    all_values = np.concatenate([np.asarray(values, dtype=np.float32), np.ones(len(bigram_columns.ravel()), np.float32)])
+
+    shape = (len(documents), max(len(vocabulary) + len(keys), 1))
+    # 重复的 (行, 列) 会被累加为词频
+    counts = sparse.csr_matrix((all_values, (all_rows, all_columns)), shape=shape)
+
+    df = np.bincount(counts.indices, minlength=shape[1])
+    keep = (df >= min(min_df, len(documents))) & (df <= max(max_df * len(documents), 1))
+    counts = counts[:, np.flatnonzero(keep)]
+    df = df[keep]
+
+    # 对数词频（长文不会因重复用词占优）× 平滑 IDF
+    counts.data = 1.0 + np.log(counts.data)
+    idf = np.log((1.0 + len(documents)) / (1.0 + df)) + 1.0
+    return _normalize_rows(counts @ sparse.diags(idf.astype(np.float32)))
+
+
+def binary_matrix(groups: Sequence[Sequence[int]], size: int):
+    """每行一个集合（如文章的标签ID，已映射为 0..size-1 的列号）的 0/1 矩阵"""
+    rows = [row for row, items in enumerate(groups) for _ in items]
+    columns = [column for items in groups for column in items]
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)), shape=(len(groups), max(size, 1))
+    )
+
+
+def jaccard(matrix, rows) -> "np.ndarray":
+    """rows 中各行与全部行的 Jaccard 相似度（稠密数组，形状 len(rows) × 行数）"""
+    sizes = np.asarray(matrix.sum(axis=1)).ravel()
+    intersection = (matrix[rows] @ matrix.T).toarray()
+    union = sizes[rows][:, None] + sizes[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
@@ -0,0 +1,3 @@
+"""
+性能基准与压测工具（不随应用部署）
+"""
@@ -0,0 +1,563 @@
+"""
+压测 / 规模测试数据集
+
+按固定随机种子生成全部业务表的数据，相同的规模与种子生成的数据完全一致，基准结果才能互相比较：
+用户、博客分类/标签/文章（中文 Markdown）、摄影分类/作品（含 EXIF JSON）、
+AI 图片（提示词、生成参数、含 nsfw 标签）、AI Demo 与 AI 项目。
+
+    python -m benchmarks.dataset --database-url sqlite+aiosqlite:///./scale.db \\
+        --blogs 20000 --photos 100000 --ai-images 200000
+    python -m benchmarks.dataset --photos 5000 --images --storage-dir ./uploads   # 同时生成占位图片
+
+数据按块批量写入（每块一个事务），行在生成时流式分块，内存占用与总量无关。
+目标库必须为空。
+"""
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import argparse
+import asyncio
+import io
+import itertools
+import random
+import time
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.core.config import settings
+from app.core.init_db import _create_and_migrate
+from app.core.security import get_password_hash
+from app.models.ai_demo import AIDemo
+from app.models.ai_image import AIImage
+from app.models.ai_tag import ai_image_tags, rebuild_ai_tags
+from app.models.ai_project import AIProject
+from app.models.blog import Blog, Category, Tag, blog_tag, rebuild_blog_text
+from app.models.blog_related import BlogRelated, rebuild_blog_related
+from app.models.media import MediaAsset, rebuild_media_assets
+from app.models.photo import Photo, PhotoCategory, geo_values
+from app.models.photo_timeline import PhotoDay, rebuild_photo_days
+from app.models.user import User
+
+BENCH_USERNAME = "bench"
+BENCH_PASSWORD = "bench-password"
+
+# 所有时间以该时刻为基准往前推，保证可复现
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+CHUNK_SIZE = 2000
+
+BLOG_CATEGORIES = ["技术", "生活", "摄影", "AI", "随笔", "读书", "旅行", "工具"]
+BLOG_TAGS = [
+    "Python", "FastAPI", "SQLAlchemy", "MySQL", "SQLite", "React", "TypeScript", "Docker",
+    "性能优化", "缓存", "数据库", "前端", "后端", "部署", "机器学习", "大模型",
+    "Stable Diffusion", "摄影后期", "胶片", "扫街", "风光", "人像", "年度总结", "读书笔记",
+]
+PHOTO_CATEGORIES = ["风光", "人文", "街拍", "建筑", "夜景", "人像", "静物", "旅行"]
+PARAGRAPHS = [
+    "在构建个人网站的过程中，我们把后端拆分成若干个独立的路由模块，每个模块只负责一类资源。",
+    "列表接口的性能瓶颈往往不在数据库本身，而在序列化与网络传输，压缩与缓存可以显著降低延迟。",
+    "为了让首屏更快，首页概览接口会把博客、摄影与项目数据聚合在一次请求中返回。",
+    "摄影作品的 EXIF 信息包括相机型号、焦距、光圈、快门与 ISO，上传时自动解析并保存。",
+    "异步数据库驱动配合连接池，可以在少量 worker 的情况下支撑较高的并发读请求。",
+    "写作时使用 Markdown，代码块、表格与图片都能在前端正确渲染。",
+    "周末去城郊拍了一组照片，傍晚的光线非常柔和，适合拍摄建筑的轮廓与剪影。",
+    "这一年读了二十多本书，其中几本关于系统设计与性能工程的书籍让我受益匪浅。",
+    "索引并不是越多越好，每多一个索引，写入时就要多维护一棵 B+ 树。",
+    "在雨后的老街上，青石板反射着路灯的光，行人的影子被拉得很长。",
+]
+LIST_ITEMS = ["准备数据集", "编写基准脚本", "记录基线结果", "分析火焰图", "优化热点查询", "回归验证"]
+
+# (品牌, 型号, 可用焦距)
+CAMERAS = [
+    ("SONY", "ILCE-7M3", [24, 35, 50, 85]),
+    ("SONY", "ILCE-7RM4", [16, 35, 90, 135]),
+    ("Canon", "Canon EOS R5", [24, 50, 70, 200]),
+    ("NIKON CORPORATION", "NIKON Z 6_2", [20, 35, 50, 105]),
+    ("FUJIFILM", "X-T4", [16, 23, 33, 56]),
+    ("Apple", "iPhone 15 Pro", [6, 9]),
+    ("RICOH IMAGING COMPANY, LTD.", "RICOH GR III", [18]),
+]
+APERTURES = [(14, 10), (18, 10), (28, 10), (4, 1), (56, 10), (8, 1), (11, 1)]
+EXPOSURES = [(1, 4000), (1, 1000), (1, 250), (1, 125), (1, 60), (1, 15), (1, 2), (2, 1)]
+ISOS = [64, 100, 200, 400, 800, 1600, 3200, 6400]
+PHOTO_SIZES = [(6000, 4000), (4000, 6000), (5472, 3648), (4032, 3024), (6240, 4160)]
+# 拍摄地点（纬度, 经度），带 GPS 的作品在这些城市附近随机分布
+PHOTO_LOCATIONS = [
+    (39.9042, 116.4074), (31.2304, 121.4737), (30.2741, 120.1551), (22.5431, 114.0579),
+    (35.6762, 139.6503), (37.5665, 126.9780), (48.8566, 2.3522), (51.5074, -0.1278),
+    (40.7128, -74.0060), (-33.8688, 151.2093), (64.1466, -21.9426), (-22.9068, -43.1729),
+]
+GPS_RATIO = 0.6
+
+AI_MODELS = ["Stable Diffusion XL", "Midjourney v6", "SD 1.5", "FLUX.1-dev", "DALL·E 3"]
+AI_CATEGORIES = ["人像", "风景", "插画", "赛博朋克", "建筑", "概念设计"]
+AI_TAGS = ["portrait", "landscape", "anime", "cyberpunk", "watercolor", "photorealistic", "fantasy", "night"]
+PROMPT_SUBJECTS = [
+    "a girl standing in the rain", "an ancient temple in the mountains", "a futuristic city at night",
+    "a cat sleeping on a windowsill", "a lighthouse on a stormy coast", "a samurai under cherry blossoms",
+]
+PROMPT_STYLES = [
+    "cinematic lighting", "volumetric fog", "highly detailed", "8k", "film grain", "octane render",
+    "studio ghibli style", "bokeh", "golden hour", "ultra wide angle",
+]
+NEGATIVE_PROMPTS = [
+    "lowres, bad anatomy, bad hands, text, error, missing fingers, cropped, worst quality, jpeg artifacts",
+    "blurry, watermark, signature, deformed, extra limbs",
+    "",
+]
+SAMPLERS = ["DPM++ 2M Karras", "Euler a", "DDIM", "DPM++ SDE Karras"]
+
+
+@dataclass
+class DatasetSize:
+    blogs: int = 500
+    photos: int = 2000
+    ai_images: int = 0
+    ai_demos: int = 0
+    ai_projects: int = 0
+    tags_per_blog: int = 3
+    nsfw_ratio: float = 0.08
+
+
+# ========== 写入 ==========
+
+def chunked(rows: Iterable[dict], size: int = CHUNK_SIZE) -> Iterator[List[dict]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def insert_rows(engine: AsyncEngine, table, rows: Iterable[dict], chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    分块插入，每块一个事务；rows 可以是生成器
+    以参数列表执行 insert(table)，由 SQLAlchemy 的 insertmanyvalues 拼成多行 VALUES 并复用编译结果，
+    比 insert(table).values(chunk) 每块重新编译快数倍
+    """
+    total = 0
+    for chunk in chunked(rows, chunk_size):
+        async with engine.begin() as conn:
+            await conn.execute(insert(table), chunk)
+        total += len(chunk)
+    return total
+
+
+# ========== 数据生成 ==========
+
+def _timestamp(rng: random.Random, days: int = 3 * 365) -> datetime:
+    return EPOCH - timedelta(seconds=rng.randrange(days * 86400))
+
+
+def _markdown(rng: random.Random, title: str) -> str:
+    sections = [f"# {title}"]
+    for index in range(rng.randint(3, 8)):
+        sections.append(f"## 第{index + 1}节")
+        sections.append("\n\n".join(rng.choice(PARAGRAPHS) for _ in range(rng.randint(2, 5))))
+        roll = rng.random()
+        if roll < 0.25:
+            sections.append("```python\nasync def handler(request):\n    return await service.run(request)\n```")
+        elif roll < 0.45:
+            sections.append("\n".join(f"- {item}" for item in rng.sample(LIST_ITEMS, 3)))
+        elif roll < 0.55:
+            sections.append("| 指标 | 优化前 | 优化后 |\n| --- | --- | --- |\n| p95 | 320ms | 85ms |")
+        elif roll < 0.65:
+            sections.append(f"![配图](/uploads/images/blog/{rng.randrange(1000):04d}.jpg)")
+        elif roll < 0.75:
+            sections.append(f"> {rng.choice(PARAGRAPHS)} 详见[这里](https://example.com/post/{rng.randrange(100)})。")
+    return "\n\n".join(sections)
+
+
+def _blog_rows(rng: random.Random, count: int, author_id: int) -> Iterator[dict]:
+    for index in range(1, count + 1):
+        title = f"{rng.choice(BLOG_CATEGORIES)}笔记 {index}：{rng.choice(PARAGRAPHS)[:16]}"
+        content = _markdown(rng, title)
+        created_at = _timestamp(rng)
+        published = rng.random() < 0.9
+        # 大部分文章不填写摘要，由正文自动提取
+        excerpt = rng.choice(PARAGRAPHS) if rng.random() < 0.3 else None
+        yield {
+            "id": index,
+            "title": title[:200],
+            "slug": f"post-{index}",
+            "content": content,
+            "excerpt": excerpt,
+            "is_published": published,
+            "view_count": rng.randint(0, 5000),
+            "category_id": rng.randint(1, len(BLOG_CATEGORIES)),
+            "author_id": author_id,
+            "created_at": created_at,
+            "published_at": created_at if published else None,
+        }
+
+
+def _blog_tag_rows(rng: random.Random, blogs: int, tags_per_blog: int) -> Iterator[dict]:
+    tag_ids = range(1, len(BLOG_TAGS) + 1)
+    for blog_id in range(1, blogs + 1):
+        for tag_id in rng.sample(tag_ids, k=min(tags_per_blog, len(BLOG_TAGS))):
+            yield {"blog_id": blog_id, "tag_id": tag_id}
+
+
+def _exif(rng: random.Random, make: str, model: str, focal: int, width: int, height: int, shot_at: datetime) -> dict:
+    """与 exifread 解析结果经 _make_serializable 后的结构一致（分数为 [分子, 分母]）"""
+    aperture = rng.choice(APERTURES)
+    exposure = rng.choice(EXPOSURES)
+    timestamp = shot_at.strftime("%Y:%m:%d %H:%M:%S")
+    return {
+        "Image Make": make,
+        "Image Model": model,
+        "Image Orientation": [1],
+        "Image XResolution": [[72, 1]],
+        "Image YResolution": [[72, 1]],
+        "Image Software": rng.choice(["Adobe Lightroom Classic 13.0", "Capture One 23", "Ver.1.00"]),
+        "Image DateTime": timestamp,
+        "EXIF ExposureTime": [list(exposure)],
+        "EXIF FNumber": [list(aperture)],
+        "EXIF ExposureProgram": [rng.choice([1, 2, 3])],
+        "EXIF ISOSpeedRatings": [rng.choice(ISOS)],
+        "EXIF DateTimeOriginal": timestamp,
+        "EXIF DateTimeDigitized": timestamp,
+        "EXIF ExposureBiasValue": [[rng.choice([-2, -1, 0, 0, 0, 1]), 3]],
+        "EXIF MeteringMode": [5],
+        "EXIF Flash": [16],
+        "EXIF FocalLength": [[focal, 1]],
+        "EXIF ExifImageWidth": [width],
+        "EXIF ExifImageLength": [height],
+        "EXIF LensModel": f"{focal}mm F{aperture[0] / aperture[1]:g}",
+    }
+
+
+def _gps_exif(latitude: float, longitude: float) -> dict:
+    """exifread 序列化后的 GPS 标签：(度, 分, 秒) 三个分数，秒保留两位小数"""
+    def dms(value: float) -> list:
+        value = abs(value)
+        degrees = int(value)
+        minutes = int((value - degrees) * 60)
+        seconds = round(((value - degrees) * 60 - minutes) * 60 * 100)
+        return [[degrees, 1], [minutes, 1], [seconds, 100]]
+
+    return {
+        "GPS GPSLatitudeRef": "N" if latitude >= 0 else "S",
+        "GPS GPSLatitude": dms(latitude),
+        "GPS GPSLongitudeRef": "E" if longitude >= 0 else "W",
+        "GPS GPSLongitude": dms(longitude),
+    }
+
+
+def _photo_rows(rng: random.Random, count: int) -> Iterator[dict]:
+    base_url = settings.LOCAL_STORAGE_BASE_URL.rstrip("/")
+    for index in range(1, count + 1):
+        width, height = rng.choice(PHOTO_SIZES)
+        make, model, focals = rng.choice(CAMERAS)
+        focal = rng.choice(focals)
+        shot_at = _timestamp(rng, days=5 * 365)
+        exif = _exif(rng, make, model, focal, width, height, shot_at)
+        numerator, denominator = exif["EXIF ExposureTime"][0]
+        aperture = exif["EXIF FNumber"][0]
+        latitude = longitude = None
+        if rng.random() < GPS_RATIO:
+            center_lat, center_lng = rng.choice(PHOTO_LOCATIONS)
+            latitude = round(center_lat + rng.gauss(0, 0.3), 6)
+            longitude = round(center_lng + rng.gauss(0, 0.3), 6)
+            exif.update(_gps_exif(latitude, longitude))
+        path = photo_path(index)
+        yield {
+            "id": index,
+            "title": f"{rng.choice(PHOTO_CATEGORIES)} #{index}",
+            "description": rng.choice(PARAGRAPHS),
+            "image_url": f"{base_url}/{path}",
+            "thumbnail_url": f"{base_url}/{thumbnail_path(path)}",
+            "width": width,
+            "height": height,
+            "file_size": rng.randint(2_000_000, 12_000_000),
+            "make": make,
+            "model": model,
+            "focal_length": f"{focal}mm",
+            "aperture": f"f/{aperture[0] / aperture[1]:g}",
+            "shutter_speed": f"{numerator}s" if denominator == 1 else f"{numerator}/{denominator}s",
+            "iso": str(exif["EXIF ISOSpeedRatings"][0]),
+            "shoot_time": shot_at,
+            "focal_length_mm": float(focal),
+            "aperture_value": aperture[0] / aperture[1],
+            "iso_value": exif["EXIF ISOSpeedRatings"][0],
+            **geo_values(latitude, longitude),
+            "exif": exif,
+            "category_id": rng.randint(1, len(PHOTO_CATEGORIES)),
+            "is_featured": rng.random() < 0.1,
+            "view_count": rng.randint(0, 20000),
+            "created_at": shot_at + timedelta(days=rng.randint(0, 60)),
+        }
+
+
+def _ai_image_rows(rng: random.Random, count: int, nsfw_ratio: float) -> Iterator[dict]:
+    base_url = settings.LOCAL_STORAGE_BASE_URL.rstrip("/")
+    for index in range(1, count + 1):
+        width, height = rng.choice([(1024, 1024), (832, 1216), (1216, 832), (768, 1344)])
+        tags = rng.sample(AI_TAGS, rng.randint(1, 3))
+        if rng.random() < nsfw_ratio:
+            tags.append("nsfw")
+        path = ai_image_path(index)
+        yield {
+            "id": index,
+            "title": f"AI 作品 #{index}" if rng.random() < 0.7 else None,
+            "image_url": f"{base_url}/{path}",
+            "thumbnail_url": f"{base_url}/{thumbnail_path(path)}",
+            "prompt": ", ".join([rng.choice(PROMPT_SUBJECTS), *rng.sample(PROMPT_STYLES, rng.randint(2, 6))]),
+            "negative_prompt": rng.choice(NEGATIVE_PROMPTS) or None,
+            "model_name": rng.choice(AI_MODELS),
+            "parameters": {
+                "seed": rng.randrange(2 ** 32),
+                "steps": rng.choice([20, 25, 30, 40, 50]),
+                "cfg_scale": rng.choice([4.5, 5, 6, 7, 7.5, 9]),
+                "sampler": rng.choice(SAMPLERS),
+                "width": width,
+                "height": height,
+            },
+            "category": rng.choice(AI_CATEGORIES),
+            "tags": ",".join(tags),
+            "is_featured": rng.random() < 0.05,
+            "is_published": rng.random() < 0.95,
+            "view_count": rng.randint(0, 50000),
+            "like_count": rng.randint(0, 2000),
+            "created_at": _timestamp(rng, days=2 * 365),
+        }
+
+
+def _ai_demo_rows(rng: random.Random, count: int) -> Iterator[dict]:
+    base_url = settings.LOCAL_STORAGE_BASE_URL.rstrip("/")
+    for index in range(1, count + 1):
+        created_at = _timestamp(rng)
+        published = rng.random() < 0.8
+        yield {
+            "id": index,
+            "title": f"AI 实验 {index}",
+            "slug": f"demo-{index}",
+            "description": rng.choice(PARAGRAPHS),
+            "cover_image": f"{base_url}/images/bench/demos/{index:05d}.jpg",
+            "category": rng.choice(AI_CATEGORIES),
+            "tags": ",".join(rng.sample(AI_TAGS, 2)),
+            "bundle_path": f"demo-{index}",
+            "entry_file": "index.html",
+            "iframe_height": rng.choice([480, 600, 720]),
+            "is_featured": rng.random() < 0.2,
+            "is_published": published,
+            "sort_order": rng.randint(0, 100),
+            "view_count": rng.randint(0, 5000),
+            "created_at": created_at,
+            "published_at": created_at if published else None,
+        }
+
+
+def _ai_project_rows(rng: random.Random, count: int) -> Iterator[dict]:
+    for index in range(1, count + 1):
+        created_at = _timestamp(rng)
+        published = rng.random() < 0.8
+        yield {
+            "id": index,
+            "title": f"AI 项目 {index}",
+            "slug": f"project-{index}",
+            "description": rng.choice(PARAGRAPHS),
+            "content": _markdown(rng, f"AI 项目 {index}"),
+            "github_url": f"https://github.com/example/project-{index}",
+            "tech_stack": ",".join(rng.sample(["Python", "PyTorch", "FastAPI", "React", "ONNX", "CUDA"], 3)),
+            "is_featured": rng.random() < 0.2,
+            "is_published": published,
+            "view_count": rng.randint(0, 5000),
+            "created_at": created_at,
+            "published_at": created_at if published else None,
+        }
+
+
+def photo_path(index: int) -> str:
+    return f"images/bench/photos/{index // 1000:04d}/{index:07d}.jpg"
+
+
+def ai_image_path(index: int) -> str:
+    return f"images/bench/ai/{index // 1000:04d}/{index:07d}.jpg"
+
+
+def thumbnail_path(path: str) -> str:
+    # 与 OSSService.upload_image 的缩略图命名一致
+    return f"{path.rsplit('.', 1)[0]}_thumb.webp"
+
+
+# ========== 占位图片 ==========
+
+class PlaceholderImages:
+    """
+    预先编码少量纯色小图，按序号轮流写入，避免为每个对象重新编码
+    占位图只保证可访问、宽高比接近，不与数据库中记录的宽高一致
+    """
+
+    RATIOS = ((3, 2), (2, 3), (4, 3), (1, 1), (13, 19), (19, 13), (4, 7))
+
+    def __init__(self, rng: random.Random, variants: int = 16):
+        from PIL import Image
+
+        self._images: Dict[tuple, List[tuple]] = {}
+        for ratio in self.RATIOS:
+            size = (96 * ratio[0] // max(ratio), 96 * ratio[1] // max(ratio))
+            encoded = []
+            for _ in range(variants):
+                image = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+                original, thumbnail = io.BytesIO(), io.BytesIO()
+                image.save(original, format="JPEG", quality=70)
+                image.save(thumbnail, format="WEBP", quality=70)
+                encoded.append((original.getvalue(), thumbnail.getvalue()))
+            self._images[ratio] = encoded
+
+    def pick(self, index: int, width: int, height: int) -> tuple:
+        ratio = min(self._images, key=lambda candidate: abs(candidate[0] / candidate[1] - width / height))
+        variants = self._images[ratio]
+        return variants[index % len(variants)]
+
+
+def write_placeholder_images(rows: Iterable[dict], storage_dir: str, placeholders: PlaceholderImages) -> int:
+    """为每行的 image_url / thumbnail_url 写入占位文件，返回写入文件数"""
+    from app.utils.oss import LocalBucket
+
+    bucket = LocalBucket(storage_dir)
+    prefix = settings.LOCAL_STORAGE_BASE_URL.rstrip("/") + "/"
+    written = 0
+    for row in rows:
+        width = row.get("width") or row["parameters"]["width"]
+        height = row.get("height") or row["parameters"]["height"]
+        original, thumbnail = placeholders.pick(row["id"], width, height)
+        bucket.put_object(row["image_url"][len(prefix):], original)
+        bucket.put_object(row["thumbnail_url"][len(prefix):], thumbnail)
+        written += 2
+    return written
+
+
+# ========== 入口 ==========
+
+async def _is_empty(engine: AsyncEngine) -> bool:
+    async with engine.connect() as conn:
+        for table in (User.__table__, Blog.__table__, Photo.__table__, AIImage.__table__):
+            if await conn.scalar(select(func.count()).select_from(table)):
+                return False
+    return True
+
+
+async def populate(
+    engine: AsyncEngine,
+    size: DatasetSize,
+    seed: int = 42,
+    storage_dir: Optional[str] = None,
+    progress: Optional[Callable[[str, int, float], None]] = None,
+) -> Dict[str, int]:
+    """
+    建表并写入数据，返回各表写入行数
+    storage_dir 不为空时同时在该目录生成摄影作品与 AI 图片的占位文件（本地存储后端）
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_and_migrate)
+    if not await _is_empty(engine):
+        raise RuntimeError("目标数据库已有数据，请使用空库")
+
+    # 每张表使用独立的随机序列，调整某张表的规模不影响其他表的数据
+    def rng_for(table: str) -> random.Random:
+        return random.Random(f"{seed}:{table}")
+
+    placeholders = PlaceholderImages(rng_for("placeholders")) if storage_dir else None
+
+    def with_images(rows: Iterator[dict]) -> Iterator[dict]:
+        # 按块写文件，与插入交替进行，保持流式
+        for chunk in chunked(rows):
+            write_placeholder_images(chunk, storage_dir, placeholders)
+            yield from chunk
+
+    tables = [
+        ("users", User.__table__, lambda: iter([{
+            "id": 1,
+            "username": BENCH_USERNAME,
+            "email": "bench@example.com",
+            "hashed_password": get_password_hash(BENCH_PASSWORD),
+            "is_active": True,
+            "is_superuser": True,
+        }])),
+        ("categories", Category.__table__, lambda: (
+            {"id": index, "name": name, "slug": f"category-{index}"}
+            for index, name in enumerate(BLOG_CATEGORIES, start=1)
+        )),
+        ("tags", Tag.__table__, lambda: (
+            {"id": index, "name": name, "slug": f"tag-{index}"}
+            for index, name in enumerate(BLOG_TAGS, start=1)
+        )),
+        ("blogs", Blog.__table__, lambda: _blog_rows(rng_for("blogs"), size.blogs, author_id=1)),
+        ("blog_tag", blog_tag, lambda: _blog_tag_rows(rng_for("blog_tag"), size.blogs, size.tags_per_blog)),
+        ("photo_categories", PhotoCategory.__table__, lambda: (
+            {"id": index, "name": name, "slug": f"photo-category-{index}"}
+            for index, name in enumerate(PHOTO_CATEGORIES, start=1)
+        )),
+        ("photos", Photo.__table__, lambda: _photo_rows(rng_for("photos"), size.photos)),
+        ("ai_images", AIImage.__table__, lambda: _ai_image_rows(rng_for("ai_images"), size.ai_images, size.nsfw_ratio)),
+        ("ai_demos", AIDemo.__table__, lambda: _ai_demo_rows(rng_for("ai_demos"), size.ai_demos)),
+        ("ai_projects", AIProject.__table__, lambda: _ai_project_rows(rng_for("ai_projects"), size.ai_projects)),
+    ]
+
+    counts: Dict[str, int] = {}
+    for name, table, make_rows in tables:
+        started_at = time.perf_counter()
+        rows = make_rows()
+        if placeholders is not None and name in ("photos", "ai_images"):
+            rows = with_images(rows)
+        counts[name] = await insert_rows(engine, table, rows)
+        if progress is not None:
+            progress(name, counts[name], time.perf_counter() - started_at)
+
+    # 批量写入绕过了 ORM，由应用维护的派生表一次性重建
+    for name, table, rebuild in (
+        ("blog_text", Blog.__table__, rebuild_blog_text),
+        ("blog_related", BlogRelated.__table__, rebuild_blog_related),
+        ("ai_image_tags", ai_image_tags, rebuild_ai_tags),
+        ("photo_days", PhotoDay.__table__, rebuild_photo_days),
+        ("media_assets", MediaAsset.__table__, rebuild_media_assets),
+    ):
+        started_at = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.run_sync(rebuild)
+            counts[name] = await conn.scalar(select(func.count()).select_from(table))
+        if progress is not None:
+            progress(name, counts[name], time.perf_counter() - started_at)
+    return counts
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="生成规模测试数据集")
+    parser.add_argument("--database-url", default=settings.DATABASE_URL, help="目标数据库（须为空库），默认取配置")
+    parser.add_argument("--seed", type=int, default=42)
+    defaults = DatasetSize()
+    for item in fields(DatasetSize):
+        default = getattr(defaults, item.name)
+        parser.add_argument(f"--{item.name.replace('_', '-')}", type=type(default), default=default)
+    parser.add_argument("--images", action="store_true", help="在本地存储目录生成对应的占位图片")
+    parser.add_argument("--storage-dir", default=settings.LOCAL_STORAGE_DIR, help="占位图片目录")
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    size = DatasetSize(**{item.name: getattr(args, item.name) for item in fields(DatasetSize)})
+
+    def report(table: str, rows: int, elapsed: float) -> None:
+        rate = rows / elapsed if elapsed else 0
+        print(f"{table:<18}{rows:>10} 行  {elapsed:>8.1f}s  {rate:>10.0f} 行/s")
+
+    engine = create_async_engine(args.database_url)
+    started_at = time.perf_counter()
+    try:
+        await populate(
+            engine, size, seed=args.seed,
+            storage_dir=args.storage_dir if args.images else None,
+            progress=report,
+        )
+    finally:
+        await engine.dispose()
+    print(f"完成，用时 {time.perf_counter() - started_at:.1f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
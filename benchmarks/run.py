@@ -0,0 +1,428 @@
+"""
+API 基准测试
+
+    python -m benchmarks.run                                    # 临时 SQLite 库，默认流量组合，30 秒
+    python -m benchmarks.run --mix browse --concurrency 32 --duration 60
+    python -m benchmarks.run --database-url mysql+asyncmy://root:pw@127.0.0.1:3306/bench   # 需为空库
+    python -m benchmarks.run --url http://127.0.0.1:8000 --no-seed                          # 压测已运行的服务
+    python -m benchmarks.run --output result.json --baseline benchmarks/baseline.json
+
+流程：生成固定种子的数据集 → 以子进程启动 uvicorn（本地存储后端）→ 虚拟用户按流量组合并发执行场景
+→ 输出各接口吞吐与 p50/p95/p99 延迟并写入 JSON；指定 --baseline 时与基线比较，
+任一接口退化超过 --tolerance 时退出码为 1。
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+
+# ========== 统计 ==========
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)  # 秒
+    errors: int = 0
+
+
+class Recorder:
+    """按场景名记录延迟；预热阶段不记录"""
+
+    def __init__(self) -> None:
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.recording = False
+
+    def record(self, name: str, elapsed: float, ok: bool) -> None:
+        if not self.recording:
+            return
+        stats = self.endpoints.setdefault(name, EndpointStats())
+        stats.latencies.append(elapsed)
+        if not ok:
+            stats.errors += 1
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    everything: List[float] = []
+    errors = 0
+    for name, stats in sorted(recorder.endpoints.items()):
+        values = sorted(stats.latencies)
+        everything.extend(values)
+        errors += stats.errors
+        summary[name] = _summary_row(values, stats.errors, elapsed)
+    summary["total"] = _summary_row(sorted(everything), errors, elapsed)
+    return summary
+
+
+def _summary_row(values: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+# ========== 场景 ==========
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, context: dict):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.context = context
+
+    async def request(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started_at = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(name, time.perf_counter() - started_at, ok=False)
+            return None
+        self.recorder.record(name, time.perf_counter() - started_at, ok=response.status_code < 400)
+        return response
+
+
+async def homepage(user: VirtualUser) -> None:
+    await user.request("homepage", "GET", "/api/home/overview")
+
+
+async def blog_list(user: VirtualUser) -> None:
+    page = user.rng.randint(0, 4)
+    await user.request("blog_list", "GET", f"/api/blogs?published_only=true&skip={page * 10}&limit=10")
+
+
+async def blog_detail(user: VirtualUser) -> None:
+    blog_id = user.rng.choice(user.context["blog_ids"])
+    await user.request("blog_detail", "GET", f"/api/blogs/{blog_id}")
+
+
+async def gallery_scroll(user: VirtualUser) -> None:
+    """模拟瀑布流：连续加载若干页"""
+    for page in range(user.rng.randint(2, 5)):
+        await user.request("gallery_scroll", "GET", f"/api/photos?skip={page * 20}&limit=20")
+
+
+async def admin_upload(user: VirtualUser) -> None:
+    await user.request(
+        "admin_upload",
+        "POST",
+        "/api/upload/image",
+        headers={"Authorization": f"Bearer {user.context['token']}"},
+        files={"file": ("bench.jpg", user.context["image"], "image/jpeg")},
+    )
+
+
+Scenario = Callable[[VirtualUser], Awaitable[None]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "homepage": homepage,
+    "blog_list": blog_list,
+    "blog_detail": blog_detail,
+    "gallery_scroll": gallery_scroll,
+    "admin_upload": admin_upload,
+}
+
+# 流量组合：场景 -> 权重
+MIXES: Dict[str, Dict[str, int]] = {
+    "default": {"homepage": 20, "blog_list": 20, "blog_detail": 30, "gallery_scroll": 28, "admin_upload": 2},
+    "browse": {"homepage": 20, "blog_list": 25, "blog_detail": 30, "gallery_scroll": 25},
+    "upload": {"admin_upload": 1},
+}
+
+
+def make_test_image(width: int = 2400, height: int = 1600) -> bytes:
+    """带 EXIF 的渐变 JPEG，大小与处理耗时接近真实照片"""
+    from PIL import Image
+
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (gradient, gradient.rotate(180), gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    exif = Image.Exif()
+    exif[0x010F] = "SONY"  # Make
+    exif[0x0110] = "ILCE-7M3"  # Model
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90, exif=exif)
+    return output.getvalue()
+
+
+async def _prepare_context(client: httpx.AsyncClient, mix: Dict[str, int]) -> dict:
+    from benchmarks.dataset import BENCH_PASSWORD, BENCH_USERNAME
+
+    context: dict = {}
+    response = await client.get("/api/blogs?published_only=true&limit=100")
+    response.raise_for_status()
+    context["blog_ids"] = [blog["id"] for blog in response.json()] or [1]
+    if "admin_upload" in mix:
+        response = await client.post(
+            "/api/auth/login", data={"username": BENCH_USERNAME, "password": BENCH_PASSWORD}
+        )
+        response.raise_for_status()
+        context["token"] = response.json()["access_token"]
+        context["image"] = make_test_image()
+    return context
+
+
+async def drive_load(
+    base_url: str, mix: Dict[str, int], concurrency: int, duration: float, warmup: float, seed: int
+) -> Tuple[Recorder, float]:
+    """concurrency 个虚拟用户循环执行场景（闭环模型），返回记录与统计时长"""
+    recorder = Recorder()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        context = await _prepare_context(client, mix)
+        deadline = time.monotonic() + warmup + duration
+
+        async def run_user(index: int) -> None:
+            user = VirtualUser(client, recorder, random.Random(seed * 1000 + index), context)
+            while time.monotonic() < deadline:
+                scenario = SCENARIOS[user.rng.choices(names, weights)[0]]
+                await scenario(user)
+
+        async def start_recording() -> float:
+            await asyncio.sleep(warmup)
+            recorder.recording = True
+            return time.monotonic()
+
+        recording_started, *_ = await asyncio.gather(
+            start_recording(), *(run_user(index) for index in range(concurrency))
+        )
+        recorder.recording = False
+        return recorder, time.monotonic() - recording_started
+
+
+# ========== 基线比较 ==========
+
+COMPARED_LATENCIES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> Tuple[List[str], List[str]]:
+    """返回 (比较明细, 退化项)；延迟升高或吞吐下降超过 tolerance 视为退化"""
+    lines: List[str] = []
+    regressions: List[str] = []
+    for name, previous in baseline.get("endpoints", {}).items():
+        now = current["endpoints"].get(name)
+        if now is None:
+            lines.append(f"{name:<16} 本次未执行")
+            continue
+        cells = []
+        for metric in COMPARED_LATENCIES:
+            change = _relative_change(now[metric], previous[metric])
+            cells.append(f"{metric[:-3]} {previous[metric]:.1f}->{now[metric]:.1f}ms ({change:+.0%})")
+            if change > tolerance:
+                regressions.append(f"{name} {metric[:-3]} {change:+.0%}")
+        change = _relative_change(now["throughput_rps"], previous["throughput_rps"])
+        cells.append(f"rps {previous['throughput_rps']:.1f}->{now['throughput_rps']:.1f} ({change:+.0%})")
+        if change < -tolerance:
+            regressions.append(f"{name} 吞吐 {change:+.0%}")
+        lines.append(f"{name:<16} " + "  ".join(cells))
+    return lines, regressions
+
+
+def _relative_change(now: float, previous: float) -> float:
+    if previous == 0:
+        return 0.0 if now == 0 else math.inf
+    return (now - previous) / previous
+
+
+# ========== 服务进程 ==========
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _server_env(database_url: str, storage_dir: str) -> Dict[str, str]:
+    return {
+        "DATABASE_URL": database_url,
+        "DATABASE_REPLICA_URLS": "",
+        "STORAGE_BACKEND": "local",
+        "LOCAL_STORAGE_DIR": storage_dir,
+        "LOCAL_STORAGE_BASE_URL": "/uploads",
+        "LOG_LEVEL": "WARNING",
+        "PROFILER_ENABLED": "false",
+        "DEBUG": "false",
+    }
+
+
+def start_server(port: int, workers: int, env: Dict[str, str]) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--no-access-log", "--log-level", "warning",
+    ]
+    return subprocess.Popen(command, cwd=ROOT_DIR, env={**os.environ, **env})
+
+
+async def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=2) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"服务进程已退出，退出码 {process.returncode}")
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("等待服务启动超时")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# ========== 入口 ==========
+
+def _print_report(endpoints: Dict[str, Dict[str, float]]) -> None:
+    header = f"{'endpoint':<16}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, row in endpoints.items():
+        print(
+            f"{name:<16}{row['requests']:>10}{row['errors']:>8}{row['throughput_rps']:>10.1f}"
+            f"{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}"
+        )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def seed_database(database_url: str, blogs: int, photos: int, seed: int) -> Dict[str, int]:
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from benchmarks.dataset import DatasetSize, populate
+
+    engine = create_async_engine(database_url)
+    try:
+        return await populate(engine, DatasetSize(blogs=blogs, photos=photos), seed=seed)
+    finally:
+        await engine.dispose()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="API 基准测试")
+    parser.add_argument("--database-url", help="默认使用临时目录下的 SQLite 库；使用 MySQL 时需为空库")
+    parser.add_argument("--url", help="压测已运行的服务（不启动子进程），如 http://127.0.0.1:8000")
+    parser.add_argument("--no-seed", action="store_true", help="不生成数据，使用库中已有数据")
+    parser.add_argument("--blogs", type=int, default=500)
+    parser.add_argument("--photos", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--concurrency", type=int, default=16, help="虚拟用户数")
+    parser.add_argument("--duration", type=float, default=30, help="统计时长（秒）")
+    parser.add_argument("--warmup", type=float, default=5, help="预热时长（秒），不计入统计")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker 数")
+    parser.add_argument("--output", default="benchmark-result.json", help="结果 JSON 路径")
+    parser.add_argument("--baseline", help="基线 JSON，与本次结果比较")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="允许的退化比例")
+    return parser.parse_args(argv)
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="personal-web-bench-")
+    database_url = args.database_url or f"sqlite+aiosqlite:///{workdir}/bench.db"
+    env = _server_env(database_url, os.path.join(workdir, "uploads"))
+    # 本进程生成数据时导入的 app 模块读取同一份配置
+    os.environ.update(env)
+
+    if not args.no_seed:
+        counts = await seed_database(database_url, args.blogs, args.photos, args.seed)
+        print("数据集:", ", ".join(f"{table}={count}" for table, count in counts.items()))
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        process = start_server(port, args.workers, env)
+    try:
+        if process is not None:
+            await wait_until_ready(base_url, process)
+        print(f"压测 {base_url}：mix={args.mix} 并发={args.concurrency} 时长={args.duration}s 预热={args.warmup}s")
+        recorder, elapsed = await drive_load(
+            base_url, MIXES[args.mix], args.concurrency, args.duration, args.warmup, args.seed
+        )
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    result = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": database_url.split("://", 1)[0],
+            "mix": args.mix,
+            "concurrency": args.concurrency,
+            "duration": round(elapsed, 2),
+            "workers": args.workers,
+            "dataset": {"blogs": args.blogs, "photos": args.photos, "seed": args.seed},
+        },
+        "endpoints": summarize(recorder, elapsed),
+    }
+    _print_report(result["endpoints"])
+    Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"结果已写入 {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        lines, regressions = compare(result, baseline, args.tolerance)
+        for key in ("mix", "concurrency", "database", "workers", "dataset"):
+            if baseline.get("meta", {}).get(key) != result["meta"][key]:
+                print(f"注意：基线的 {key} 与本次不同，结果不可直接比较")
+        print(f"\n与基线比较（{args.baseline}，commit {baseline.get('meta', {}).get('commit')}）:")
+        for line in lines:
+            print(line)
+        if regressions:
+            print(f"\n退化超过 {args.tolerance:.0%}: " + "; ".join(regressions))
+            return 1
+        print("\n未发现退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,27 @@
+"""
+gunicorn 多进程部署配置
+gunicorn app.main:app -c gunicorn.conf.py
+
+Prometheus 指标在多进程下需要共享目录：启动前设置 PROMETHEUS_MULTIPROC_DIR，
+主进程启动时清空旧数据，worker 退出时清理其实时仪表。
+"""
+import multiprocessing
+import os
+import shutil
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+
+def on_starting(server):
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -25,6 +25,17 @@ USE `personal_web`;
 
 -- --------------------------------------------------------
 
+--
+-- 表的结构 `ai_demo_tags`
+--
+
+CREATE TABLE `ai_demo_tags` (
+  `tag` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '标签（小写）',
+  `ai_demo_id` int(11) NOT NULL COMMENT 'AI DemoID'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='AI Demo标签索引（由 tags 列自动维护）';
+
+-- --------------------------------------------------------
+
 --
 -- 表的结构 `ai_demos`
 --
@@ -45,6 +56,7 @@ CREATE TABLE `ai_demos` (
   `is_published` tinyint(1) DEFAULT '0' COMMENT '是否已发布',
   `sort_order` int(11) DEFAULT '0' COMMENT '排序',
   `view_count` int(11) DEFAULT '0' COMMENT '浏览次数',
+  `version` int(11) NOT NULL DEFAULT '1' COMMENT '内容版本（自动维护）',
   `created_at` datetime(6) DEFAULT CURRENT_TIMESTAMP(6) COMMENT '创建时间',
   `updated_at` datetime(6) DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP(6) COMMENT '更新时间',
   `published_at` datetime(6) DEFAULT NULL COMMENT '发布时间'
@@ -56,6 +68,17 @@ CREATE TABLE `ai_demos` (
 
 -- --------------------------------------------------------
 
+--
+-- 表的结构 `ai_image_tags`
+--
+
+CREATE TABLE `ai_image_tags` (
+  `tag` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '标签（小写）',
+  `ai_image_id` int(11) NOT NULL COMMENT 'AI 图片ID'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='AI 图片标签索引（由 tags 列自动维护）';
+
+-- --------------------------------------------------------
+
 --
 -- 表的结构 `ai_images`
 --
@@ -70,9 +93,11 @@ CREATE TABLE `ai_images` (
   `parameters` json DEFAULT NULL,
   `category` varchar(100) DEFAULT NULL,
   `tags` varchar(500) DEFAULT NULL,
+  `is_nsfw` tinyint(1) NOT NULL DEFAULT '0',
   `is_featured` tinyint(1) DEFAULT NULL,
   `is_published` tinyint(1) DEFAULT NULL,
   `view_count` int(11) DEFAULT NULL,
+  `version` int(11) NOT NULL DEFAULT '1' COMMENT '内容版本（自动维护）',
   `like_count` int(11) DEFAULT NULL,
   `created_at` datetime DEFAULT CURRENT_TIMESTAMP,
   `updated_at` datetime DEFAULT NULL,
@@ -101,6 +126,7 @@ CREATE TABLE `ai_projects` (
   `is_featured` tinyint(1) DEFAULT '0' COMMENT '是否精选',
   `is_published` tinyint(1) DEFAULT '0' COMMENT '是否已发布',
   `view_count` int(11) DEFAULT '0' COMMENT '浏览次数',
+  `version` int(11) NOT NULL DEFAULT '1' COMMENT '内容版本（自动维护）',
   `created_at` datetime(6) DEFAULT CURRENT_TIMESTAMP(6) COMMENT '创建时间',
   `updated_at` datetime(6) DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP(6) COMMENT '更新时间',
   `published_at` datetime(6) DEFAULT NULL COMMENT '发布时间'
@@ -125,11 +151,19 @@ CREATE TABLE `blogs` (
   `cover_image` varchar(500) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '封面图片URL',
   `is_published` tinyint(1) DEFAULT '0' COMMENT '是否已发布',
   `view_count` int(11) DEFAULT '0' COMMENT '浏览次数',
+  `version` int(11) NOT NULL DEFAULT '1' COMMENT '内容版本（自动维护）',
   `category_id` int(11) DEFAULT NULL COMMENT '分类ID',
   `author_id` int(11) DEFAULT NULL COMMENT '作者ID',
   `created_at` datetime(6) DEFAULT CURRENT_TIMESTAMP(6) COMMENT '创建时间',
   `updated_at` datetime(6) DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP(6) COMMENT '更新时间',
-  `published_at` datetime(6) DEFAULT NULL COMMENT '发布时间'
+  `published_at` datetime(6) DEFAULT NULL COMMENT '发布时间',
+  `content_html` mediumtext COLLATE utf8mb4_unicode_ci COMMENT '渲染后的HTML（由content生成）',
+  `toc` json DEFAULT NULL COMMENT '目录',
+  `word_count` int(11) DEFAULT NULL COMMENT '字数',
+  `reading_time` int(11) DEFAULT NULL COMMENT '阅读时长（分钟）',
+  `render_version` int(11) DEFAULT NULL COMMENT '渲染规则版本',
+  `auto_excerpt` varchar(201) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '由正文提取的摘要',
+  `search_text` mediumtext COLLATE utf8mb4_unicode_ci COMMENT '搜索文本（标题、摘要与正文纯文本）'
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='博客表';
 
 --
@@ -138,6 +172,19 @@ CREATE TABLE `blogs` (
 
 -- --------------------------------------------------------
 
+--
+-- 表的结构 `blog_related`
+--
+
+CREATE TABLE `blog_related` (
+  `blog_id` int(11) NOT NULL COMMENT '博客ID',
+  `rank` int(11) NOT NULL COMMENT '排名（从0开始）',
+  `related_id` int(11) NOT NULL COMMENT '相关博客ID',
+  `score` double NOT NULL COMMENT '相关度'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='博客相关文章（自动维护）';
+
+-- --------------------------------------------------------
+
 --
 -- 表的结构 `blog_tag`
 --
@@ -158,7 +205,8 @@ CREATE TABLE `categories` (
   `name` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '分类名称',
   `slug` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '分类URL标识',
   `description` text COLLATE utf8mb4_unicode_ci COMMENT '分类描述',
-  `created_at` datetime(6) DEFAULT CURRENT_TIMESTAMP(6) COMMENT '创建时间'
+  `created_at` datetime(6) DEFAULT CURRENT_TIMESTAMP(6) COMMENT '创建时间',
+  `updated_at` datetime(6) DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP(6) COMMENT '更新时间'
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='博客分类表';
 
 --
@@ -173,6 +221,26 @@ INSERT INTO `categories` (`id`, `name`, `slug`, `description`, `created_at`) VAL
 
 -- --------------------------------------------------------
 
+--
+-- 表的结构 `media_assets`
+--
+
+CREATE TABLE `media_assets` (
+  `id` int(11) NOT NULL COMMENT '媒体记录ID',
+  `asset_type` varchar(20) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '资源类型：blog_cover/photo/ai_image/ai_cover/ai_demo_cover',
+  `owner_type` varchar(20) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '所属记录类型：blog/photo/ai_image/ai_project/ai_demo',
+  `owner_id` int(11) NOT NULL COMMENT '所属记录ID',
+  `title` varchar(200) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '标题',
+  `url` varchar(500) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '图片URL',
+  `thumbnail_url` varchar(500) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '缩略图URL',
+  `file_size` int(11) DEFAULT NULL COMMENT '文件大小（字节）',
+  `width` int(11) DEFAULT NULL COMMENT '宽度',
+  `height` int(11) DEFAULT NULL COMMENT '高度',
+  `created_at` datetime NOT NULL COMMENT '所属记录创建时间'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='媒体资源汇总（由应用维护，导入后执行 alembic upgrade head 回填）';
+
+-- --------------------------------------------------------
+
 --
 -- 表的结构 `photos`
 --
@@ -193,10 +261,17 @@ CREATE TABLE `photos` (
   `shutter_speed` varchar(50) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '快门',
   `iso` varchar(20) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT 'ISO',
   `shoot_time` datetime(6) DEFAULT NULL COMMENT '拍摄时间',
+  `focal_length_mm` double DEFAULT NULL COMMENT '焦距数值（mm，由焦距字段解析）',
+  `aperture_value` double DEFAULT NULL COMMENT '光圈f值（由光圈字段解析）',
+  `iso_value` int(11) DEFAULT NULL COMMENT 'ISO数值（由ISO字段解析）',
+  `latitude` double DEFAULT NULL COMMENT '纬度（由EXIF GPS解析）',
+  `longitude` double DEFAULT NULL COMMENT '经度（由EXIF GPS解析）',
+  `geohash` varchar(12) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '由经纬度计算的geohash',
   `exif` json DEFAULT NULL COMMENT '原始EXIF数据',
   `category_id` int(11) DEFAULT NULL COMMENT '分类ID',
   `is_featured` tinyint(1) DEFAULT '0' COMMENT '是否精选',
   `view_count` int(11) DEFAULT '0' COMMENT '浏览次数',
+  `version` int(11) NOT NULL DEFAULT '1' COMMENT '内容版本（自动维护）',
   `created_at` datetime(6) DEFAULT CURRENT_TIMESTAMP(6) COMMENT '创建时间',
   `updated_at` datetime(6) DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP(6) COMMENT '更新时间'
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='摄影作品表';
@@ -207,6 +282,19 @@ CREATE TABLE `photos` (
 
 -- --------------------------------------------------------
 
+--
+-- 表的结构 `photo_days`
+--
+
+CREATE TABLE `photo_days` (
+  `day` date NOT NULL COMMENT '拍摄日期',
+  `photo_count` int(11) NOT NULL COMMENT '当天拍摄的作品数',
+  `cover_photo_id` int(11) DEFAULT NULL COMMENT '封面作品ID（优先精选）',
+  `cover_featured` tinyint(1) NOT NULL COMMENT '封面是否为精选作品'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='按拍摄日期汇总的作品数（由应用维护，导入后执行 alembic upgrade head 回填）';
+
+-- --------------------------------------------------------
+
 --
 -- 表的结构 `photo_categories`
 --
@@ -217,7 +305,8 @@ CREATE TABLE `photo_categories` (
   `slug` varchar(50) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '分类URL标识',
   `description` text COLLATE utf8mb4_unicode_ci COMMENT '分类描述',
   `cover_image` varchar(500) COLLATE utf8mb4_unicode_ci DEFAULT NULL COMMENT '分类封面图片URL',
-  `created_at` datetime(6) DEFAULT CURRENT_TIMESTAMP(6) COMMENT '创建时间'
+  `created_at` datetime(6) DEFAULT CURRENT_TIMESTAMP(6) COMMENT '创建时间',
+  `updated_at` datetime(6) DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP(6) COMMENT '更新时间'
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='摄影作品分类表';
 
 --
@@ -225,6 +314,17 @@ CREATE TABLE `photo_categories` (
 --
 -- --------------------------------------------------------
 
+--
+-- 表的结构 `revoked_tokens`
+--
+
+CREATE TABLE `revoked_tokens` (
+  `token_id` varchar(32) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '刷新令牌jti或令牌家族ID',
+  `expires_at` datetime NOT NULL COMMENT '过期时间（UTC），过期后可清理'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='已吊销的刷新令牌';
+
+-- --------------------------------------------------------
+
 --
 -- 表的结构 `tags`
 --
@@ -233,7 +333,8 @@ CREATE TABLE `tags` (
   `id` int(11) NOT NULL COMMENT '标签ID',
   `name` varchar(30) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '标签名称',
   `slug` varchar(30) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '标签URL标识',
-  `created_at` datetime(6) DEFAULT CURRENT_TIMESTAMP(6) COMMENT '创建时间'
+  `created_at` datetime(6) DEFAULT CURRENT_TIMESTAMP(6) COMMENT '创建时间',
+  `updated_at` datetime(6) DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP(6) COMMENT '更新时间'
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='标签表';
 
 --
@@ -242,6 +343,31 @@ CREATE TABLE `tags` (
 
 -- --------------------------------------------------------
 
+--
+-- 表的结构 `table_versions`
+--
+
+CREATE TABLE `table_versions` (
+  `name` varchar(64) COLLATE utf8mb4_unicode_ci NOT NULL COMMENT '表名',
+  `version` int(11) NOT NULL COMMENT '写入版本'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='各表写入版本（由应用维护）';
+
+--
+-- 转存表中的数据 `table_versions`
+--
+
+INSERT INTO `table_versions` (`name`, `version`) VALUES
+('ai_demos', 0),
+('ai_images', 0),
+('ai_projects', 0),
+('blogs', 0),
+('categories', 0),
+('photos', 0),
+('photo_categories', 0),
+('tags', 0);
+
+-- --------------------------------------------------------
+
 --
 -- 表的结构 `users`
 --
@@ -265,6 +391,13 @@ CREATE TABLE `users` (
 -- 转储表的索引
 --
 
+--
+-- 表的索引 `ai_demo_tags`
+--
+ALTER TABLE `ai_demo_tags`
+  ADD PRIMARY KEY (`tag`,`ai_demo_id`),
+  ADD KEY `ix_ai_demo_tags_demo` (`ai_demo_id`);
+
 --
 -- 表的索引 `ai_demos`
 --
@@ -273,14 +406,28 @@ ALTER TABLE `ai_demos`
   ADD UNIQUE KEY `slug` (`slug`),
   ADD KEY `idx_slug_demo` (`slug`),
   ADD KEY `idx_is_published_demo` (`is_published`),
-  ADD KEY `idx_sort_order_demo` (`sort_order`);
+  ADD KEY `idx_sort_order_demo` (`sort_order`),
+  ADD KEY `ix_ai_demos_published_sort` (`is_published`,`sort_order`,`created_at`),
+  ADD KEY `ix_ai_demos_published_featured_sort` (`is_published`,`is_featured`,`sort_order`),
+  ADD KEY `ix_ai_demos_category_published_sort` (`category`,`is_published`,`sort_order`);
+
+--
+-- 表的索引 `ai_image_tags`
+--
+ALTER TABLE `ai_image_tags`
+  ADD PRIMARY KEY (`tag`,`ai_image_id`),
+  ADD KEY `ix_ai_image_tags_image` (`ai_image_id`);
 
 --
 -- 表的索引 `ai_images`
 --
 ALTER TABLE `ai_images`
   ADD PRIMARY KEY (`id`),
-  ADD KEY `ix_ai_images_id` (`id`);
+  ADD KEY `ix_ai_images_id` (`id`),
+  ADD KEY `ix_ai_images_published_created` (`is_published`,`created_at`),
+  ADD KEY `ix_ai_images_featured_published_created` (`is_featured`,`is_published`,`created_at`),
+  ADD KEY `ix_ai_images_category_published_created` (`category`,`is_published`,`created_at`),
+  ADD KEY `ix_ai_images_nsfw_published_created` (`is_nsfw`,`is_published`,`created_at`);
 
 --
 -- 表的索引 `ai_projects`
@@ -291,7 +438,9 @@ ALTER TABLE `ai_projects`
   ADD KEY `idx_title` (`title`),
   ADD KEY `idx_slug` (`slug`),
   ADD KEY `idx_is_published` (`is_published`),
-  ADD KEY `idx_is_featured` (`is_featured`);
+  ADD KEY `idx_is_featured` (`is_featured`),
+  ADD KEY `ix_ai_projects_published_created` (`is_published`,`created_at`),
+  ADD KEY `ix_ai_projects_featured_published_created` (`is_featured`,`is_published`,`created_at`);
 
 --
 -- 表的索引 `blogs`
@@ -303,7 +452,17 @@ ALTER TABLE `blogs`
   ADD KEY `idx_slug` (`slug`),
   ADD KEY `idx_category_id` (`category_id`),
   ADD KEY `idx_author_id` (`author_id`),
-  ADD KEY `idx_is_published` (`is_published`);
+  ADD KEY `idx_is_published` (`is_published`),
+  ADD KEY `ix_blogs_created_at` (`created_at`),
+  ADD KEY `ix_blogs_published_created` (`is_published`,`created_at`),
+  ADD KEY `ix_blogs_category_published_created` (`category_id`,`is_published`,`created_at`);
+
+--
+-- 表的索引 `blog_related`
+--
+ALTER TABLE `blog_related`
+  ADD PRIMARY KEY (`blog_id`,`rank`),
+  ADD KEY `ix_blog_related_related_id` (`related_id`);
 
 --
 -- 表的索引 `blog_tag`
@@ -322,6 +481,15 @@ ALTER TABLE `categories`
   ADD KEY `idx_name` (`name`),
   ADD KEY `idx_slug` (`slug`);
 
+--
+-- 表的索引 `media_assets`
+--
+ALTER TABLE `media_assets`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_media_assets_owner` (`owner_type`,`owner_id`,`asset_type`),
+  ADD KEY `ix_media_assets_created_id` (`created_at`,`id`),
+  ADD KEY `ix_media_assets_type_created_id` (`asset_type`,`created_at`,`id`);
+
 --
 -- 表的索引 `photos`
 --
@@ -329,7 +497,23 @@ ALTER TABLE `photos`
   ADD PRIMARY KEY (`id`),
   ADD KEY `idx_title` (`title`),
   ADD KEY `idx_category_id` (`category_id`),
-  ADD KEY `idx_is_featured` (`is_featured`);
+  ADD KEY `idx_is_featured` (`is_featured`),
+  ADD KEY `ix_photos_created_at` (`created_at`),
+  ADD KEY `ix_photos_category_created` (`category_id`,`created_at`),
+  ADD KEY `ix_photos_featured_created` (`is_featured`,`created_at`),
+  ADD KEY `ix_photos_camera_created` (`make`,`model`,`created_at`),
+  ADD KEY `ix_photos_focal_created` (`focal_length_mm`,`created_at`),
+  ADD KEY `ix_photos_aperture_created` (`aperture_value`,`created_at`),
+  ADD KEY `ix_photos_iso_created` (`iso_value`,`created_at`),
+  ADD KEY `ix_photos_shoot_time` (`shoot_time`),
+  ADD KEY `ix_photos_lat_lng` (`latitude`,`longitude`),
+  ADD KEY `ix_photos_geohash` (`geohash`,`latitude`,`longitude`);
+
+--
+-- 表的索引 `photo_days`
+--
+ALTER TABLE `photo_days`
+  ADD PRIMARY KEY (`day`);
 
 --
 -- 表的索引 `photo_categories`
@@ -341,6 +525,13 @@ ALTER TABLE `photo_categories`
   ADD KEY `idx_name` (`name`),
   ADD KEY `idx_slug` (`slug`);
 
+--
+-- 表的索引 `revoked_tokens`
+--
+ALTER TABLE `revoked_tokens`
+  ADD PRIMARY KEY (`token_id`),
+  ADD KEY `ix_revoked_tokens_expires_at` (`expires_at`);
+
 --
 -- 表的索引 `tags`
 --
@@ -351,6 +542,12 @@ ALTER TABLE `tags`
   ADD KEY `idx_name` (`name`),
   ADD KEY `idx_slug` (`slug`);
 
+--
+-- 表的索引 `table_versions`
+--
+ALTER TABLE `table_versions`
+  ADD PRIMARY KEY (`name`);
+
 --
 -- 表的索引 `users`
 --
@@ -395,6 +592,12 @@ ALTER TABLE `blogs`
 ALTER TABLE `categories`
   MODIFY `id` int(11) NOT NULL AUTO_INCREMENT COMMENT '分类ID', AUTO_INCREMENT=5;
 
+--
+-- 使用表AUTO_INCREMENT `media_assets`
+--
+ALTER TABLE `media_assets`
+  MODIFY `id` int(11) NOT NULL AUTO_INCREMENT COMMENT '媒体记录ID';
+
 --
 -- 使用表AUTO_INCREMENT `photos`
 --
@@ -430,6 +633,13 @@ ALTER TABLE `blogs`
   ADD CONSTRAINT `blogs_ibfk_1` FOREIGN KEY (`category_id`) REFERENCES `categories` (`id`) ON DELETE SET NULL,
   ADD CONSTRAINT `blogs_ibfk_2` FOREIGN KEY (`author_id`) REFERENCES `users` (`id`) ON DELETE SET NULL;
 
+--
+-- 限制表 `blog_related`
+--
+ALTER TABLE `blog_related`
+  ADD CONSTRAINT `blog_related_ibfk_1` FOREIGN KEY (`blog_id`) REFERENCES `blogs` (`id`) ON DELETE CASCADE,
+  ADD CONSTRAINT `blog_related_ibfk_2` FOREIGN KEY (`related_id`) REFERENCES `blogs` (`id`) ON DELETE CASCADE;
+
 --
 -- 限制表 `blog_tag`
 --